@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class Aplicativo_webConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'aplicativo_web'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,90 @@
+# backend/src/aplicativo_web/authentication.py
+"""Autenticação JWT das views da API.
+
+Os usuários (produtor, coletor, cooperativa) não são ``auth.User``; o token
+emitido no login carrega ``user_id`` e ``user_type``. ``TokenPayloadAuthentication``
+valida o token uma única vez por requisição (o DRF guarda o resultado em
+``request.user``/``request.auth``), expõe o payload em ``request.auth_payload``
+como as views já esperavam e não consulta o banco.
+
+Tokens já validados ficam num LRU por ``AUTENTICACAO_CACHE_TTL`` segundos
+(sem passar da expiração do próprio token), evitando repetir a verificação
+de assinatura a cada requisição do mesmo cliente.
+"""
+import time
+
+from django.conf import settings
+from rest_framework import authentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .cache import CacheLRU
+
+
+class UsuarioToken:
+    """Principal da requisição, montado só a partir do payload do token."""
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.user_id = payload.get('user_id')
+        self.user_type = payload.get('user_type')
+
+    @property
+    def pk(self):
+        return self.user_id
+
+    def __str__(self):
+        return f"{self.user_type}:{self.user_id}"
+
+
+_tokens_validados = None
+
+
+def tokens_validados():
+    global _tokens_validados
+    if _tokens_validados is None:
+        _tokens_validados = CacheLRU(settings.AUTENTICACAO_CACHE_TAMANHO, settings.AUTENTICACAO_CACHE_TTL)
+    return _tokens_validados
+
+
+def limpar_cache_tokens():
+    global _tokens_validados
+    _tokens_validados = None
+
+
+class TokenPayloadAuthentication(authentication.BaseAuthentication):
+    """Lê ``Authorization: Bearer <token>`` e devolve ``(UsuarioToken, payload)``.
+
+    Token ausente ou inválido não interrompe a requisição: ela segue anônima
+    (as views públicas continuam acessíveis) e o motivo fica em
+    ``request.auth_erro`` para a mensagem das permissões de papel.
+    """
+    www_authenticate_realm = 'api'
+    _jwt = JWTAuthentication()
+
+    def authenticate(self, request):
+        header = request.headers.get('Authorization')
+        if not header or not header.startswith('Bearer '):
+            return None
+        raw_token = header.split(' ')[1] if len(header.split(' ')) > 1 else ''
+
+        cache = tokens_validados()
+        payload = cache.get(raw_token)
+        if payload is None or payload.get('exp', 0) <= time.time():
+            try:
+                payload = dict(self._jwt.get_validated_token(raw_token).payload)
+            except (InvalidToken, TokenError) as e:
+                request.auth_erro = str(e)
+                return None
+            cache.set(raw_token, payload)
+
+        if payload.get('user_id') is None:
+            request.auth_erro = 'Token sem identificação de usuário.'
+            return None
+        request.auth_payload = payload
+        return UsuarioToken(payload), payload
+
+    def authenticate_header(self, request):
+        return f'Bearer realm="{self.www_authenticate_realm}"'
@@ -0,0 +1,77 @@
+# backend/src/aplicativo_web/avaliacoes.py
+"""Avaliações de coletas e as médias de Produtor/Coletor.
+
+Cada avaliação é gravada em ``AvaliacaoColeta`` com o papel de quem avaliou
+(a constraint impede avaliar duas vezes a mesma coleta pelo mesmo papel) e a média do avaliado é
+atualizada no mesmo ``UPDATE`` que incrementa o total, calculado pelo banco
+com ``F()``. O UPDATE toca só as duas colunas de agregado e, sob
+concorrência, cada avaliação parte do valor já gravado pela anterior.
+
+``recalcular`` reconstrói as médias a partir do registro (comando
+``recalcular_avaliacoes``).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+class AvaliacaoDuplicada(Exception):
+    """A coleta já foi avaliada por este papel."""
+
+
+# avaliador -> modelo avaliado
+AVALIADOS = {'coletor': 'Produtor', 'produtor': 'Coletor', 'cooperativa': 'Coletor'}
+
+
+def modelo_avaliado(avaliador):
+    """Modelo de quem é avaliado por ``avaliador`` ('coletor', 'produtor' ou 'cooperativa')."""
+    from . import models
+
+    return getattr(models, AVALIADOS[avaliador])
+
+
+def registrar(coleta, avaliador, avaliador_id, avaliado_id, nota, comentario=None):
+    """Grava a avaliação e atualiza média e total do avaliado numa transação."""
+    from .models import AvaliacaoColeta
+
+    modelo = modelo_avaliado(avaliador)
+    media = ExpressionWrapper(
+        (F('nota_avaliacao_atual') * F('total_avaliacoes') + Value(nota)) / (F('total_avaliacoes') + 1),
+        output_field=DecimalField(max_digits=3, decimal_places=2))
+    try:
+        with transaction.atomic():
+            avaliacao = AvaliacaoColeta.objects.create(
+                coleta=coleta, avaliador=avaliador, avaliador_id=avaliador_id,
+                avaliado_id=avaliado_id, nota=nota, comentario=comentario or None)
+            modelo.objects.filter(pk=avaliado_id).update(
+                nota_avaliacao_atual=media, total_avaliacoes=F('total_avaliacoes') + 1)
+    except IntegrityError:
+        raise AvaliacaoDuplicada()
+    return avaliacao
+
+
+def recalcular(avaliador, ids=None, zerar_sem_registro=False):
+    """Reescreve média e total dos avaliados por ``avaliador`` a partir do registro.
+
+    Entram as notas de todos os papéis que avaliam o mesmo modelo (o coletor é
+    avaliado pelo produtor e pela cooperativa). Só são tocados os avaliados
+    que aparecem no registro: quem não aparece guarda a média anterior ao
+    registro existir, a menos que ``zerar_sem_registro`` (média 0 e total 0).
+    Devolve o número de linhas atualizadas.
+    """
+    from .models import AvaliacaoColeta
+
+    modelo = modelo_avaliado(avaliador)
+    papeis = [papel for papel, nome in AVALIADOS.items() if nome == AVALIADOS[avaliador]]
+    registro = AvaliacaoColeta.objects.filter(avaliador__in=papeis)
+    do_registro = registro.filter(avaliado_id=OuterRef('pk')).order_by().values('avaliado_id')
+    qs = modelo.objects.all()
+    if ids is not None:
+        qs = qs.filter(pk__in=ids)
+    if not zerar_sem_registro:
+        qs = qs.filter(pk__in=registro.values('avaliado_id'))
+    return qs.update(
+        nota_avaliacao_atual=Coalesce(Subquery(do_registro.annotate(m=Avg('nota')).values('m')), Value(0),
+                                      output_field=DecimalField(max_digits=3, decimal_places=2)),
+        total_avaliacoes=Coalesce(Subquery(do_registro.annotate(n=Count('id')).values('n')), Value(0)),
+    )
@@ -0,0 +1,40 @@
+# backend/src/aplicativo_web/cache.py
+"""Cache LRU em memória (por processo), usado pelo geocoder e pela autenticação."""
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """LRU thread-safe com expiração por entrada."""
+
+    def __init__(self, tamanho_maximo, ttl):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            valor, expira_em = item
+            if expira_em < time.monotonic():
+                del self._dados[chave]
+                return None
+            self._dados.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor):
+        if self.tamanho_maximo <= 0:
+            return
+        with self._lock:
+            self._dados[chave] = (valor, time.monotonic() + self.ttl)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho_maximo:
+                self._dados.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
@@ -0,0 +1,88 @@
+# backend/src/aplicativo_web/ceps.py
+"""Consulta offline de coordenadas aproximadas por prefixo de CEP.
+
+A tabela ``cep_centroide`` é copiada para arrays ordenados em memória
+(prefixos + ``array('d')`` de latitudes/longitudes) e consultada com busca
+binária pelo prefixo mais longo, sem nenhum I/O por consulta. A cópia é
+recarregada a cada ``CEP_CENTROIDES_RECARGA`` segundos para enxergar cargas
+feitas por outros processos.
+"""
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import DatabaseError
+
+
+class TabelaCentroides:
+    def __init__(self, prefixos=(), latitudes=(), longitudes=()):
+        self.prefixos = list(prefixos)
+        self.latitudes = array('d', latitudes)
+        self.longitudes = array('d', longitudes)
+        self.tamanhos = sorted({len(p) for p in self.prefixos}, reverse=True)
+
+    @classmethod
+    def do_banco(cls):
+        from .models import CepCentroide
+
+        linhas = CepCentroide.objects.order_by('prefixo').values_list('prefixo', 'latitude', 'longitude')
+        prefixos, latitudes, longitudes = [], [], []
+        for prefixo, lat, lon in linhas.iterator(chunk_size=5000):
+            prefixos.append(prefixo)
+            latitudes.append(lat)
+            longitudes.append(lon)
+        return cls(prefixos, latitudes, longitudes)
+
+    def __len__(self):
+        return len(self.prefixos)
+
+    def buscar(self, cep):
+        """Retorna as coordenadas do prefixo mais longo do CEP presente na tabela."""
+        digitos = re.sub(r"\D", "", str(cep or ""))
+        for tamanho in self.tamanhos:
+            if tamanho > len(digitos):
+                continue
+            prefixo = digitos[:tamanho]
+            i = bisect_left(self.prefixos, prefixo)
+            if i < len(self.prefixos) and self.prefixos[i] == prefixo:
+                return {"latitude": self.latitudes[i], "longitude": self.longitudes[i]}
+        return None
+
+
+_tabela = None
+_carregada_em = 0.0
+_lock = threading.Lock()
+
+
+def tabela():
+    global _tabela, _carregada_em
+    agora = time.monotonic()
+    if _tabela is not None and agora - _carregada_em < settings.CEP_CENTROIDES_RECARGA:
+        return _tabela
+    with _lock:
+        if _tabela is None or agora - _carregada_em >= settings.CEP_CENTROIDES_RECARGA:
+            try:
+                _tabela = TabelaCentroides.do_banco()
+            except DatabaseError as e:
+                print(f"Erro ao carregar centroides de CEP: {e}")
+                if _tabela is None:
+                    _tabela = TabelaCentroides()
+            _carregada_em = agora
+    return _tabela
+
+
+def recarregar():
+    """Descarta a cópia em memória; a próxima consulta relê a tabela."""
+    global _tabela
+    with _lock:
+        _tabela = None
+
+
+def aproximar(cep):
+    """Coordenadas aproximadas do CEP (``{"latitude", "longitude"}``) ou ``None``."""
+    if not cep:
+        return None
+    return tabela().buscar(cep)
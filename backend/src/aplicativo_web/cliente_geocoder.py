@@ -0,0 +1,206 @@
+# backend/src/aplicativo_web/cliente_geocoder.py
+"""Cliente HTTP compartilhado para o serviço de geocoding (Nominatim).
+
+Um único cliente por processo mantém:
+
+- uma ``requests.Session`` com pool de conexões keep-alive;
+- um token bucket que respeita o limite do Nominatim (1 req/s por padrão);
+- timeouts de conexão/leitura em toda chamada, com novas tentativas para
+  erros transitórios (falha de rede, 429, 5xx);
+- um circuit breaker: após várias falhas seguidas o cliente deixa de chamar o
+  serviço e responde "sem coordenadas" até o tempo de recuperação passar.
+"""
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from . import metricas
+
+STATUS_TRANSITORIOS = {429, 500, 502, 503, 504}
+# Retornado quando o limitador não libera a chamada a tempo (não conta como falha do serviço)
+SEM_FICHA = object()
+
+
+class TokenBucket:
+    """Limitador de taxa: ``taxa`` fichas por segundo, até ``capacidade`` acumuladas."""
+
+    def __init__(self, taxa, capacidade=1, relogio=time.monotonic):
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade)
+        self.relogio = relogio
+        self._fichas = float(capacidade)
+        self._atualizado_em = relogio()
+        self._lock = threading.Lock()
+
+    def _repor(self, agora):
+        decorrido = agora - self._atualizado_em
+        self._fichas = min(self.capacidade, self._fichas + decorrido * self.taxa)
+        self._atualizado_em = agora
+
+    def tentar_adquirir(self):
+        """Consome uma ficha se houver; senão retorna quantos segundos faltam para a próxima."""
+        with self._lock:
+            self._repor(self.relogio())
+            if self._fichas >= 1:
+                self._fichas -= 1
+                return 0.0
+            return (1 - self._fichas) / self.taxa
+
+    def adquirir(self, espera_maxima):
+        """Bloqueia até obter uma ficha; retorna False se isso levaria mais que ``espera_maxima``."""
+        limite = time.monotonic() + espera_maxima
+        while True:
+            espera = self.tentar_adquirir()
+            if espera == 0:
+                return True
+            if time.monotonic() + espera > limite:
+                return False
+            time.sleep(espera)
+
+
+class CircuitBreaker:
+    FECHADO = 'FECHADO'
+    ABERTO = 'ABERTO'
+    MEIO_ABERTO = 'MEIO_ABERTO'
+
+    def __init__(self, falhas_para_abrir, recuperacao, relogio=time.monotonic):
+        self.falhas_para_abrir = falhas_para_abrir
+        self.recuperacao = recuperacao
+        self.relogio = relogio
+        self.estado = self.FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._lock = threading.Lock()
+
+    def permite(self):
+        """Indica se uma chamada pode ser feita agora.
+
+        Depois do tempo de recuperação, só uma chamada de teste passa
+        (meio-aberto); o resultado dela fecha ou reabre o circuito.
+        """
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return True
+            if self.estado == self.ABERTO and self.relogio() - self._aberto_em >= self.recuperacao:
+                self.estado = self.MEIO_ABERTO
+                return True
+            return False
+
+    def liberar_teste(self):
+        """Devolve a vaga de teste do meio-aberto quando a chamada nem chegou a ser feita."""
+        with self._lock:
+            if self.estado == self.MEIO_ABERTO:
+                self.estado = self.ABERTO
+                self._aberto_em = self.relogio() - self.recuperacao
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self._falhas = 0
+            self.estado = self.FECHADO
+
+    def registrar_falha(self):
+        with self._lock:
+            self._falhas += 1
+            if self.estado == self.MEIO_ABERTO or self._falhas >= self.falhas_para_abrir:
+                self.estado = self.ABERTO
+                self._aberto_em = self.relogio()
+
+
+class ClienteGeocoder:
+    def __init__(self, url, timeout, taxa, rajada, espera_maxima,
+                 tentativas, falhas_para_abrir, recuperacao, tamanho_pool=10):
+        self.url = url
+        self.timeout = timeout
+        self.espera_maxima = espera_maxima
+        self.tentativas = tentativas
+        self.limitador = TokenBucket(taxa, rajada)
+        self.circuito = CircuitBreaker(falhas_para_abrir, recuperacao)
+
+        self.sessao = requests.Session()
+        self.sessao.headers["User-Agent"] = "ReciclaAi"
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=tamanho_pool)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+
+    @classmethod
+    def das_configuracoes(cls):
+        return cls(
+            url=settings.GEOCODER_URL,
+            timeout=(settings.GEOCODER_TIMEOUT_CONEXAO, settings.GEOCODER_TIMEOUT_LEITURA),
+            taxa=settings.GEOCODER_REQUISICOES_POR_SEGUNDO,
+            rajada=settings.GEOCODER_RAJADA,
+            espera_maxima=settings.GEOCODER_ESPERA_MAXIMA,
+            tentativas=settings.GEOCODER_TENTATIVAS,
+            falhas_para_abrir=settings.GEOCODER_FALHAS_PARA_ABRIR,
+            recuperacao=settings.GEOCODER_RECUPERACAO,
+        )
+
+    def _requisitar(self, params):
+        """Faz a chamada com novas tentativas; retorna o JSON, ``None`` se falhar ou ``SEM_FICHA``."""
+        for tentativa in range(self.tentativas):
+            if not self.limitador.adquirir(self.espera_maxima):
+                metricas.geocoder_chamadas.inc(resultado='sem_ficha')
+                return SEM_FICHA
+            inicio = time.perf_counter()
+            try:
+                r = self.sessao.get(self.url, params=params, timeout=self.timeout)
+                if r.status_code in STATUS_TRANSITORIOS:
+                    raise requests.HTTPError(f"status {r.status_code}")
+                if r.status_code == 404:
+                    metricas.geocoder_chamadas.inc(resultado='sucesso')
+                    return []
+                if r.status_code != 200:
+                    # 401/403 (cliente bloqueado pela política de uso) e demais
+                    # recusas: não adianta repetir, mas contam para o circuito
+                    metricas.geocoder_chamadas.inc(resultado='rejeitada')
+                    print(f"Geocoder recusou a consulta: status {r.status_code}")
+                    return None
+                dados = r.json()
+                metricas.geocoder_chamadas.inc(resultado='sucesso')
+                return dados
+            except (requests.RequestException, ValueError) as e:
+                metricas.geocoder_chamadas.inc(resultado='falha')
+                print(f"Erro ao geocodificar (tentativa {tentativa + 1}): {e}")
+            finally:
+                metricas.geocoder_duracao.observar(time.perf_counter() - inicio)
+        return None
+
+    def buscar(self, endereco):
+        """Retorna ``{"latitude", "longitude"}`` ou ``None`` (não encontrado, falha ou circuito aberto)."""
+        if not self.circuito.permite():
+            metricas.geocoder_chamadas.inc(resultado='circuito_aberto')
+            return None
+        dados = self._requisitar({"q": endereco, "format": "json", "limit": 1})
+        if dados is SEM_FICHA:
+            self.circuito.liberar_teste()
+            return None
+        if dados is None:
+            self.circuito.registrar_falha()
+            return None
+        self.circuito.registrar_sucesso()
+        if not dados:
+            return None
+        return {"latitude": float(dados[0]["lat"]), "longitude": float(dados[0]["lon"])}
+
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def cliente():
+    """Cliente compartilhado do processo (criado na primeira chamada)."""
+    global _cliente
+    if _cliente is None:
+        with _cliente_lock:
+            if _cliente is None:
+                _cliente = ClienteGeocoder.das_configuracoes()
+    return _cliente
+
+
+def reiniciar_cliente():
+    global _cliente
+    with _cliente_lock:
+        _cliente = None
@@ -0,0 +1,121 @@
+# backend/src/aplicativo_web/demanda.py
+"""Mapa de calor da demanda de coletas, agregado em células por nível de zoom.
+
+A célula de um zoom ``z`` tem ``90 / 2**z`` graus (64 px de um mapa web em
+Web Mercator): zoom 12 ≈ 2,4 km, zoom 15 ≈ 300 m. A agregação é feita no
+banco (GROUP BY na célula) e guardada no cache do Django por
+``DEMANDA_CACHE_TTL`` segundos; ``precomputar_demanda`` aquece o cache dos
+zooms mais usados.
+
+Entram as solicitações abertas (SOLICITADA) e as criadas nos últimos
+``dias``, exceto as canceladas. A posição é a do produtor.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Q, Sum
+from django.db.models.functions import Floor
+from django.utils import timezone
+
+ZOOM_MIN = 3
+ZOOM_MAX = 18
+
+
+def celula_graus(zoom):
+    return 90.0 / 2 ** zoom
+
+
+def chave_cache(zoom, tipo_residuo, dias):
+    return f"demanda:{zoom}:{tipo_residuo or '*'}:{dias}"
+
+
+def solicitacoes_consideradas(dias, tipo_residuo=None):
+    from .models import SolicitacaoColeta
+
+    desde = timezone.now() - timedelta(days=dias)
+    qs = (SolicitacaoColeta.objects
+          .filter(Q(status='SOLICITADA') | Q(solicitacao__gte=desde))
+          .exclude(status='CANCELADA')
+          .filter(produtor__latitude__isnull=False, produtor__longitude__isnull=False))
+    if tipo_residuo:
+        # Coluna de resumo com índice GIN; dispensa consultar os itens
+        qs = qs.filter(tipos_residuo__contains=[tipo_residuo])
+    return qs
+
+
+def calcular(zoom, tipo_residuo=None, dias=30):
+    """Agrega a demanda nas células do zoom (duas consultas agrupadas)."""
+    from .models import ItemColeta
+
+    tamanho = celula_graus(zoom)
+    base = solicitacoes_consideradas(dias, tipo_residuo)
+
+    celulas = {}
+    linhas = (base
+              .annotate(i=Floor(F('produtor__latitude') / tamanho), j=Floor(F('produtor__longitude') / tamanho))
+              .order_by()
+              .values('i', 'j')
+              .annotate(solicitacoes=Count('id'),
+                        lat=Avg('produtor__latitude'), lng=Avg('produtor__longitude')))
+    for linha in linhas:
+        i, j = int(linha['i']), int(linha['j'])
+        celulas[(i, j)] = {
+            'latitude': round(linha['lat'], 6),
+            'longitude': round(linha['lng'], 6),
+            'limites': [i * tamanho, j * tamanho, (i + 1) * tamanho, (j + 1) * tamanho],
+            'solicitacoes': linha['solicitacoes'],
+            'quantidade_kg': 0.0,
+            'por_tipo': {},
+        }
+
+    itens = ItemColeta.objects.filter(solicitacao__in=base.values('id'))
+    if tipo_residuo:
+        itens = itens.filter(tipo_residuo=tipo_residuo)
+    linhas = (itens
+              .annotate(i=Floor(F('solicitacao__produtor__latitude') / tamanho),
+                        j=Floor(F('solicitacao__produtor__longitude') / tamanho))
+              .order_by()
+              .values('i', 'j', 'tipo_residuo')
+              .annotate(solicitacoes=Count('solicitacao', distinct=True),
+                        itens=Count('id_item'),
+                        kg=Sum('quantidade', filter=Q(unidade_medida='KG'))))
+    for linha in linhas:
+        celula = celulas.get((int(linha['i']), int(linha['j'])))
+        if celula is None:
+            continue
+        kg = float(linha['kg'] or 0)
+        celula['quantidade_kg'] = round(celula['quantidade_kg'] + kg, 2)
+        celula['por_tipo'][linha['tipo_residuo']] = {
+            'solicitacoes': linha['solicitacoes'],
+            'itens': linha['itens'],
+            'quantidade_kg': round(kg, 2),
+        }
+
+    return {
+        'zoom': zoom,
+        'celula_graus': tamanho,
+        'tipo_residuo': tipo_residuo,
+        'dias': dias,
+        'gerado_em': timezone.now().isoformat(),
+        'celulas': sorted(celulas.values(), key=lambda c: -c['solicitacoes']),
+    }
+
+
+def mapa(zoom, tipo_residuo=None, dias=30):
+    chave = chave_cache(zoom, tipo_residuo, dias)
+    dados = cache.get(chave)
+    if dados is None:
+        dados = calcular(zoom, tipo_residuo, dias)
+        cache.set(chave, dados, settings.DEMANDA_CACHE_TTL)
+    return dados
+
+
+def precomputar(zooms, tipos, dias):
+    """Recalcula e grava no cache todas as combinações; devolve quantas foram gravadas."""
+    total = 0
+    for zoom in zooms:
+        for tipo in tipos:
+            cache.set(chave_cache(zoom, tipo, dias), calcular(zoom, tipo, dias), settings.DEMANDA_CACHE_TTL)
+            total += 1
+    return total
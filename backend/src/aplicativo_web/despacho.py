@@ -0,0 +1,55 @@
+# backend/src/aplicativo_web/despacho.py
+"""Aceite de solicitações pelos coletores, sem corrida entre eles.
+
+``aceitar`` é um único ``UPDATE ... WHERE status = 'SOLICITADA'``: se dois
+coletores aceitam ao mesmo tempo, o banco serializa os dois UPDATEs e só o
+primeiro encontra a linha ainda disponível.
+
+``aceitar_proxima`` escolhe a solicitação aberta mais próxima com
+``SELECT ... FOR UPDATE SKIP LOCKED``: linhas que outro coletor está
+reivindicando naquele instante são puladas em vez de enfileirar todos atrás
+do mesmo lock.
+
+Como ``update()`` não dispara ``post_save``, o índice espacial, o evento de
+status e a métrica de transições são gravados aqui.
+"""
+from django.db import transaction
+
+from . import estados, geo, indice_espacial
+
+
+def aceitar(pk, coletor_id):
+    """Reivindica a solicitação ``pk`` para o coletor; ``True`` se ela ainda estava disponível."""
+    from .models import SolicitacaoColeta
+
+    with transaction.atomic():
+        ganhou = SolicitacaoColeta.objects.filter(pk=pk, status='SOLICITADA').update(
+            coletor_id=coletor_id, status='ACEITA') == 1
+        if ganhou:
+            estados.registrar_evento(pk, 'SOLICITADA', 'ACEITA', 'coletor', coletor_id)
+    if ganhou:
+        indice_espacial.atualizar(pk, 'ACEITA', None, None)
+    return ganhou
+
+
+def aceitar_proxima(coletor_id, lat, lng, raio_km):
+    """Reivindica a solicitação aberta mais próxima de ``(lat, lng)`` dentro do raio.
+
+    Devolve o ``pk`` reivindicado ou ``None`` se não houver nenhuma livre.
+    """
+    from .models import SolicitacaoColeta
+
+    candidatas = geo.filtrar_por_raio(
+        SolicitacaoColeta.objects.filter(status='SOLICITADA'),
+        lat, lng, raio_km, 'produtor__latitude', 'produtor__longitude',
+    ).order_by('distancia_km', 'id')
+    with transaction.atomic():
+        # of=('self',): trava só a solicitação, não o produtor do join
+        pk = (candidatas.select_for_update(skip_locked=True, of=('self',))
+              .values_list('pk', flat=True).first())
+        if pk is None:
+            return None
+        SolicitacaoColeta.objects.filter(pk=pk).update(coletor_id=coletor_id, status='ACEITA')
+        estados.registrar_evento(pk, 'SOLICITADA', 'ACEITA', 'coletor', coletor_id)
+    indice_espacial.atualizar(pk, 'ACEITA', None, None)
+    return pk
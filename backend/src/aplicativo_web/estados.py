@@ -0,0 +1,114 @@
+# backend/src/aplicativo_web/estados.py
+"""Máquina de estados de ``SolicitacaoColeta``.
+
+``TRANSICOES`` diz, por papel, de qual status para qual cada usuário pode
+levar uma solicitação. ``transicionar`` confere a regra e aplica a mudança
+com um único ``UPDATE ... WHERE status = <anterior>``: se outra requisição
+mudou o status no meio do caminho, nada é gravado e ``ConflitoDeStatus`` é
+levantado. Cada mudança é gravada em ``EventoStatusColeta`` na mesma
+transação, para quem precisa acompanhar o fluxo (análises, notificações)
+não ter que comparar linhas de ``solicitacao_coleta``.
+
+Fluxo: produtor cria (SOLICITADA) → coletor aceita (ACEITA) → coletor
+coleta (CONFIRMADA) → coletor entrega na cooperativa (AGUARDANDO) →
+cooperativa confirma (CONCLUIDA). O coletor pode devolver uma coleta que
+ainda não entregou (volta a SOLICITADA, sem coletor) e o produtor pode
+cancelar enquanto ninguém aceitou.
+"""
+from django.db import transaction
+
+from . import indice_espacial, metricas
+
+# papel -> {(de, para), ...}
+TRANSICOES = {
+    'produtor': {
+        ('SOLICITADA', 'CANCELADA'),
+    },
+    'coletor': {
+        ('SOLICITADA', 'ACEITA'),
+        ('ACEITA', 'CONFIRMADA'),
+        ('CONFIRMADA', 'AGUARDANDO'),
+        ('ACEITA', 'SOLICITADA'),
+        ('CONFIRMADA', 'SOLICITADA'),
+    },
+    'cooperativa': {
+        ('AGUARDANDO', 'CONCLUIDA'),
+    },
+}
+
+
+class TransicaoInvalida(Exception):
+    """A regra de ``TRANSICOES`` não permite a mudança para este papel."""
+
+
+class SemPermissao(Exception):
+    """A solicitação não pertence ao usuário."""
+
+
+class ConflitoDeStatus(Exception):
+    """O status mudou entre a leitura e o UPDATE."""
+
+
+def _campo_dono(papel, de):
+    """Coluna que precisa apontar para o usuário (``None``: qualquer um do papel)."""
+    if papel == 'produtor':
+        return 'produtor_id'
+    if papel == 'cooperativa':
+        return 'cooperativa_id'
+    # Solicitação em aberto pode ser aceita por qualquer coletor
+    return None if de == 'SOLICITADA' else 'coletor_id'
+
+
+def _campos_extras(para, usuario_id):
+    if para == 'ACEITA':
+        return {'coletor_id': usuario_id}
+    if para == 'SOLICITADA':
+        return {'coletor_id': None}
+    return {}
+
+
+def registrar_evento(pk, de, para, papel, usuario_id):
+    """Grava o evento e conta a transição na métrica.
+
+    Para quem muda o status com ``update()``, que não dispara ``post_save``.
+    """
+    from .models import EventoStatusColeta
+
+    EventoStatusColeta.objects.create(coleta_id=pk, de=de, para=para, papel=papel, usuario_id=usuario_id)
+    metricas.transicoes_status.inc(de=de, para=para)
+
+
+def transicionar(pk, papel, usuario_id, para):
+    """Leva a solicitação ``pk`` ao status ``para``. Devolve ``(de, campos_alterados)``.
+
+    Levanta ``SolicitacaoColeta.DoesNotExist``, ``TransicaoInvalida``,
+    ``SemPermissao`` ou ``ConflitoDeStatus``.
+    """
+    from .models import SolicitacaoColeta
+
+    atual = (SolicitacaoColeta.objects.filter(pk=pk)
+             .values('status', 'produtor_id', 'coletor_id', 'cooperativa_id',
+                     'produtor__latitude', 'produtor__longitude')
+             .first())
+    if atual is None:
+        raise SolicitacaoColeta.DoesNotExist()
+    de = atual['status']
+    if (de, para) not in TRANSICOES.get(papel, ()):
+        raise TransicaoInvalida(de, para)
+
+    campo_dono = _campo_dono(papel, de)
+    guarda = {'pk': pk, 'status': de}
+    if campo_dono is not None:
+        if atual[campo_dono] != usuario_id:
+            raise SemPermissao()
+        guarda[campo_dono] = usuario_id
+
+    campos = {'status': para, **_campos_extras(para, usuario_id)}
+    with transaction.atomic():
+        alteradas = SolicitacaoColeta.objects.filter(**guarda).update(**campos)
+        if alteradas != 1:
+            raise ConflitoDeStatus(de, para)
+        registrar_evento(pk, de, para, papel, usuario_id)
+
+    indice_espacial.atualizar(pk, para, atual['produtor__latitude'], atual['produtor__longitude'])
+    return de, campos
@@ -0,0 +1,56 @@
+# backend/src/aplicativo_web/geo.py
+"""Funções de distância e de caixa delimitadora (bounding box) em lat/lng."""
+import math
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+RAIO_TERRA_KM = 6371.0088
+# km por grau de latitude, com o mesmo raio usado no haversine
+KM_POR_GRAU_LAT = math.pi * RAIO_TERRA_KM / 180
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Distância em km entre dois pontos (graus decimais)."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dlat = p2 - p1
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlng / 2) ** 2
+    return 2 * RAIO_TERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, raio_km):
+    """Retorna ``(lat_min, lat_max, lng_min, lng_max)`` que contém o círculo do raio."""
+    angulo = raio_km / RAIO_TERRA_KM
+    dlat = math.degrees(angulo)
+    if abs(lat) + dlat >= 90:
+        return max(lat - dlat, -90.0), min(lat + dlat, 90.0), -180.0, 180.0
+    # Extensão exata em longitude do círculo (maior que raio / (km por grau * cos(lat)))
+    dlng = math.degrees(math.asin(math.sin(angulo) / math.cos(math.radians(lat))))
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+def distancia_km_sql(lat, lng, campo_lat, campo_lng):
+    """Expressão ORM (haversine) da distância entre ``(lat, lng)`` e as colunas informadas."""
+    lat_rad = math.radians(lat)
+    lng_rad = math.radians(lng)
+    dlat = (Radians(F(campo_lat)) - Value(lat_rad)) / Value(2.0)
+    dlng = (Radians(F(campo_lng)) - Value(lng_rad)) / Value(2.0)
+    a = (Power(Sin(dlat), 2)
+         + Value(math.cos(lat_rad)) * Cos(Radians(F(campo_lat))) * Power(Sin(dlng), 2))
+    return Value(2 * RAIO_TERRA_KM) * ASin(Least(Sqrt(a), Value(1.0), output_field=FloatField()))
+
+
+def filtrar_por_raio(qs, lat, lng, raio_km, campo_lat='latitude', campo_lng='longitude'):
+    """Restringe ``qs`` ao raio: bounding box (indexável) + haversine, anotando ``distancia_km``.
+
+    O resultado vem ordenado da menor para a maior distância.
+    """
+    lat_min, lat_max, lng_min, lng_max = bounding_box(lat, lng, raio_km)
+    return (
+        qs.filter(**{f'{campo_lat}__range': (lat_min, lat_max),
+                     f'{campo_lng}__range': (lng_min, lng_max)})
+        .annotate(distancia_km=distancia_km_sql(lat, lng, campo_lat, campo_lng))
+        .filter(distancia_km__lte=raio_km)
+        .order_by('distancia_km')
+    )
@@ -0,0 +1,274 @@
+# backend/src/aplicativo_web/geocoding.py
+"""Geocodificação de endereços com cache em dois níveis.
+
+1. LRU em memória (por processo), consultado antes de qualquer I/O;
+2. tabela ``geocode_cache`` no banco, compartilhada entre workers, com TTL
+   e limite de tamanho.
+
+Cada resultado é gravado com duas chaves: a do endereço normalizado e uma
+mais grosseira, só do CEP. Quando o endereço exato não é encontrado (nem no
+cache nem no Nominatim), a chave do CEP serve como aproximação e, por último,
+o centroide offline do prefixo do CEP (``ceps.py``).
+
+O cadastro de produtor não chama o geocoder no request: o produtor é salvo
+com ``geocode_status='PENDENTE'`` e entra na fila ``geocode_pendente``,
+drenada por ``processar_fila`` (comando ``processar_geocodes``).
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import ceps, cliente_geocoder
+from .cache import CacheLRU
+
+
+def normalizar_cep(cep):
+    """Retorna apenas os dígitos do CEP (ou '' se vazio)."""
+    return re.sub(r"\D", "", str(cep or ""))
+
+
+def normalizar_endereco(rua, numero, bairro, cidade, estado, cep):
+    """Forma canônica do endereço: sem acentos, minúsculo e com espaços únicos."""
+    partes = [rua, numero, bairro, cidade, estado, normalizar_cep(cep)]
+    texto = "|".join(str(p or "").strip() for p in partes)
+    texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", texto.lower())
+
+
+def chave_endereco(rua, numero, bairro, cidade, estado, cep):
+    normalizado = normalizar_endereco(rua, numero, bairro, cidade, estado, cep)
+    return "end:" + hashlib.sha1(normalizado.encode("utf-8")).hexdigest()
+
+
+def chave_cep(cep):
+    digitos = normalizar_cep(cep)
+    return f"cep:{digitos}" if digitos else None
+
+
+_lru = CacheLRU(settings.GEOCODE_CACHE_LRU_TAMANHO, settings.GEOCODE_CACHE_TTL)
+_escritas = 0
+_escritas_lock = threading.Lock()
+
+
+def limpar_cache_local():
+    _lru.clear()
+
+
+def _ler_banco(chave):
+    from .models import GeocodeCache
+
+    try:
+        entrada = GeocodeCache.objects.filter(
+            chave=chave, expira_em__gt=timezone.now()).values_list('latitude', 'longitude').first()
+    except DatabaseError:
+        return None
+    if entrada is None:
+        return None
+    return {"latitude": entrada[0], "longitude": entrada[1]}
+
+
+def _gravar_banco(chave, coords):
+    from .models import GeocodeCache
+
+    global _escritas
+    try:
+        GeocodeCache.objects.update_or_create(
+            chave=chave,
+            defaults={
+                'latitude': coords['latitude'],
+                'longitude': coords['longitude'],
+                'expira_em': timezone.now() + timedelta(seconds=settings.GEOCODE_CACHE_TTL),
+            },
+        )
+    except DatabaseError as e:
+        print(f"Erro ao gravar cache de geocoding: {e}")
+        return
+
+    # A limpeza roda a cada N escritas para não pagar um COUNT por cadastro
+    with _escritas_lock:
+        _escritas += 1
+        limpar = _escritas % settings.GEOCODE_CACHE_LIMPEZA_A_CADA == 0
+    if limpar:
+        GeocodeCache.remover_excedentes()
+
+
+def buscar_cache(chave):
+    """Consulta o LRU e, em caso de falha, a tabela; promove acertos do banco ao LRU."""
+    if chave is None:
+        return None
+    coords = _lru.get(chave)
+    if coords is not None:
+        return coords
+    coords = _ler_banco(chave)
+    if coords is not None:
+        _lru.set(chave, coords)
+    return coords
+
+
+def gravar_cache(chave, coords):
+    if chave is None:
+        return
+    _lru.set(chave, coords)
+    _gravar_banco(chave, coords)
+
+
+def consultar_nominatim(rua, numero, bairro, cidade, estado, cep):
+    # Coletores só têm cidade/estado/CEP: monta o texto apenas com as partes preenchidas
+    logradouro = f"{rua or ''} {numero or ''}".strip()
+    partes = [logradouro, bairro, cidade, estado, cep, "Brasil"]
+    endereco = ", ".join(str(p) for p in partes if p)
+    return cliente_geocoder.cliente().buscar(endereco)
+
+
+def resolver(rua, numero, bairro, cidade, estado, cep):
+    """Resolve o endereço em ``(coords, exato)``; ``coords`` é ``{"latitude", "longitude"}`` ou ``None``.
+
+    Ordem: cache do endereço → Nominatim → cache do CEP → centroide do
+    prefixo do CEP. ``exato`` é ``False`` quando só os dois últimos
+    responderam, inclusive com o Nominatim fora do ar (circuito aberto).
+    """
+    chave_end = chave_endereco(rua, numero, bairro, cidade, estado, cep)
+    chave_c = chave_cep(cep)
+
+    coords = buscar_cache(chave_end)
+    if coords is not None:
+        return coords, True
+
+    coords = consultar_nominatim(rua, numero, bairro, cidade, estado, cep)
+    if coords is not None:
+        gravar_cache(chave_end, coords)
+        if chave_c and buscar_cache(chave_c) is None:
+            gravar_cache(chave_c, coords)
+        return coords, True
+
+    coords = buscar_cache(chave_c)
+    if coords is not None:
+        return coords, False
+    return ceps.aproximar(cep), False
+
+
+def geocode(rua, numero, bairro, cidade, estado, cep):
+    """Como ``resolver``, mas só as coordenadas (exatas ou aproximadas) ou ``None``."""
+    return resolver(rua, numero, bairro, cidade, estado, cep)[0]
+
+
+# --- Fila de geocoding em segundo plano ---
+
+# Tempo (segundos) que um item reservado fica invisível para outros workers
+RESERVA_SEGUNDOS = 300
+# Espera base (segundos) entre tentativas; dobra a cada falha
+ESPERA_BASE_SEGUNDOS = 60
+
+
+def enfileirar_produtor(produtor):
+    """Coloca o produtor na fila de geocoding (idempotente)."""
+    from .models import GeocodePendente
+
+    GeocodePendente.objects.get_or_create(produtor=produtor)
+
+
+def endereco_de(obj):
+    """Tupla de endereço de um Produtor, Cooperativa ou Coletor (sem rua/número/bairro)."""
+    return (getattr(obj, 'rua', None), getattr(obj, 'numero', None), getattr(obj, 'bairro', None),
+            obj.cidade, obj.estado, obj.cep)
+
+
+def _resolver_em_thread(endereco):
+    try:
+        return resolver(*endereco)
+    finally:
+        # Cada thread abre sua própria conexão (cache no banco); fecha ao terminar
+        connections.close_all()
+
+
+def geocode_em_lote(enderecos, concorrencia=4):
+    """Resolve uma lista de tuplas de endereço com no máximo ``concorrencia`` consultas simultâneas.
+
+    Retorna a lista de ``(coords, exato)`` de ``resolver`` na mesma ordem.
+    """
+    if concorrencia <= 1:
+        return [resolver(*endereco) for endereco in enderecos]
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        return list(executor.map(_resolver_em_thread, enderecos))
+
+
+def reservar_pendentes(lote):
+    """Reserva até ``lote`` itens vencidos da fila.
+
+    ``SKIP LOCKED`` permite vários drenadores em paralelo sem disputa; a
+    reserva adia ``proxima_tentativa`` para que o item não seja pego de novo
+    enquanto está sendo resolvido.
+    """
+    from .models import GeocodePendente
+
+    agora = timezone.now()
+    with transaction.atomic():
+        pendentes = list(
+            GeocodePendente.objects
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('produtor')
+            .filter(proxima_tentativa__lte=agora)
+            .order_by('proxima_tentativa')[:lote]
+        )
+        if pendentes:
+            GeocodePendente.objects.filter(pk__in=[p.pk for p in pendentes]).update(
+                proxima_tentativa=agora + timedelta(seconds=RESERVA_SEGUNDOS))
+    return pendentes
+
+
+def processar_fila(lote=50, concorrencia=4, max_tentativas=None):
+    """Resolve um lote da fila com no máximo ``concorrencia`` consultas simultâneas.
+
+    Só uma coordenada exata tira o produtor da fila: a aproximada (CEP) ele
+    já recebeu no cadastro, então cache do CEP ou centroide reagendam o item
+    como uma falha. Esgotadas as tentativas, fica com a aproximação
+    (``APROXIMADO``) ou, sem nenhuma, ``FALHOU``.
+
+    Retorna ``(resolvidos, falhas_definitivas, reagendados)``.
+    """
+    from .models import GeocodePendente, Produtor
+
+    if max_tentativas is None:
+        max_tentativas = settings.GEOCODE_FILA_MAX_TENTATIVAS
+
+    pendentes = reservar_pendentes(lote)
+    if not pendentes:
+        return 0, 0, 0
+
+    enderecos = [endereco_de(p.produtor) for p in pendentes]
+    resultados = zip(pendentes, geocode_em_lote(enderecos, concorrencia))
+
+    resolvidos = falhas = reagendados = 0
+    agora = timezone.now()
+    for pendente, (coords, exato) in resultados:
+        with transaction.atomic():
+            if coords and exato:
+                Produtor.objects.filter(pk=pendente.produtor_id).update(
+                    latitude=coords['latitude'], longitude=coords['longitude'],
+                    geocode_status='RESOLVIDO')
+                pendente.delete()
+                resolvidos += 1
+            elif pendente.tentativas + 1 >= max_tentativas:
+                if coords:
+                    Produtor.objects.filter(pk=pendente.produtor_id).update(
+                        latitude=coords['latitude'], longitude=coords['longitude'],
+                        geocode_status='APROXIMADO')
+                else:
+                    Produtor.objects.filter(pk=pendente.produtor_id).update(geocode_status='FALHOU')
+                pendente.delete()
+                falhas += 1
+            else:
+                espera = ESPERA_BASE_SEGUNDOS * (2 ** pendente.tentativas)
+                GeocodePendente.objects.filter(pk=pendente.pk).update(
+                    tentativas=F('tentativas') + 1,
+                    proxima_tentativa=agora + timedelta(seconds=espera))
+                reagendados += 1
+    return resolvidos, falhas, reagendados
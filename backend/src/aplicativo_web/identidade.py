@@ -0,0 +1,50 @@
+# backend/src/aplicativo_web/identidade.py
+"""Resolução do identificador de login (email ou documento) em uma consulta.
+
+Um ``UNION ALL`` sobre produtor, coletor e cooperativa, cada ramo filtrando
+colunas únicas (e portanto indexadas): email e CPF/CNPJ. A prioridade
+reproduz a ordem antiga do login: primeiro email (produtor, coletor,
+cooperativa), depois documento, na mesma ordem de tipos.
+"""
+from django.db.models import Case, CharField, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Coletor, Cooperativa, Produtor
+
+# (tipo, modelo, campo do documento, campo do nome exibido)
+TIPOS = (
+    ('produtor', Produtor, 'cpf_cnpj', 'nome'),
+    ('coletor', Coletor, 'cpf', 'nome'),
+    ('cooperativa', Cooperativa, 'cnpj', 'nome_empresa'),
+)
+
+
+def modelo_do_tipo(user_type):
+    return next(modelo for tipo, modelo, _, _ in TIPOS if tipo == user_type)
+
+
+def _ramo(ordem, user_type, modelo, campo_documento, campo_nome, identificador):
+    return (
+        modelo.objects
+        .filter(Q(email=identificador) | Q(**{campo_documento: identificador}))
+        .annotate(
+            user_type=Value(user_type, output_field=CharField()),
+            nome_exibido=Coalesce(campo_nome, 'email', output_field=CharField()),
+            prioridade=Case(
+                When(email=identificador, then=Value(ordem)),
+                default=Value(len(TIPOS) + ordem),
+                output_field=IntegerField(),
+            ),
+        )
+        .order_by()
+        .values('user_type', 'pk', 'senha', 'nome_exibido', 'prioridade')
+    )
+
+
+def resolver_identificador(identificador):
+    """Devolve ``{'user_type', 'pk', 'senha', 'nome_exibido', 'prioridade'}`` ou ``None``."""
+    if not identificador:
+        return None
+    ramos = [_ramo(ordem, *tipo, identificador) for ordem, tipo in enumerate(TIPOS)]
+    consulta = ramos[0].union(*ramos[1:], all=True).order_by('prioridade')[:1]
+    return next(iter(consulta), None)
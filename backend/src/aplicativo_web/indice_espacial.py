@@ -0,0 +1,206 @@
+# backend/src/aplicativo_web/indice_espacial.py
+"""Índice espacial em memória das solicitações abertas (status SOLICITADA).
+
+Grade fixa de células de ``INDICE_ESPACIAL_CELULA_GRAUS`` graus; cada célula
+guarda ``{id_solicitacao: (lat, lng)}`` usando as coordenadas do produtor.
+Responde buscas por raio e pelos K mais próximos sem consultar o banco.
+
+O índice é construído na primeira consulta e mantido por sinais do modelo
+(``signals.py``) e por chamadas explícitas onde o status muda via
+``QuerySet.update``. Como sinais só chegam ao processo que fez a escrita,
+cada worker também reconstrói o índice a cada
+``INDICE_ESPACIAL_RECONSTRUCAO`` segundos.
+"""
+import heapq
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from .geo import KM_POR_GRAU_LAT, bounding_box, haversine_km
+
+
+class GradeEspacial:
+    def __init__(self, tamanho_celula=0.05):
+        self.tamanho_celula = tamanho_celula
+        self._celulas = {}
+        self._posicoes = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._posicoes)
+
+    def __contains__(self, pk):
+        return pk in self._posicoes
+
+    def _celula(self, lat, lng):
+        return (math.floor(lat / self.tamanho_celula), math.floor(lng / self.tamanho_celula))
+
+    def inserir(self, pk, lat, lng):
+        with self._lock:
+            self.remover(pk)
+            celula = self._celula(lat, lng)
+            self._celulas.setdefault(celula, {})[pk] = (lat, lng)
+            self._posicoes[pk] = celula
+
+    def remover(self, pk):
+        with self._lock:
+            celula = self._posicoes.pop(pk, None)
+            if celula is None:
+                return
+            pontos = self._celulas[celula]
+            pontos.pop(pk, None)
+            if not pontos:
+                del self._celulas[celula]
+
+    def itens(self):
+        """Cópia de ``{pk: (lat, lng)}`` (usada na verificação de consistência)."""
+        with self._lock:
+            return {pk: self._celulas[c][pk] for pk, c in self._posicoes.items()}
+
+    def _distancia_minima_fora(self, lat, r):
+        """Limite inferior (km) da distância até qualquer ponto fora dos anéis 0..r.
+
+        Usa a largura em longitude da célula na latitude mais afastada do
+        equador alcançável, onde ela é menor, com 1% de folga porque o arco de
+        círculo máximo é um pouco mais curto que o arco do paralelo.
+        """
+        lat_extrema = min(90.0, abs(lat) + (r + 1) * self.tamanho_celula)
+        largura = self.tamanho_celula * KM_POR_GRAU_LAT * max(math.cos(math.radians(lat_extrema)), 0.0)
+        return 0.99 * r * largura
+
+    def _anel(self, centro, r):
+        """Células na borda do quadrado de raio ``r`` (em células) em torno de ``centro``."""
+        ci, cj = centro
+        if r == 0:
+            yield centro
+            return
+        for j in range(cj - r, cj + r + 1):
+            yield (ci - r, j)
+            yield (ci + r, j)
+        for i in range(ci - r + 1, ci + r):
+            yield (i, cj - r)
+            yield (i, cj + r)
+
+    def raio(self, lat, lng, raio_km, limite=None):
+        """Lista ``[(distancia_km, pk)]`` dentro do raio, da mais próxima para a mais distante."""
+        lat_min, lat_max, lng_min, lng_max = bounding_box(lat, lng, raio_km)
+        i0, j0 = self._celula(lat_min, lng_min)
+        i1, j1 = self._celula(lat_max, lng_max)
+        encontrados = []
+        with self._lock:
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    for pk, (plat, plng) in self._celulas.get((i, j), {}).items():
+                        d = haversine_km(lat, lng, plat, plng)
+                        if d <= raio_km:
+                            encontrados.append((d, pk))
+        if limite is not None:
+            return heapq.nsmallest(limite, encontrados)
+        encontrados.sort()
+        return encontrados
+
+    def proximos(self, lat, lng, k, raio_max_km=None):
+        """Os ``k`` pontos mais próximos (``[(distancia_km, pk)]``), opcionalmente até ``raio_max_km``.
+
+        Percorre anéis de células a partir do centro e para quando nenhum ponto
+        ainda não visitado pode estar mais perto que o k-ésimo encontrado.
+        """
+        if k <= 0:
+            return []
+        centro = self._celula(lat, lng)
+        melhores = []  # heap máximo (distância negativa) com os k melhores
+        with self._lock:
+            if not self._posicoes:
+                return []
+            max_aneis = max(max(abs(c[0] - centro[0]), abs(c[1] - centro[1])) for c in self._celulas)
+            if raio_max_km is not None:
+                lat_min, lat_max, lng_min, lng_max = bounding_box(lat, lng, raio_max_km)
+                extensao = max(lat_max - lat_min, lng_max - lng_min) / 2
+                max_aneis = min(max_aneis, int(extensao / self.tamanho_celula) + 1)
+            for r in range(max_aneis + 1):
+                for celula in self._anel(centro, r):
+                    for pk, (plat, plng) in self._celulas.get(celula, {}).items():
+                        d = haversine_km(lat, lng, plat, plng)
+                        if raio_max_km is not None and d > raio_max_km:
+                            continue
+                        if len(melhores) < k:
+                            heapq.heappush(melhores, (-d, pk))
+                        elif d < -melhores[0][0]:
+                            heapq.heapreplace(melhores, (-d, pk))
+                if len(melhores) == k and -melhores[0][0] <= self._distancia_minima_fora(lat, r):
+                    break
+        return sorted((-d, pk) for d, pk in melhores)
+
+
+def construir_do_banco(tamanho_celula=None):
+    from .models import SolicitacaoColeta
+
+    grade = GradeEspacial(tamanho_celula or settings.INDICE_ESPACIAL_CELULA_GRAUS)
+    linhas = (SolicitacaoColeta.objects
+              .filter(status='SOLICITADA', produtor__latitude__isnull=False,
+                      produtor__longitude__isnull=False)
+              .values_list('pk', 'produtor__latitude', 'produtor__longitude'))
+    for pk, lat, lng in linhas.iterator(chunk_size=5000):
+        grade.inserir(pk, lat, lng)
+    return grade
+
+
+_indice = None
+_construido_em = 0.0
+_lock = threading.Lock()
+
+
+def indice():
+    """Índice do processo, (re)construído na primeira chamada e após o intervalo configurado."""
+    global _indice, _construido_em
+    agora = time.monotonic()
+    if _indice is not None and agora - _construido_em < settings.INDICE_ESPACIAL_RECONSTRUCAO:
+        return _indice
+    with _lock:
+        if _indice is None or agora - _construido_em >= settings.INDICE_ESPACIAL_RECONSTRUCAO:
+            try:
+                _indice = construir_do_banco()
+            except DatabaseError as e:
+                print(f"Erro ao construir índice espacial: {e}")
+                if _indice is None:
+                    _indice = GradeEspacial(settings.INDICE_ESPACIAL_CELULA_GRAUS)
+            _construido_em = agora
+    return _indice
+
+
+def atual():
+    """O índice que o processo está usando, sem forçar a reconstrução periódica.
+
+    É a estrutura mantida pelos sinais (a que pode divergir do banco); se
+    ainda não existe, é construída como em ``indice()``.
+    """
+    return _indice if _indice is not None else indice()
+
+
+def descartar():
+    """Descarta o índice do processo; a próxima consulta reconstrói a partir do banco."""
+    global _indice
+    with _lock:
+        _indice = None
+
+
+def construido():
+    return _indice is not None
+
+
+def atualizar(pk, status, lat, lng):
+    """Aplica uma mudança de solicitação ao índice (se ele já foi construído)."""
+    if _indice is None:
+        return
+    if status == 'SOLICITADA' and lat is not None and lng is not None:
+        _indice.inserir(pk, lat, lng)
+    else:
+        _indice.remover(pk)
+
+
+def remover(pk):
+    if _indice is not None:
+        _indice.remover(pk)
@@ -0,0 +1,100 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aplicativo_web import geocoding
+from aplicativo_web.models import Coletor, Cooperativa, GeocodePendente, Produtor
+
+MODELOS = {
+    'produtor': Produtor,
+    'cooperativa': Cooperativa,
+    'coletor': Coletor,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Preenche latitude/longitude de produtores, cooperativas e coletores que ainda "
+        "não têm coordenadas. Pode ser interrompido e retomado com --checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tabelas', nargs='+', choices=list(MODELOS), default=list(MODELOS))
+        parser.add_argument('--lote', type=int, default=200,
+                            help='Linhas lidas e gravadas (bulk_update) por vez.')
+        parser.add_argument('--concorrencia', type=int, default=4,
+                            help='Consultas de geocoding simultâneas.')
+        parser.add_argument('--checkpoint', default=None,
+                            help='Arquivo JSON com o último id processado por tabela (retomada).')
+
+    def ler_checkpoint(self, caminho):
+        if not caminho or not Path(caminho).exists():
+            return {}
+        try:
+            return json.loads(Path(caminho).read_text())
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Checkpoint inválido: {e}")
+
+    def gravar_checkpoint(self, caminho, dados):
+        if caminho:
+            Path(caminho).write_text(json.dumps(dados))
+
+    def handle(self, *args, **options):
+        checkpoint = self.ler_checkpoint(options['checkpoint'])
+
+        for nome in options['tabelas']:
+            modelo = MODELOS[nome]
+            ultimo_id = checkpoint.get(nome, 0)
+            base = modelo.objects.filter(latitude__isnull=True)
+            total = base.filter(pk__gt=ultimo_id).count()
+            self.stdout.write(f"[{nome}] {total} linhas sem coordenadas (a partir do id {ultimo_id}).")
+
+            processados = resolvidos = 0
+            inicio = time.monotonic()
+            while True:
+                # Paginação por chave (id > último) para não depender de OFFSET
+                lote = list(base.filter(pk__gt=ultimo_id).order_by('pk')[:options['lote']])
+                if not lote:
+                    break
+
+                resultados = geocoding.geocode_em_lote(
+                    [geocoding.endereco_de(obj) for obj in lote], options['concorrencia'])
+
+                atualizados, aproximados = [], set()
+                for obj, (coords, exato) in zip(lote, resultados):
+                    if coords:
+                        obj.latitude = coords['latitude']
+                        obj.longitude = coords['longitude']
+                        atualizados.append(obj)
+                        if not exato:
+                            aproximados.add(obj.pk)
+
+                if atualizados:
+                    campos = ['latitude', 'longitude']
+                    if modelo is Produtor:
+                        for obj in atualizados:
+                            obj.geocode_status = 'APROXIMADO' if obj.pk in aproximados else 'RESOLVIDO'
+                        campos.append('geocode_status')
+                        # Só a coordenada exata tira o produtor da fila; os
+                        # aproximados ficam (ou entram) nela para o worker refinar
+                        GeocodePendente.objects.filter(
+                            produtor_id__in=[obj.pk for obj in atualizados if obj.pk not in aproximados]).delete()
+                        GeocodePendente.objects.bulk_create(
+                            [GeocodePendente(produtor_id=pk) for pk in aproximados], ignore_conflicts=True)
+                    modelo.objects.bulk_update(atualizados, campos)
+
+                ultimo_id = lote[-1].pk
+                processados += len(lote)
+                resolvidos += len(atualizados)
+                checkpoint[nome] = ultimo_id
+                self.gravar_checkpoint(options['checkpoint'], checkpoint)
+
+                taxa = processados / max(time.monotonic() - inicio, 1e-6)
+                self.stdout.write(
+                    f"[{nome}] {processados}/{total} processados, {resolvidos} resolvidos "
+                    f"({taxa:.1f} linhas/s)")
+
+            self.stdout.write(self.style.SUCCESS(
+                f"[{nome}] concluído: {resolvidos} de {processados} linhas resolvidas."))
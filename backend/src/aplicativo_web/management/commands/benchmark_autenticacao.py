@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from aplicativo_web import authentication
+from aplicativo_web.permissions import IsColetor
+
+from .benchmark_indice_espacial import resumo
+
+
+class ViewLegada(APIView):
+    """Reproduz o padrão antigo: permissão e view decodificando o token cada uma."""
+    authentication_classes = []
+    verificacoes = 2
+
+    def get(self, request):
+        payload = None
+        for _ in range(self.verificacoes):
+            raw_token = request.headers['Authorization'].split(' ')[1]
+            payload = JWTAuthentication().get_validated_token(raw_token).payload
+        if payload.get('user_type') != 'coletor':
+            return Response(status=401)
+        return Response({'user_id': payload['user_id']})
+
+
+class ViewAtual(APIView):
+    permission_classes = [IsColetor]
+
+    def get(self, request):
+        return Response({'user_id': request.auth_payload['user_id']})
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o custo de autenticação por requisição (sem banco): decodificação "
+        "repetida do padrão antigo vs TokenPayloadAuthentication com e sem cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=2000)
+        parser.add_argument('--verificacoes-legado', type=int, default=2,
+                            help='Quantas vezes o padrão antigo validava o token por requisição.')
+
+    def handle(self, *args, **options):
+        refresh = RefreshToken()
+        refresh['user_id'] = 1
+        refresh['user_type'] = 'coletor'
+        header = f'Bearer {refresh.access_token}'
+        fabrica = APIRequestFactory()
+        ViewLegada.verificacoes = options['verificacoes_legado']
+        cenarios = {
+            'legado': (ViewLegada.as_view(), False),
+            'atual (sem cache)': (ViewAtual.as_view(), True),
+            'atual (com cache)': (ViewAtual.as_view(), False),
+        }
+
+        for nome, (view, limpar_cache) in cenarios.items():
+            authentication.limpar_cache_tokens()
+            tempos = []
+            for _ in range(options['requisicoes']):
+                if limpar_cache:
+                    authentication.limpar_cache_tokens()
+                requisicao = fabrica.get('/', HTTP_AUTHORIZATION=header)
+                t = time.perf_counter()
+                resposta = view(requisicao)
+                tempos.append(time.perf_counter() - t)
+                assert resposta.status_code == 200, resposta.data
+            self.stdout.write(f"{nome:<18} {resumo(tempos)}")
@@ -0,0 +1,84 @@
+import copy
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from aplicativo_web.views import estado_banco
+
+from .benchmark_indice_espacial import resumo
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga das conexões com o banco: várias threads repetem a "
+        "verificação de /api/ready (um SELECT) entre os signals de início e fim "
+        "de requisição, sem pool (conexão nova por requisição) "
+        "e com o pool do psycopg. Use um Postgres local ou de homologação."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=500, help='Requisições por thread.')
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--tamanho-pool', type=int, default=None,
+                            help='max_size do pool (padrão: igual a --threads).')
+
+    def handle(self, *args, **options):
+        base = connections.settings['default']
+        if base['ENGINE'] != 'django.db.backends.postgresql':
+            raise CommandError("O pool de conexões só existe no backend PostgreSQL.")
+        tamanho = options['tamanho_pool'] or options['threads']
+        pool = dict(base['OPTIONS'].get('pool') or {})
+        pool.update(min_size=tamanho, max_size=tamanho)
+        cenarios = {
+            'sem pool': self.alias(base, 'benchmark_sem_pool', None),
+            'com pool': self.alias(base, 'benchmark_com_pool', pool),
+        }
+
+        for nome, alias in cenarios.items():
+            self.carga(alias, 20, 1)  # aquece (e abre o pool)
+            inicio = time.perf_counter()
+            tempos = self.carga(alias, options['requisicoes'], options['threads'])
+            total = time.perf_counter() - inicio
+            self.stdout.write(f"{nome:9}: {resumo(tempos)} | {len(tempos) / total:.0f} req/s")
+            connections[alias].close_pool()
+            del connections[alias]
+
+    def alias(self, base, nome, pool):
+        config = copy.deepcopy(base)
+        config['OPTIONS'].pop('pool', None)
+        config['CONN_MAX_AGE'] = 0
+        if pool is not None:
+            config['OPTIONS']['pool'] = pool
+        connections.settings[nome] = config
+        return nome
+
+    def carga(self, alias, requisicoes, threads):
+        tempos, erros = [], []
+
+        def trabalhador():
+            locais = []
+            for _ in range(requisicoes):
+                inicio = time.perf_counter()
+                # Mesmos signals do handler WSGI: fecham (ou devolvem ao pool) a conexão
+                request_started.send(sender=self.__class__)
+                try:
+                    corpo, http_status = estado_banco(connections[alias])
+                finally:
+                    request_finished.send(sender=self.__class__)
+                locais.append(time.perf_counter() - inicio)
+                if http_status != 200:
+                    erros.append(corpo['banco'])
+            tempos.extend(locais)
+            connections.close_all()
+
+        grupo = [threading.Thread(target=trabalhador) for _ in range(threads)]
+        for thread in grupo:
+            thread.start()
+        for thread in grupo:
+            thread.join()
+        if erros:
+            raise CommandError(f"{len(erros)} requisições falharam: {erros[0]!r}")
+        return tempos
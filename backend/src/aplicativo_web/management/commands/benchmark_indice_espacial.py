@@ -0,0 +1,68 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aplicativo_web import geo, indice_espacial
+from aplicativo_web.models import Produtor, SolicitacaoColeta
+
+
+def resumo(tempos):
+    ordenados = sorted(tempos)
+    p95 = ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))]
+    return (f"média {statistics.mean(tempos) * 1000:.3f} ms | "
+            f"p50 {statistics.median(tempos) * 1000:.3f} ms | p95 {p95 * 1000:.3f} ms")
+
+
+class Command(BaseCommand):
+    help = "Compara o tempo das buscas por raio e K mais próximos: SQL vs índice em memória."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--consultas', type=int, default=200)
+        parser.add_argument('--raio', type=float, default=10.0)
+        parser.add_argument('--k', type=int, default=30)
+        parser.add_argument('--semente', type=int, default=None)
+
+    def handle(self, *args, **options):
+        coords = list(Produtor.objects.filter(latitude__isnull=False, longitude__isnull=False)
+                      .values_list('latitude', 'longitude')[:10000])
+        if not coords:
+            raise CommandError("Nenhum produtor com coordenadas para gerar pontos de consulta.")
+        rng = random.Random(options['semente'])
+        pontos = [rng.choice(coords) for _ in range(options['consultas'])]
+        raio, k = options['raio'], options['k']
+
+        inicio = time.perf_counter()
+        grade = indice_espacial.construir_do_banco()
+        construcao = time.perf_counter() - inicio
+        self.stdout.write(f"Índice: {len(grade)} coletas abertas, construído em {construcao * 1000:.1f} ms")
+
+        abertas = SolicitacaoColeta.objects.filter(status='SOLICITADA')
+        tempos = {'sql_raio': [], 'indice_raio': [], 'sql_k': [], 'indice_k': []}
+        for lat, lng in pontos:
+            t = time.perf_counter()
+            list(geo.filtrar_por_raio(abertas, lat, lng, raio, 'produtor__latitude', 'produtor__longitude')
+                 .values_list('pk', 'distancia_km')[:k])
+            tempos['sql_raio'].append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            grade.raio(lat, lng, raio, k)
+            tempos['indice_raio'].append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            list(abertas.filter(produtor__latitude__isnull=False)
+                 .annotate(distancia_km=geo.distancia_km_sql(
+                     lat, lng, 'produtor__latitude', 'produtor__longitude'))
+                 .order_by('distancia_km').values_list('pk', 'distancia_km')[:k])
+            tempos['sql_k'].append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            grade.proximos(lat, lng, k)
+            tempos['indice_k'].append(time.perf_counter() - t)
+
+        for nome, lista in tempos.items():
+            self.stdout.write(f"{nome:<12} {resumo(lista)}")
+        for busca in ('raio', 'k'):
+            ganho = statistics.mean(tempos[f'sql_{busca}']) / max(statistics.mean(tempos[f'indice_{busca}']), 1e-9)
+            self.stdout.write(self.style.SUCCESS(f"{busca}: índice {ganho:.1f}x mais rápido que SQL"))
@@ -0,0 +1,165 @@
+import json
+import random
+import re
+import statistics
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from aplicativo_web.models import Coletor, Cooperativa, Produtor, SolicitacaoColeta
+from aplicativo_web.serializers import SolicitacaoColetaDetailSerializer, SolicitacaoColetaListSerializer
+
+# Índices das listagens (migração 0009; o de (produtor, -id) saiu na 0011 porque o
+# índice do FK já atende "minhas do produtor"). Removidos temporariamente para
+# medir o "antes".
+INDICES = [
+    'solicitacao_abertas_idx',
+    'solicitacao_coletor_id_idx',
+    'solicitacao_coop_aguard_idx',
+]
+
+DOMINIO = 'benchmark.invalid'
+
+# Distribuição de status de uma base em operação: a maioria já concluída
+STATUS_PESOS = [('CONCLUIDA', 78), ('CANCELADA', 7), ('SOLICITADA', 6), ('ACEITA', 4),
+                ('CONFIRMADA', 3), ('AGUARDANDO', 2)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra o EXPLAIN ANALYZE das consultas das listagens de solicitações "
+        "sem e com os índices das listagens (migrações 0009 e 0011). Os índices são removidos dentro "
+        "de uma transação desfeita ao final, o que trava a tabela durante a "
+        "medição: rode em cópia ou homologação, nunca em produção. Com --semear "
+        "insere antes um volume realista de dados marcados (e-mails @"
+        f"{DOMINIO}); --limpar os remove."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semear', action='store_true', help='Insere dados de benchmark antes de medir.')
+        parser.add_argument('--limpar', action='store_true', help='Só remove os dados de benchmark.')
+        parser.add_argument('--solicitacoes', type=int, default=200000)
+        parser.add_argument('--produtores', type=int, default=20000)
+        parser.add_argument('--coletores', type=int, default=1000)
+        parser.add_argument('--cooperativas', type=int, default=50)
+        parser.add_argument('--repeticoes', type=int, default=5,
+                            help='Execuções por consulta; vale a mediana do Execution Time.')
+        parser.add_argument('--saida', default=None, help='Grava os planos completos neste arquivo JSON.')
+        parser.add_argument('--semente', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Este benchmark usa EXPLAIN ANALYZE do PostgreSQL.")
+        if options['limpar']:
+            self.limpar()
+            return
+        if options['semear']:
+            self.semear(options)
+
+        consultas = self.consultas()
+        resultados = {}
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for nome in INDICES:
+                    cursor.execute(f'DROP INDEX IF EXISTS "{nome}"')
+            for nome, qs in consultas.items():
+                resultados[nome] = {'antes': self.medir(qs, options['repeticoes'])}
+            transaction.set_rollback(True)
+        for nome, qs in consultas.items():
+            resultados[nome]['depois'] = self.medir(qs, options['repeticoes'])
+
+        for nome, r in resultados.items():
+            antes, depois = r['antes'], r['depois']
+            ganho = antes['execucao_ms'] / depois['execucao_ms'] if depois['execucao_ms'] else float('inf')
+            self.stdout.write(self.style.MIGRATE_HEADING(nome))
+            self.stdout.write(f"  antes : {antes['execucao_ms']:9.3f} ms | {antes['no_raiz']}")
+            self.stdout.write(f"  depois: {depois['execucao_ms']:9.3f} ms | {depois['no_raiz']}")
+            self.stdout.write(f"  {ganho:.1f}x")
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as f:
+                json.dump(resultados, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Planos gravados em {options['saida']}.")
+
+    def consultas(self):
+        """Consultas das listagens, como as views montam (primeira página do cursor)."""
+        pagina = settings.PAGINACAO_TAMANHO_PAGINA + 1
+        base = SolicitacaoColeta.objects.order_by('-id')
+
+        def maior(campo, **filtros):
+            linha = (SolicitacaoColeta.objects.filter(**{f'{campo}__isnull': False}, **filtros)
+                     .values(campo).annotate(n=Count('id')).order_by('-n').first())
+            if linha is None:
+                raise CommandError(f"Sem solicitações com {campo} para medir (use --semear).")
+            return linha[campo]
+
+        lista = SolicitacaoColetaListSerializer.preparar_queryset
+        detalhe = SolicitacaoColetaDetailSerializer.preparar_queryset
+        return {
+            'disponiveis (status=SOLICITADA)': lista(base.filter(status='SOLICITADA'))[:pagina],
+            'minhas do produtor': lista(base.filter(produtor_id=maior('produtor')))[:pagina],
+            'minhas do coletor': detalhe(base.filter(coletor_id=maior('coletor')))[:pagina],
+            'pendentes da cooperativa': detalhe(base.filter(
+                cooperativa_id=maior('cooperativa', status='AGUARDANDO'), status='AGUARDANDO'))[:pagina],
+        }
+
+    def medir(self, qs, repeticoes):
+        planos = [qs.explain(analyze=True, buffers=True) for _ in range(repeticoes)]
+        tempos = [float(re.search(r'Execution Time: ([\d.]+) ms', p).group(1)) for p in planos]
+        mediano = planos[tempos.index(sorted(tempos)[len(tempos) // 2])]
+        return {
+            'execucao_ms': statistics.median(tempos),
+            'no_raiz': next(linha.strip() for linha in mediano.splitlines() if linha.strip()).split('  (')[0],
+            'plano': mediano,
+        }
+
+    def semear(self, options):
+        rng = random.Random(options['semente'])
+        lote = 10000
+        self.stdout.write("Inserindo dados de benchmark...")
+
+        produtores = Produtor.objects.bulk_create([
+            Produtor(nome=f"Bench {i}", email=f"p{i}@{DOMINIO}", senha='!', cpf_cnpj=f"bench-p{i}",
+                     latitude=-5.09 + rng.uniform(-0.2, 0.2), longitude=-42.80 + rng.uniform(-0.2, 0.2))
+            for i in range(options['produtores'])], batch_size=lote)
+        coletores = Coletor.objects.bulk_create([
+            Coletor(nome=f"Bench {i}", email=f"c{i}@{DOMINIO}", senha='!', cpf=f"bench-c{i}")
+            for i in range(options['coletores'])], batch_size=lote)
+        cooperativas = Cooperativa.objects.bulk_create([
+            Cooperativa(nome_empresa=f"Bench {i}", email=f"coop{i}@{DOMINIO}", senha='!', cnpj=f"bench-{i}")
+            for i in range(options['cooperativas'])], batch_size=lote)
+
+        status, pesos = zip(*STATUS_PESOS)
+        agora = timezone.now()
+        criadas = 0
+        while criadas < options['solicitacoes']:
+            linhas = []
+            for _ in range(min(lote, options['solicitacoes'] - criadas)):
+                st = rng.choices(status, pesos)[0]
+                quando = agora - timedelta(days=rng.uniform(0, 365))
+                linhas.append(SolicitacaoColeta(
+                    # Poucos produtores concentram muitas solicitações (condomínios)
+                    produtor=produtores[int(len(produtores) * rng.random() ** 3)],
+                    coletor=None if st in ('SOLICITADA', 'CANCELADA') else rng.choice(coletores),
+                    cooperativa=rng.choice(cooperativas) if st in ('AGUARDANDO', 'CONCLUIDA') else None,
+                    status=st, solicitacao=quando, inicio_coleta=quando, fim_coleta=quando))
+            SolicitacaoColeta.objects.bulk_create(linhas)
+            criadas += len(linhas)
+            self.stdout.write(f"  {criadas} solicitações")
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE solicitacao_coleta')
+
+    def limpar(self):
+        # DELETE direto: o delete() do ORM carregaria cada solicitação para os signals
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM solicitacao_coleta WHERE produtor_id IN '
+                '(SELECT id FROM produtor WHERE email LIKE %s)', [f'%@{DOMINIO}'])
+        for modelo in (Produtor, Coletor, Cooperativa):
+            modelo.objects.filter(email__endswith=f'@{DOMINIO}').delete()
+        self.stdout.write(self.style.SUCCESS("Dados de benchmark removidos."))
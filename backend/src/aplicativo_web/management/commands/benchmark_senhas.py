@@ -0,0 +1,49 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from aplicativo_web import senhas
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a vazão de verificação de senhas (logins/s) para cada custo de PBKDF2, "
+        "com uma thread (por núcleo) e com N threads, para dimensionar os workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--custos', type=int, nargs='+',
+                            default=[100000, 300000, 600000, 1000000])
+        parser.add_argument('--duracao', type=float, default=2.0,
+                            help='Segundos medidos por cenário.')
+        parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+
+    def vazao(self, armazenada, threads, duracao):
+        fim = time.perf_counter() + duracao
+
+        def laco():
+            n = 0
+            while time.perf_counter() < fim:
+                senhas.verificar('senha-de-teste', armazenada)
+                n += 1
+            return n
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            total = sum(pool.map(lambda _: laco(), range(threads)))
+        return total / (time.perf_counter() - inicio)
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        self.stdout.write(f"{os.cpu_count()} núcleos; medindo 1 e {threads} threads por custo.")
+        for custo in options['custos']:
+            with override_settings(SENHA_PBKDF2_ITERACOES=custo):
+                armazenada = senhas.gerar_hash('senha-de-teste')
+                um = self.vazao(armazenada, 1, options['duracao'])
+                varias = self.vazao(armazenada, threads, options['duracao'])
+            self.stdout.write(
+                f"{custo:>9} iterações: {1000 / um:7.1f} ms/verificação | "
+                f"{um:7.1f} logins/s por núcleo | {varias:7.1f} logins/s com {threads} threads")
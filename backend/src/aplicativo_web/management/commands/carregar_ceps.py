@@ -0,0 +1,70 @@
+import csv
+import re
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from aplicativo_web import ceps
+from aplicativo_web.models import CepCentroide
+
+
+class Command(BaseCommand):
+    help = (
+        "Carrega centroides de CEP a partir de um CSV com colunas "
+        "'prefixo' (ou 'cep'), 'latitude' e 'longitude'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do CSV.')
+        parser.add_argument('--digitos', type=int, default=None,
+                            help='Agrupa os CEPs pelos N primeiros dígitos, usando a média das coordenadas.')
+        parser.add_argument('--delimitador', default=',')
+        parser.add_argument('--substituir', action='store_true',
+                            help='Apaga os centroides existentes antes da carga.')
+        parser.add_argument('--lote', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        digitos = options['digitos']
+        somas = defaultdict(lambda: [0.0, 0.0, 0])
+        ignoradas = 0
+
+        try:
+            with open(options['arquivo'], newline='', encoding='utf-8-sig') as f:
+                for linha in csv.DictReader(f, delimiter=options['delimitador']):
+                    prefixo = re.sub(r"\D", "", linha.get('prefixo') or linha.get('cep') or '')
+                    try:
+                        lat = float(str(linha['latitude']).replace(',', '.'))
+                        lon = float(str(linha['longitude']).replace(',', '.'))
+                    except (KeyError, TypeError, ValueError):
+                        ignoradas += 1
+                        continue
+                    if digitos:
+                        prefixo = prefixo[:digitos]
+                    if not prefixo or len(prefixo) > 8:
+                        ignoradas += 1
+                        continue
+                    soma = somas[prefixo]
+                    soma[0] += lat
+                    soma[1] += lon
+                    soma[2] += 1
+        except OSError as e:
+            raise CommandError(f"Não foi possível ler o arquivo: {e}")
+
+        centroides = [
+            CepCentroide(prefixo=prefixo, latitude=lat / n, longitude=lon / n)
+            for prefixo, (lat, lon, n) in somas.items()
+        ]
+
+        with transaction.atomic():
+            if options['substituir']:
+                CepCentroide.objects.all().delete()
+            CepCentroide.objects.bulk_create(
+                centroides, batch_size=options['lote'],
+                update_conflicts=True, unique_fields=['prefixo'],
+                update_fields=['latitude', 'longitude'],
+            )
+
+        ceps.recarregar()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(centroides)} centroides carregados ({ignoradas} linhas ignoradas)."))
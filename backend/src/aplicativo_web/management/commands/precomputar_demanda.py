@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from aplicativo_web import demanda
+from aplicativo_web.models import ItemColeta
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula o mapa de demanda de coletas para os zooms informados (todos os "
+        "tipos de resíduo e o total) e grava no cache. Pode ser agendado para "
+        "rodar a cada DEMANDA_CACHE_TTL segundos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zooms', type=int, nargs='+', default=list(range(10, 16)))
+        parser.add_argument('--dias', type=int, default=None,
+                            help='Janela de solicitações recentes (padrão: DEMANDA_JANELA_DIAS).')
+
+    def handle(self, *args, **options):
+        if isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache)):
+            raise CommandError(
+                "O cache configurado é local deste processo: os workers do servidor não "
+                "veriam os mapas. Use um cache compartilhado (CACHE_BACKEND).")
+        zooms = options['zooms']
+        invalidos = [z for z in zooms if not demanda.ZOOM_MIN <= z <= demanda.ZOOM_MAX]
+        if invalidos:
+            raise CommandError(f"Zooms fora de {demanda.ZOOM_MIN}..{demanda.ZOOM_MAX}: {invalidos}")
+        dias = options['dias'] if options['dias'] is not None else settings.DEMANDA_JANELA_DIAS
+        tipos = [None] + [valor for valor, _ in ItemColeta.TIPO_RESIDUO_CHOICES]
+
+        inicio = time.monotonic()
+        total = demanda.precomputar(zooms, tipos, dias)
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} mapas gravados no cache em {time.monotonic() - inicio:.2f}s "
+            f"(zooms {zooms}, {dias} dias)."))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from aplicativo_web import geocoding
+
+
+class Command(BaseCommand):
+    help = "Drena a fila geocode_pendente, preenchendo latitude/longitude dos produtores."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50,
+                            help='Quantidade de itens reservados por rodada.')
+        parser.add_argument('--concorrencia', type=int, default=4,
+                            help='Consultas de geocoding simultâneas.')
+        parser.add_argument('--continuo', action='store_true',
+                            help='Continua rodando como worker, aguardando novos itens.')
+        parser.add_argument('--intervalo', type=float, default=5.0,
+                            help='Segundos de espera quando a fila está vazia (modo contínuo).')
+
+    def handle(self, *args, **options):
+        total_resolvidos = total_falhas = 0
+        while True:
+            resolvidos, falhas, reagendados = geocoding.processar_fila(
+                lote=options['lote'], concorrencia=options['concorrencia'])
+            total_resolvidos += resolvidos
+            total_falhas += falhas
+            if resolvidos or falhas or reagendados:
+                self.stdout.write(
+                    f"Resolvidos: {resolvidos} | Falhas: {falhas} | Reagendados: {reagendados}")
+
+            if resolvidos + falhas + reagendados < options['lote']:
+                if not options['continuo']:
+                    break
+                time.sleep(options['intervalo'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Fila drenada. Resolvidos: {total_resolvidos} | Falhas definitivas: {total_falhas}"))
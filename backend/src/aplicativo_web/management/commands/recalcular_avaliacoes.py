@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from aplicativo_web import avaliacoes
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói nota_avaliacao_atual e total_avaliacoes de produtores e "
+        "coletores a partir do registro de avaliações (avaliacao_coleta). Só "
+        "quem tem avaliações no registro é recalculado; os demais mantêm as "
+        "notas dadas antes do registro existir (ver --zerar-sem-registro)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apenas', choices=['produtores', 'coletores'], default=None,
+                            help='Recalcula só um dos lados (padrão: ambos).')
+        parser.add_argument('--ids', type=int, nargs='+', default=None,
+                            help='Só estes ids de produtor/coletor.')
+        parser.add_argument('--zerar-sem-registro', action='store_true',
+                            help='Zera média e total de quem não tem avaliações no registro '
+                                 '(apaga as notas anteriores ao registro).')
+
+    def handle(self, *args, **options):
+        # avaliador -> quem ele avalia
+        lados = {'produtores': 'coletor', 'coletores': 'produtor'}
+        if options['apenas']:
+            lados = {options['apenas']: lados[options['apenas']]}
+
+        for nome, avaliador in lados.items():
+            inicio = time.monotonic()
+            total = avaliacoes.recalcular(avaliador, options['ids'], options['zerar_sem_registro'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{total} {nome} recalculados em {time.monotonic() - inicio:.2f}s."))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from aplicativo_web import resumo_itens
+from aplicativo_web.models import SolicitacaoColeta
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula o resumo dos itens (qtd_itens, tipos_residuo e totais por "
+        "unidade) guardado em solicitacao_coleta a partir de item_solicitacao. "
+        "Use depois de alterar itens fora da API (admin, SQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+', default=None,
+                            help='Só estas solicitações (padrão: todas).')
+        parser.add_argument('--lote', type=int, default=5000,
+                            help='Solicitações por UPDATE.')
+
+    def handle(self, *args, **options):
+        qs = SolicitacaoColeta.objects.all()
+        if options['ids']:
+            qs = qs.filter(pk__in=options['ids'])
+
+        inicio = time.monotonic()
+        total = resumo_itens.recalcular(qs, lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Resumo de {total} solicitações recalculado em {time.monotonic() - inicio:.2f}s."))
@@ -0,0 +1,77 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aplicativo_web import geo, indice_espacial
+from aplicativo_web.models import Produtor, SolicitacaoColeta
+
+
+def coletas_abertas():
+    return SolicitacaoColeta.objects.filter(status='SOLICITADA')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o índice espacial em memória deste processo (o mantido pelos "
+        "sinais, sem reconstruir) com o banco: conteúdo e resultados de buscas "
+        "por raio/K mais próximos em pontos aleatórios. Rodado sozinho, o índice "
+        "é construído na hora; para verificar um processo em execução chame o "
+        "comando de dentro dele (call_command)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pontos', type=int, default=50)
+        parser.add_argument('--raio', type=float, default=10.0)
+        parser.add_argument('--k', type=int, default=30)
+        parser.add_argument('--semente', type=int, default=None)
+
+    def handle(self, *args, **options):
+        grade = indice_espacial.atual()
+        divergencias = []
+
+        esperado = set(
+            coletas_abertas()
+            .filter(produtor__latitude__isnull=False, produtor__longitude__isnull=False)
+            .values_list('pk', flat=True)
+        )
+        itens = grade.itens()
+        if set(itens) != esperado:
+            faltando = esperado - set(itens)
+            sobrando = set(itens) - esperado
+            divergencias.append(f"conteúdo: {len(faltando)} faltando, {len(sobrando)} sobrando")
+
+        rng = random.Random(options['semente'])
+        coords = list(Produtor.objects.filter(latitude__isnull=False, longitude__isnull=False)
+                      .values_list('latitude', 'longitude')[:10000])
+        amostra = rng.sample(coords, min(options['pontos'], len(coords)))
+        raio, k = options['raio'], options['k']
+
+        for lat, lng in amostra:
+            sql = geo.filtrar_por_raio(coletas_abertas(), lat, lng, raio,
+                                       'produtor__latitude', 'produtor__longitude')
+            ids_sql = set(sql.values_list('pk', flat=True))
+            ids_indice = {pk for _, pk in grade.raio(lat, lng, raio)}
+            if ids_sql != ids_indice:
+                divergencias.append(
+                    f"raio em ({lat}, {lng}): {len(ids_sql ^ ids_indice)} ids diferentes")
+
+            # Compara as distâncias (não os ids) por causa de empates
+            dist_sql = [d for d in (coletas_abertas()
+                                    .filter(produtor__latitude__isnull=False)
+                                    .annotate(distancia_km=geo.distancia_km_sql(
+                                        lat, lng, 'produtor__latitude', 'produtor__longitude'))
+                                    .order_by('distancia_km')
+                                    .values_list('distancia_km', flat=True)[:k])]
+            dist_indice = [d for d, _ in grade.proximos(lat, lng, k)]
+            if len(dist_sql) != len(dist_indice) or any(
+                    abs(a - b) > 1e-6 for a, b in zip(dist_sql, dist_indice)):
+                divergencias.append(f"k-mais-próximos em ({lat}, {lng}) diverge")
+
+        self.stdout.write(
+            f"{len(itens)} coletas no índice, {len(amostra)} pontos verificados "
+            f"(raio {raio} km, k={k}).")
+        if divergencias:
+            for d in divergencias:
+                self.stderr.write(d)
+            raise CommandError(f"{len(divergencias)} divergências encontradas.")
+        self.stdout.write(self.style.SUCCESS("Índice consistente com o banco."))
@@ -0,0 +1,219 @@
+# backend/src/aplicativo_web/metricas.py
+"""Métricas da API no formato texto do Prometheus, sem serviço externo.
+
+Cada processo mantém contadores e histogramas em memória e grava uma cópia
+(JSON) em ``METRICAS_DIRETORIO`` no máximo a cada
+``METRICAS_INTERVALO_GRAVACAO`` segundos. O endpoint ``/api/metrics``, em
+qualquer worker do gunicorn, soma os arquivos de todos os processos (usando o
+estado vivo para o próprio processo). Sem diretório configurado, só o
+processo que atende a requisição é exportado.
+
+Os arquivos levam o pid e o instante de início do processo, então um worker
+reiniciado não sobrescreve o anterior e os contadores nunca diminuem; limpe o
+diretório ao reiniciar o serviço (ex.: no comando de start).
+"""
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+LIMITES_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _chave(rotulos):
+    return json.dumps(rotulos, sort_keys=True, ensure_ascii=False)
+
+
+class Contador:
+    tipo = 'counter'
+
+    def __init__(self, registro, nome, ajuda):
+        self.registro, self.nome, self.ajuda = registro, nome, ajuda
+        self.series = {}
+
+    def inc(self, valor=1, **rotulos):
+        chave = _chave(rotulos)
+        with self.registro.lock:
+            self.series[chave] = self.series.get(chave, 0) + valor
+
+    def copia(self):
+        return dict(self.series)
+
+
+class Histograma:
+    tipo = 'histogram'
+
+    def __init__(self, registro, nome, ajuda, limites=LIMITES_DURACAO):
+        self.registro, self.nome, self.ajuda = registro, nome, ajuda
+        self.limites = tuple(limites)
+        self.series = {}
+
+    def observar(self, valor, **rotulos):
+        chave = _chave(rotulos)
+        with self.registro.lock:
+            serie = self.series.get(chave)
+            if serie is None:
+                serie = self.series[chave] = {'buckets': [0] * len(self.limites), 'soma': 0.0, 'contagem': 0}
+            for i, limite in enumerate(self.limites):
+                if valor <= limite:
+                    serie['buckets'][i] += 1
+            serie['soma'] += valor
+            serie['contagem'] += 1
+
+    def copia(self):
+        return {k: {'buckets': list(v['buckets']), 'soma': v['soma'], 'contagem': v['contagem']}
+                for k, v in self.series.items()}
+
+
+class Registro:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metricas = {}
+        self.inicio = time.time()
+        self._gravado_em = 0.0
+
+    def contador(self, nome, ajuda):
+        return self.metricas.setdefault(nome, Contador(self, nome, ajuda))
+
+    def histograma(self, nome, ajuda, limites=LIMITES_DURACAO):
+        return self.metricas.setdefault(nome, Histograma(self, nome, ajuda, limites))
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                nome: {'tipo': m.tipo, 'ajuda': m.ajuda, 'limites': list(getattr(m, 'limites', ())),
+                       'series': m.copia()}
+                for nome, m in self.metricas.items()
+            }
+
+    # --- Persistência entre processos ---
+
+    def arquivo(self):
+        diretorio = settings.METRICAS_DIRETORIO
+        if not diretorio:
+            return None
+        return Path(diretorio) / f"{os.getpid()}-{int(self.inicio * 1000)}.json"
+
+    def gravar(self, forcar=False):
+        arquivo = self.arquivo()
+        agora = time.monotonic()
+        if arquivo is None or (not forcar and agora - self._gravado_em < settings.METRICAS_INTERVALO_GRAVACAO):
+            return
+        self._gravado_em = agora
+        try:
+            arquivo.parent.mkdir(parents=True, exist_ok=True)
+            temporario = arquivo.with_suffix('.tmp')
+            temporario.write_text(json.dumps(self.snapshot(), ensure_ascii=False))
+            os.replace(temporario, arquivo)
+        except OSError as e:
+            print(f"Erro ao gravar métricas: {e}")
+
+    def agregado(self):
+        """Soma os snapshots de todos os processos (o próprio entra com o estado atual)."""
+        snapshots = [self.snapshot()]
+        proprio = self.arquivo()
+        if proprio is not None and proprio.parent.is_dir():
+            for arquivo in proprio.parent.glob('*.json'):
+                if arquivo == proprio:
+                    continue
+                try:
+                    snapshots.append(json.loads(arquivo.read_text()))
+                except (OSError, ValueError):
+                    continue
+
+        total = {}
+        for snap in snapshots:
+            for nome, m in snap.items():
+                destino = total.setdefault(nome, {'tipo': m['tipo'], 'ajuda': m['ajuda'],
+                                                  'limites': m['limites'], 'series': {}})
+                for chave, valor in m['series'].items():
+                    atual = destino['series'].get(chave)
+                    if m['tipo'] == 'counter':
+                        destino['series'][chave] = (atual or 0) + valor
+                    elif atual is None:
+                        destino['series'][chave] = {'buckets': list(valor['buckets']),
+                                                    'soma': valor['soma'], 'contagem': valor['contagem']}
+                    else:
+                        atual['buckets'] = [a + b for a, b in zip(atual['buckets'], valor['buckets'])]
+                        atual['soma'] += valor['soma']
+                        atual['contagem'] += valor['contagem']
+        return total
+
+
+def _rotulos_texto(rotulos, extra=None):
+    itens = list(rotulos.items()) + list((extra or {}).items())
+    if not itens:
+        return ''
+    partes = []
+    for k, v in itens:
+        v = str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{k}="{v}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def _numero(valor):
+    if isinstance(valor, float) and math.isinf(valor):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exportar(agregado):
+    """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+    linhas = []
+    for nome in sorted(agregado):
+        m = agregado[nome]
+        linhas.append(f"# HELP {nome} {m['ajuda']}")
+        linhas.append(f"# TYPE {nome} {m['tipo']}")
+        for chave in sorted(m['series']):
+            rotulos = json.loads(chave)
+            valor = m['series'][chave]
+            if m['tipo'] == 'counter':
+                linhas.append(f"{nome}{_rotulos_texto(rotulos)} {_numero(valor)}")
+                continue
+            for limite, acumulado in zip(m['limites'], valor['buckets']):
+                linhas.append(f"{nome}_bucket{_rotulos_texto(rotulos, {'le': _numero(float(limite))})} {acumulado}")
+            linhas.append(f"{nome}_bucket{_rotulos_texto(rotulos, {'le': '+Inf'})} {valor['contagem']}")
+            linhas.append(f"{nome}_sum{_rotulos_texto(rotulos)} {_numero(float(valor['soma']))}")
+            linhas.append(f"{nome}_count{_rotulos_texto(rotulos)} {valor['contagem']}")
+    return '\n'.join(linhas) + '\n'
+
+
+registro = Registro()
+atexit.register(registro.gravar, forcar=True)
+
+requisicoes = registro.contador(
+    'reciclaai_http_requisicoes_total', 'Requisições HTTP por rota, método e status.')
+duracao_requisicao = registro.histograma(
+    'reciclaai_http_requisicao_duracao_segundos', 'Duração das requisições HTTP por rota e método.')
+consultas_por_requisicao = registro.histograma(
+    'reciclaai_db_consultas_por_requisicao', 'Consultas SQL por requisição, por rota.', LIMITES_CONSULTAS)
+tempo_db = registro.contador(
+    'reciclaai_db_tempo_segundos_total', 'Tempo gasto em consultas SQL, por rota.')
+geocoder_chamadas = registro.contador(
+    'reciclaai_geocoder_chamadas_total', 'Chamadas ao geocoder remoto por resultado.')
+geocoder_duracao = registro.histograma(
+    'reciclaai_geocoder_duracao_segundos', 'Duração das requisições HTTP ao geocoder.')
+transicoes_status = registro.contador(
+    'reciclaai_solicitacao_transicoes_total', 'Mudanças de status de SolicitacaoColeta (de, para).')
+
+
+class ContadorConsultas:
+    """``execute_wrapper`` que conta as consultas e o tempo gasto no banco."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo += time.perf_counter() - inicio
+            self.consultas += 1
@@ -0,0 +1,90 @@
+# backend/src/aplicativo_web/middleware.py
+
+import cProfile
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.crypto import constant_time_compare
+
+from . import metricas, perfil
+
+
+class MetricasMiddleware:
+    """Conta requisições, latência e consultas SQL por rota (ver ``metricas.py``).
+
+    A rota é o padrão do ``urls.py`` (ex.: ``api/coletas/<int:pk>/status/``),
+    não o caminho, para que ids não virem séries novas.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        consultas = metricas.ContadorConsultas()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(consultas):
+            response = self.get_response(request)
+        duracao = time.perf_counter() - inicio
+
+        match = getattr(request, 'resolver_match', None)
+        rota = match.route if match is not None else 'nao_resolvida'
+        metricas.requisicoes.inc(rota=rota, metodo=request.method, status=response.status_code)
+        metricas.duracao_requisicao.observar(duracao, rota=rota, metodo=request.method)
+        metricas.consultas_por_requisicao.observar(consultas.consultas, rota=rota)
+        metricas.tempo_db.inc(consultas.tempo, rota=rota)
+        metricas.registro.gravar()
+        return response
+
+
+class PerfilMiddleware:
+    """Perfila requisições sob demanda (cProfile + SQL com tempos e duplicadas).
+
+    Perfila quando o header ``X-Perfilar`` ou o parâmetro ``?perfilar=`` traz
+    ``PERFIL_TOKEN``, ou por amostragem (``PERFIL_TAXA_AMOSTRAGEM``). Grava
+    ``<id>.prof`` (pstats) e ``<id>.json`` (resumo) em ``PERFIL_DIRETORIO`` e
+    devolve o resumo nos headers ``X-Perfil-*``. Sem token e sem amostragem o
+    middleware é removido da pilha na inicialização (custo zero).
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERFIL_TOKEN and settings.PERFIL_TAXA_AMOSTRAGEM <= 0:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def deve_perfilar(self, request):
+        token = settings.PERFIL_TOKEN
+        if token:
+            enviado = request.headers.get('X-Perfilar') or request.GET.get('perfilar')
+            if enviado and constant_time_compare(enviado, token):
+                return True
+        taxa = settings.PERFIL_TAXA_AMOSTRAGEM
+        return taxa > 0 and random.random() < taxa
+
+    def __call__(self, request):
+        if not self.deve_perfilar(request):
+            return self.get_response(request)
+
+        consultas = perfil.CapturaConsultas()
+        profiler = cProfile.Profile()
+        inicio = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Outro profiler já ativo nesta thread
+            return self.get_response(request)
+        try:
+            with connection.execute_wrapper(consultas):
+                response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duracao = time.perf_counter() - inicio
+
+        resumo = perfil.gravar(request, response, profiler, consultas, duracao)
+        response['X-Perfil-Id'] = resumo['id']
+        response['X-Perfil-Tempo-Ms'] = f"{resumo['duracao_ms']:.1f}"
+        response['X-Perfil-Consultas'] = str(resumo['sql']['total'])
+        response['X-Perfil-Consultas-Duplicadas'] = str(resumo['sql']['duplicadas'])
+        return response
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicativo_web', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCache',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('chave', models.CharField(max_length=64, unique=True)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('gravado_em', models.DateTimeField(auto_now=True, db_index=True)),
+                ('expira_em', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'db_table': 'geocode_cache',
+            },
+        ),
+    ]
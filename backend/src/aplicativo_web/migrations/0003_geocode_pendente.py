@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def marcar_status_existentes(apps, schema_editor):
+    # Produtores antigos já passaram pelo geocoding síncrono no cadastro
+    Produtor = apps.get_model('aplicativo_web', 'Produtor')
+    Produtor.objects.filter(latitude__isnull=False).update(geocode_status='RESOLVIDO')
+    Produtor.objects.filter(latitude__isnull=True).update(geocode_status='FALHOU')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicativo_web', '0002_geocodecache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='produtor',
+            name='geocode_status',
+            field=models.CharField(choices=[('PENDENTE', 'Pendente'), ('RESOLVIDO', 'Resolvido'), ('FALHOU', 'Falhou')], default='PENDENTE', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='GeocodePendente',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('tentativas', models.IntegerField(default=0)),
+                ('proxima_tentativa', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('produtor', models.OneToOneField(db_column='produtor_id', on_delete=django.db.models.deletion.CASCADE, related_name='geocode_pendente', to='aplicativo_web.produtor')),
+            ],
+            options={
+                'db_table': 'geocode_pendente',
+            },
+        ),
+        migrations.RunPython(marcar_status_existentes, migrations.RunPython.noop),
+    ]
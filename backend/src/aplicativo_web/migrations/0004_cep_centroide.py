@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicativo_web', '0003_geocode_pendente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CepCentroide',
+            fields=[
+                ('prefixo', models.CharField(max_length=8, primary_key=True, serialize=False)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+            ],
+            options={
+                'db_table': 'cep_centroide',
+            },
+        ),
+    ]
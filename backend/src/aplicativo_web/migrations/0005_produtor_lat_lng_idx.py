@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicativo_web', '0004_cep_centroide'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='produtor',
+            index=models.Index(fields=['latitude', 'longitude'], name='produtor_lat_lng_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:32
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+# Preenche o resumo das solicitações existentes (as sem itens ficam com os defaults)
+PREENCHER_RESUMO = """
+UPDATE solicitacao_coleta s
+   SET qtd_itens = r.qtd,
+       tipos_residuo = r.tipos,
+       total_kg = r.kg,
+       total_un = r.un,
+       total_volume = r.volume
+  FROM (SELECT id_solicitacao,
+               count(*) AS qtd,
+               array_agg(DISTINCT tipo_residuo ORDER BY tipo_residuo) AS tipos,
+               coalesce(sum(quantidade) FILTER (WHERE unidade_medida = 'KG'), 0) AS kg,
+               coalesce(sum(quantidade) FILTER (WHERE unidade_medida = 'UN'), 0) AS un,
+               coalesce(sum(quantidade) FILTER (WHERE unidade_medida = 'VOLUME'), 0) AS volume
+          FROM item_solicitacao
+         GROUP BY id_solicitacao) r
+ WHERE r.id_solicitacao = s.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicativo_web', '0005_produtor_lat_lng_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solicitacaocoleta',
+            name='qtd_itens',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='solicitacaocoleta',
+            name='tipos_residuo',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), blank=True, default=list, size=None),
+        ),
+        migrations.AddField(
+            model_name='solicitacaocoleta',
+            name='total_kg',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='solicitacaocoleta',
+            name='total_un',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='solicitacaocoleta',
+            name='total_volume',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddIndex(
+            model_name='solicitacaocoleta',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tipos_residuo'], name='solicitacao_tipos_gin'),
+        ),
+        migrations.RunSQL(PREENCHER_RESUMO, migrations.RunSQL.noop),
+    ]
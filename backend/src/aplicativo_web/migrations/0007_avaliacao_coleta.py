@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicativo_web', '0006_solicitacao_resumo_itens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvaliacaoColeta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('avaliador', models.CharField(choices=[('coletor', 'Coletor'), ('produtor', 'Produtor')], max_length=10)),
+                ('avaliador_id', models.IntegerField()),
+                ('avaliado_id', models.IntegerField()),
+                ('nota', models.DecimalField(decimal_places=2, max_digits=3)),
+                ('comentario', models.TextField(blank=True, null=True)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('coleta', models.ForeignKey(db_column='coleta_id', on_delete=django.db.models.deletion.CASCADE, related_name='avaliacoes', to='aplicativo_web.solicitacaocoleta')),
+            ],
+            options={
+                'db_table': 'avaliacao_coleta',
+                'indexes': [models.Index(fields=['avaliador', 'avaliado_id'], name='avaliacao_avaliado_idx')],
+                'constraints': [models.UniqueConstraint(fields=('coleta', 'avaliador'), name='avaliacao_unica_por_coleta')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:38
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicativo_web', '0007_avaliacao_coleta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoStatusColeta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('de', models.CharField(max_length=55)),
+                ('para', models.CharField(max_length=55)),
+                ('papel', models.CharField(max_length=15)),
+                ('usuario_id', models.IntegerField(blank=True, null=True)),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'evento_status_coleta',
+            },
+        ),
+        # O banco de produção foi criado com uma CHECK que não aceita AGUARDANDO
+        # nem CONCLUIDA (ver bd_sql_recicla_ai); ela é trocada pela do modelo.
+        migrations.RunSQL(
+            'ALTER TABLE solicitacao_coleta DROP CONSTRAINT IF EXISTS solicitacao_coleta_status_check',
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='solicitacaocoleta',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['SOLICITADA', 'ACEITA', 'CANCELADA', 'CONFIRMADA', 'AGUARDANDO', 'CONCLUIDA'])), name='solicitacao_coleta_status_check'),
+        ),
+        migrations.AddField(
+            model_name='eventostatuscoleta',
+            name='coleta',
+            field=models.ForeignKey(db_column='coleta_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='eventos_status', to='aplicativo_web.solicitacaocoleta'),
+        ),
+        migrations.AddIndex(
+            model_name='eventostatuscoleta',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['criado_em'], name='evento_status_criado_brin'),
+        ),
+        migrations.AddIndex(
+            model_name='eventostatuscoleta',
+            index=models.Index(fields=['coleta', 'criado_em'], name='evento_status_coleta_idx'),
+        ),
+    ]
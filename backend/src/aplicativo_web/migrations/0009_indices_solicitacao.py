@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não trava escritas em solicitacao_coleta, mas
+    # não pode rodar dentro de transação
+    atomic = False
+
+    dependencies = [
+        ('aplicativo_web', '0008_estados_coleta'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='solicitacaocoleta',
+            index=models.Index(condition=models.Q(('status', 'SOLICITADA')), fields=['-id'], name='solicitacao_abertas_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='solicitacaocoleta',
+            index=models.Index(fields=['produtor', '-id'], name='solicitacao_produtor_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='solicitacaocoleta',
+            index=models.Index(fields=['coletor', '-id'], name='solicitacao_coletor_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='solicitacaocoleta',
+            index=models.Index(condition=models.Q(('status', 'AGUARDANDO')), fields=['cooperativa', '-id'], name='solicitacao_coop_aguard_idx'),
+        ),
+    ]
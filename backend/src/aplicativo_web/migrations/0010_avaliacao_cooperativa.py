@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicativo_web', '0009_indices_solicitacao'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='avaliacaocoleta',
+            name='avaliador',
+            field=models.CharField(choices=[('coletor', 'Coletor'), ('produtor', 'Produtor'), ('cooperativa', 'Cooperativa')], max_length=11),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:56
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # (produtor, -id) não ganhou nada sobre o índice do FK produtor_id no
+    # benchmark_indices e só encarecia as escritas. DROP INDEX CONCURRENTLY
+    # não pode rodar dentro de transação.
+    atomic = False
+
+    dependencies = [
+        ('aplicativo_web', '0010_avaliacao_cooperativa'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='solicitacaocoleta',
+            name='solicitacao_produtor_id_idx',
+        ),
+    ]
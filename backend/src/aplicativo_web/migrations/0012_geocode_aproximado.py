@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicativo_web', '0011_remove_indice_produtor'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='produtor',
+            name='geocode_status',
+            field=models.CharField(choices=[('PENDENTE', 'Pendente'), ('RESOLVIDO', 'Resolvido'), ('APROXIMADO', 'Aproximado'), ('FALHOU', 'Falhou')], default='PENDENTE', max_length=10),
+        ),
+    ]
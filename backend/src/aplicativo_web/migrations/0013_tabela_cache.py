@@ -0,0 +1,19 @@
+from django.core.management import call_command
+from django.db import migrations
+
+
+def criar_tabela_cache(apps, schema_editor):
+    # Cria a tabela do DatabaseCache configurado em CACHES (não faz nada se o
+    # backend for outro ou se a tabela já existir)
+    call_command('createcachetable', database=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aplicativo_web', '0012_geocode_aproximado'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_tabela_cache, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 # backend/src/aplicativo_web/models.py
 
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
 from django.db import models
 from django.utils import timezone
 
@@ -50,6 +53,14 @@ class Cooperativa(models.Model):
 
 
 class Produtor(models.Model):
+    GEOCODE_STATUS_CHOICES = [
+        ('PENDENTE', 'Pendente'),
+        ('RESOLVIDO', 'Resolvido'),
+        # Só centroide/cache do CEP: o endereço exato não foi encontrado
+        ('APROXIMADO', 'Aproximado'),
+        ('FALHOU', 'Falhou'),
+    ]
+
     id = models.AutoField(primary_key=True)
     nome = models.CharField(max_length=100)
     email = models.CharField(max_length=100, unique=True)
@@ -67,9 +78,14 @@ class Produtor(models.Model):
     nota_avaliacao_atual = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
     total_avaliacoes = models.IntegerField(default=0)
     saldo_pontos = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    geocode_status = models.CharField(max_length=10, choices=GEOCODE_STATUS_CHOICES, default='PENDENTE')
 
     class Meta:
         db_table = "produtor"
+        indexes = [
+            # Pré-filtro de bounding box nas buscas por raio
+            models.Index(fields=['latitude', 'longitude'], name='produtor_lat_lng_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nome} ({self.email})"
@@ -97,6 +113,12 @@ class SolicitacaoColeta(models.Model):
     fim_coleta = models.DateTimeField(default=timezone.now)
     status = models.CharField(max_length=55, choices=STATUS_CHOICES, default='SOLICITADA')
     observacoes = models.CharField(max_length=200, blank=True, null=True)
+    # Resumo dos itens, gravado junto com eles (ver resumo_itens.py)
+    qtd_itens = models.PositiveIntegerField(default=0)
+    tipos_residuo = ArrayField(models.CharField(max_length=50), default=list, blank=True)
+    total_kg = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_un = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_volume = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
     def __str__(self):
         nome_produtor = self.produtor.nome if self.produtor else 'Produtor Desconhecido'
@@ -105,6 +127,24 @@ class SolicitacaoColeta(models.Model):
     class Meta:
         db_table = 'solicitacao_coleta'
         ordering = ['-id']
+        indexes = [
+            # Filtro por tipo de resíduo sem join com item_solicitacao
+            GinIndex(fields=['tipos_residuo'], name='solicitacao_tipos_gin'),
+            # Listagens paginadas por -id (ver benchmark_indices para os planos)
+            models.Index(fields=['-id'], condition=models.Q(status='SOLICITADA'),
+                         name='solicitacao_abertas_idx'),
+            models.Index(fields=['coletor', '-id'], name='solicitacao_coletor_id_idx'),
+            models.Index(fields=['cooperativa', '-id'], condition=models.Q(status='AGUARDANDO'),
+                         name='solicitacao_coop_aguard_idx'),
+        ]
+        constraints = [
+            # Mesmo nome da constraint antiga do banco (só SOLICITADA, ACEITA,
+            # CANCELADA e CONFIRMADA), substituída na migração 0008
+            models.CheckConstraint(
+                condition=models.Q(status__in=['SOLICITADA', 'ACEITA', 'CANCELADA', 'CONFIRMADA',
+                                               'AGUARDANDO', 'CONCLUIDA']),
+                name='solicitacao_coleta_status_check'),
+        ]
 
 
 class ItemColeta(models.Model):
@@ -125,6 +165,65 @@ class ItemColeta(models.Model):
         return f"{self.tipo_residuo} ({self.quantidade} {self.unidade_medida}) - Solicitação #{self.solicitacao.id}"
 
 
+class EventoStatusColeta(models.Model):
+    """Registro (só inserção) de cada mudança de status de uma solicitação.
+
+    Sem FK no banco: o histórico continua disponível depois que a
+    solicitação é excluída. Ver estados.py.
+    """
+    coleta = models.ForeignKey(
+        SolicitacaoColeta, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name='eventos_status', db_column='coleta_id')
+    de = models.CharField(max_length=55)
+    para = models.CharField(max_length=55)
+    papel = models.CharField(max_length=15)
+    usuario_id = models.IntegerField(blank=True, null=True)
+    criado_em = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'evento_status_coleta'
+        indexes = [
+            # Tabela só cresce em ordem de tempo: BRIN é minúsculo e serve às leituras por período
+            BrinIndex(fields=['criado_em'], name='evento_status_criado_brin'),
+            models.Index(fields=['coleta', 'criado_em'], name='evento_status_coleta_idx'),
+        ]
+
+    def __str__(self):
+        return f"Coleta #{self.coleta_id}: {self.de} -> {self.para} ({self.papel})"
+
+
+class AvaliacaoColeta(models.Model):
+    """Registro (só inserção) das avaliações feitas ao fim de uma coleta.
+
+    O coletor avalia o produtor; o produtor e a cooperativa que recebeu a
+    entrega avaliam o coletor. Cada papel avalia uma coleta uma única vez. As médias em Produtor/Coletor são
+    mantidas a partir daqui (ver avaliacoes.py).
+    """
+    AVALIADOR_CHOICES = [('coletor', 'Coletor'), ('produtor', 'Produtor'), ('cooperativa', 'Cooperativa')]
+
+    coleta = models.ForeignKey(
+        SolicitacaoColeta, on_delete=models.CASCADE, related_name='avaliacoes', db_column='coleta_id')
+    avaliador = models.CharField(max_length=11, choices=AVALIADOR_CHOICES)
+    avaliador_id = models.IntegerField()
+    # Produtor (avaliado pelo coletor) ou Coletor (pelo produtor ou cooperativa)
+    avaliado_id = models.IntegerField()
+    nota = models.DecimalField(max_digits=3, decimal_places=2)
+    comentario = models.TextField(blank=True, null=True)
+    criada_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'avaliacao_coleta'
+        constraints = [
+            models.UniqueConstraint(fields=['coleta', 'avaliador'], name='avaliacao_unica_por_coleta'),
+        ]
+        indexes = [
+            models.Index(fields=['avaliador', 'avaliado_id'], name='avaliacao_avaliado_idx'),
+        ]
+
+    def __str__(self):
+        return f"Avaliação {self.nota} de {self.avaliador} na coleta #{self.coleta_id}"
+
+
 class Recompensa(models.Model):
     STATUS_CHOICES = [('ATIVO', 'Ativo'), ('RESGATADO', 'Resgatado')]
     id_recompensa = models.AutoField(primary_key=True)
@@ -152,3 +251,67 @@ class CooperativaMaterial(models.Model):
 
     def __str__(self):
         return f"{self.cooperativa} - {self.tipo_residuo}: {self.preco_oferecido}"
+
+
+class GeocodeCache(models.Model):
+    """Cache persistente de geocoding (ver ``geocoding.py``).
+
+    ``chave`` é ``end:<sha1 do endereço normalizado>`` ou ``cep:<dígitos>``.
+    """
+    id = models.AutoField(primary_key=True)
+    chave = models.CharField(max_length=64, unique=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    gravado_em = models.DateTimeField(auto_now=True, db_index=True)
+    expira_em = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'geocode_cache'
+
+    def __str__(self):
+        return f"{self.chave} -> ({self.latitude}, {self.longitude})"
+
+    @classmethod
+    def remover_excedentes(cls):
+        """Apaga entradas expiradas e, acima do limite, as mais antigas."""
+        cls.objects.filter(expira_em__lte=timezone.now()).delete()
+        limite = settings.GEOCODE_CACHE_MAX_ENTRADAS
+        corte = list(cls.objects.order_by('-gravado_em')
+                     .values_list('gravado_em', flat=True)[limite:limite + 1])
+        if corte:
+            cls.objects.filter(gravado_em__lte=corte[0]).delete()
+
+
+class GeocodePendente(models.Model):
+    """Fila (no banco) de produtores aguardando geocoding em segundo plano.
+
+    Drenada por ``manage.py processar_geocodes``; ver ``geocoding.processar_fila``.
+    """
+    id = models.AutoField(primary_key=True)
+    produtor = models.OneToOneField(
+        Produtor, on_delete=models.CASCADE, related_name='geocode_pendente', db_column='produtor_id')
+    tentativas = models.IntegerField(default=0)
+    proxima_tentativa = models.DateTimeField(default=timezone.now, db_index=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'geocode_pendente'
+
+    def __str__(self):
+        return f"Geocode pendente: produtor #{self.produtor_id} ({self.tentativas} tentativas)"
+
+
+class CepCentroide(models.Model):
+    """Centroide aproximado de um prefixo de CEP (carregado por ``manage.py carregar_ceps``).
+
+    Consultado por ``ceps.aproximar`` antes de qualquer geocoding remoto.
+    """
+    prefixo = models.CharField(max_length=8, primary_key=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    class Meta:
+        db_table = 'cep_centroide'
+
+    def __str__(self):
+        return f"{self.prefixo} -> ({self.latitude}, {self.longitude})"
@@ -0,0 +1,37 @@
+# backend/src/aplicativo_web/paginacao.py
+"""Paginação por cursor (keyset) das listagens.
+
+O cursor guarda o último ``id`` da página e a próxima página é buscada com
+``WHERE id < :ultimo ORDER BY id DESC LIMIT n``, que usa a chave primária e
+custa o mesmo em qualquer profundidade (ao contrário do OFFSET). Os cursores
+são opacos (base64) e continuam válidos quando novas linhas são inseridas.
+
+Resposta paginada: ``{"next": <url|null>, "previous": <url|null>, "results": [...]}``.
+
+Compatibilidade: com ``PAGINACAO_COMPATIVEL`` ligado (padrão), requisições
+sem ``cursor`` nem ``page_size`` continuam recebendo a lista completa, como
+o frontend atual espera. Desligue quando todos os clientes paginarem.
+"""
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class CursorPorId(CursorPagination):
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        self.page_size = settings.PAGINACAO_TAMANHO_PAGINA
+        self.max_page_size = settings.PAGINACAO_TAMANHO_MAXIMO
+        return super().get_page_size(request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (settings.PAGINACAO_COMPATIVEL
+                and self.cursor_query_param not in params and self.page_size_query_param not in params):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class CursorPorIdCrescente(CursorPorId):
+    ordering = 'id'
@@ -0,0 +1,90 @@
+# backend/src/aplicativo_web/perfil.py
+"""Captura de SQL e gravação dos perfis feitos pelo ``PerfilMiddleware``."""
+import json
+import pstats
+import re
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+
+class CapturaConsultas:
+    """``execute_wrapper`` que guarda cada consulta com o tempo gasto."""
+
+    def __init__(self):
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append({
+                'sql': sql,
+                'parametros': repr(params)[:200],
+                'duracao_ms': round((time.perf_counter() - inicio) * 1000, 3),
+            })
+
+
+def funcoes_mais_caras(profiler, limite):
+    """As ``limite`` funções com maior tempo acumulado."""
+    estatisticas = pstats.Stats(profiler).stats
+    linhas = []
+    for (arquivo, linha, funcao), (_, chamadas, proprio, acumulado, _) in estatisticas.items():
+        linhas.append({
+            'funcao': f"{arquivo}:{linha}({funcao})",
+            'chamadas': chamadas,
+            'tempo_proprio_ms': round(proprio * 1000, 3),
+            'tempo_acumulado_ms': round(acumulado * 1000, 3),
+        })
+    linhas.sort(key=lambda l: l['tempo_acumulado_ms'], reverse=True)
+    return linhas[:limite]
+
+
+def resumo_sql(consultas):
+    """Totais e consultas repetidas (mesmo SQL; sinal típico de N+1)."""
+    repeticoes = Counter(c['sql'] for c in consultas)
+    duplicadas = [
+        {'sql': sql, 'vezes': vezes,
+         'duracao_total_ms': round(sum(c['duracao_ms'] for c in consultas if c['sql'] == sql), 3)}
+        for sql, vezes in repeticoes.most_common() if vezes > 1
+    ]
+    return {
+        'total': len(consultas),
+        'duracao_total_ms': round(sum(c['duracao_ms'] for c in consultas), 3),
+        'duplicadas': sum(d['vezes'] - 1 for d in duplicadas),
+        'repetidas': duplicadas,
+        'consultas': consultas,
+    }
+
+
+def gravar(request, response, profiler, consultas, duracao):
+    """Grava ``<id>.prof`` e ``<id>.json`` em ``PERFIL_DIRETORIO`` e devolve o resumo."""
+    match = getattr(request, 'resolver_match', None)
+    rota = match.route if match is not None else request.path
+    identificador = "{}-{}-{}-{}".format(
+        time.strftime('%Y%m%d-%H%M%S'), request.method,
+        re.sub(r'[^A-Za-z0-9]+', '_', rota).strip('_')[:60] or 'raiz', uuid.uuid4().hex[:8])
+
+    resumo = {
+        'id': identificador,
+        'metodo': request.method,
+        'caminho': request.get_full_path(),
+        'rota': rota,
+        'status': response.status_code,
+        'duracao_ms': round(duracao * 1000, 3),
+        'funcoes': funcoes_mais_caras(profiler, settings.PERFIL_FUNCOES_NO_RESUMO),
+        'sql': resumo_sql(consultas.consultas),
+    }
+
+    diretorio = Path(settings.PERFIL_DIRETORIO)
+    try:
+        diretorio.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(diretorio / f"{identificador}.prof"))
+        (diretorio / f"{identificador}.json").write_text(json.dumps(resumo, ensure_ascii=False, indent=2))
+    except OSError as e:
+        print(f"Erro ao gravar perfil da requisição: {e}")
+    return resumo
@@ -1,56 +1,50 @@
 # backend/src/aplicativo_web/permissions.py
 
-from rest_framework import permissions
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework import exceptions, permissions
 
-class IsProdutor(permissions.BasePermission):
-    message = "Acesso negado. Token inválido, expirado ou usuário não é um Produtor."
+
+class PapelPermission(permissions.BasePermission):
+    """Exige um token válido (ver ``authentication.py``) de um ``user_type`` específico.
+
+    Não decodifica o token: usa o principal que a autenticação já colocou em
+    ``request.user``.
+    """
+    papel = None
+    nome_papel = None
 
     def has_permission(self, request, view):
-        print("\n--- Verificando permissão IsProdutor ---") 
-        auth_header = request.headers.get('Authorization')
-        print(f"Cabeçalho Authorization recebido: {auth_header}")
-
-        #Pegar o token manualmente do header
-        if not auth_header or not auth_header.startswith('Bearer '):
-            print("DEBUG: Cabeçalho Authorization ausente ou mal formatado.")
-            self.message = "Credenciais de autenticação (token Bearer) não fornecidas ou mal formatadas."
+        usuario = request.user
+        if not getattr(usuario, 'is_authenticated', False) or not hasattr(usuario, 'user_type'):
+            erro = getattr(request, 'auth_erro', None)
+            if erro:
+                raise exceptions.NotAuthenticated(f"Token inválido ou expirado: {erro}")
+            raise exceptions.NotAuthenticated(
+                "Credenciais de autenticação (token Bearer) não fornecidas ou mal formatadas.")
+
+        if self.papel is not None and usuario.user_type != self.papel:
+            self.message = f"Acesso permitido apenas para usuários {self.nome_papel}."
             return False
+        return True
 
-        # Pega a parte do token DEPOIS de "Bearer "
-        raw_token = auth_header.split(' ')[1] 
-        print(f"DEBUG: Token extraído: {raw_token[:10]}...") # Mostra só o início do token
-
-        jwt_authenticator = JWTAuthentication()
-
-        try:
-            print("DEBUG: Tentando validar o token extraído...") 
-            validated_token = jwt_authenticator.get_validated_token(raw_token)
-            print("DEBUG: Token validado com sucesso.") 
-
-            payload = validated_token.payload
-            user_type = payload.get('user_type')
-            user_id = payload.get('user_id') 
-            print(f"DEBUG: Payload do token: user_id={user_id}, user_type={user_type}") 
-
-            is_produtor = user_type == 'produtor'
-            print(f"DEBUG: É produtor? {is_produtor}") 
-
-            if is_produtor and user_id is not None:
-                request.auth_payload = payload 
-                print("DEBUG: Permissão CONCEDIDA.") 
-                return True 
-            else:
-                 print("DEBUG: Permissão NEGADA (Não é produtor ou falta user_id).") 
-                 self.message = "Acesso permitido apenas para usuários Produtores."
-                 return False 
-
-        except (InvalidToken, TokenError) as e:
-            print(f"DEBUG: Erro de Token: {e}") 
-            self.message = f"Token inválido ou expirado: {e}"
-            return False
-        except Exception as e:
-            print(f"DEBUG: Erro inesperado na permissão: {e}") 
-            self.message = "Erro interno ao verificar permissão."
-            return False
\ No newline at end of file
+
+class IsProdutor(PapelPermission):
+    papel = 'produtor'
+    nome_papel = 'Produtores'
+    message = "Acesso negado. Token inválido, expirado ou usuário não é um Produtor."
+
+
+class IsColetor(PapelPermission):
+    papel = 'coletor'
+    nome_papel = 'Coletores'
+    message = "Acesso negado. Token inválido, expirado ou usuário não é um Coletor."
+
+
+class IsCooperativa(PapelPermission):
+    papel = 'cooperativa'
+    nome_papel = 'Cooperativas'
+    message = "Acesso negado. Token inválido, expirado ou usuário não é uma Cooperativa."
+
+
+class IsUsuario(PapelPermission):
+    """Qualquer produtor, coletor ou cooperativa autenticado."""
+    message = "Acesso negado. Token inválido ou expirado."
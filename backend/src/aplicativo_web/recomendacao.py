@@ -0,0 +1,154 @@
+# backend/src/aplicativo_web/recomendacao.py
+"""Ranking de cooperativas para uma coleta, por distância e preço oferecido.
+
+Mantém em memória uma matriz ``cooperativa × material`` com o
+``preco_oferecido`` (NaN onde a cooperativa não compra o material) e os
+vetores de latitude/longitude das cooperativas. O ranking de uma coleta é
+calculado de forma vetorizada com NumPy, sem consultas por cooperativa.
+
+A matriz é invalidada por sinais de ``Cooperativa``/``CooperativaMaterial``
+(``signals.py``) e, para enxergar escritas de outros workers, reconstruída a
+cada ``RECOMENDACAO_MATRIZ_TTL`` segundos.
+"""
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .geo import RAIO_TERRA_KM
+
+
+class MatrizPrecos:
+    def __init__(self, ids, nomes, latitudes, longitudes, materiais, precos):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.nomes = list(nomes)
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.materiais = list(materiais)
+        self.precos = np.asarray(precos, dtype=np.float64).reshape(len(self.ids), len(self.materiais))
+
+    @classmethod
+    def do_banco(cls):
+        from .models import Cooperativa, CooperativaMaterial, ItemColeta
+
+        materiais = [valor for valor, _ in ItemColeta.TIPO_RESIDUO_CHOICES]
+        coops = list(Cooperativa.objects.order_by('id').values_list('id', 'nome_empresa', 'latitude', 'longitude'))
+        indice = {c[0]: i for i, c in enumerate(coops)}
+        coluna = {m: j for j, m in enumerate(materiais)}
+
+        precos = np.full((len(coops), len(materiais)), np.nan)
+        for coop_id, tipo, preco in CooperativaMaterial.objects.values_list(
+                'cooperativa_id', 'tipo_residuo', 'preco_oferecido').iterator(chunk_size=5000):
+            if coop_id in indice and tipo in coluna:
+                precos[indice[coop_id], coluna[tipo]] = float(preco)
+
+        return cls(
+            ids=[c[0] for c in coops],
+            nomes=[c[1] for c in coops],
+            latitudes=[np.nan if c[2] is None else c[2] for c in coops],
+            longitudes=[np.nan if c[3] is None else c[3] for c in coops],
+            materiais=materiais,
+            precos=precos,
+        )
+
+    def distancias_km(self, lat, lng):
+        """Distância haversine vetorizada de ``(lat, lng)`` a todas as cooperativas (NaN sem coordenadas)."""
+        p1 = np.radians(lat)
+        p2 = np.radians(self.latitudes)
+        dlat = p2 - p1
+        dlng = np.radians(self.longitudes - lng)
+        a = np.sin(dlat / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlng / 2) ** 2
+        return 2 * RAIO_TERRA_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+    def ranquear(self, quantidades, lat=None, lng=None, peso_distancia=0.5, peso_valor=0.5, limite=10):
+        """Ordena as cooperativas para uma coleta.
+
+        ``quantidades`` é ``{material: quantidade}`` (kg). O score combina, com
+        os pesos informados, o valor estimado normalizado (preço × quantidade)
+        e a proximidade normalizada; cooperativas que não compram nenhum dos
+        materiais da coleta ficam de fora.
+        """
+        if not len(self.ids):
+            return []
+
+        q = np.array([float(quantidades.get(m, 0)) for m in self.materiais])
+        pedidos = np.array([m in quantidades for m in self.materiais])
+        aceitos = ~np.isnan(self.precos)
+
+        valor = np.where(aceitos, self.precos, 0.0) @ q
+        n_pedidos = max(int(pedidos.sum()), 1)
+        cobertura = (aceitos & pedidos).sum(axis=1) / n_pedidos
+        candidatos = cobertura > 0
+
+        valor_max = valor[candidatos].max() if candidatos.any() else 0.0
+        valor_norm = valor / valor_max if valor_max > 0 else np.zeros_like(valor)
+
+        if lat is not None and lng is not None:
+            dist = self.distancias_km(lat, lng)
+            conhecidas = candidatos & ~np.isnan(dist)
+            dist_max = dist[conhecidas].max() if conhecidas.any() else 0.0
+            proximidade = np.where(np.isnan(dist), 0.0,
+                                   1.0 - dist / dist_max if dist_max > 0 else 1.0)
+        else:
+            dist = np.full(len(self.ids), np.nan)
+            proximidade = np.zeros(len(self.ids))
+            peso_distancia = 0.0
+
+        soma_pesos = peso_distancia + peso_valor
+        if soma_pesos <= 0:
+            soma_pesos, peso_valor = 1.0, 1.0
+        score = (peso_valor * valor_norm + peso_distancia * proximidade) / soma_pesos
+
+        ordem = np.flatnonzero(candidatos)
+        ordem = ordem[np.lexsort((np.nan_to_num(dist[ordem], nan=np.inf), -score[ordem]))][:limite]
+
+        resultado = []
+        for i in ordem:
+            resultado.append({
+                'cooperativa_id': int(self.ids[i]),
+                'nome_empresa': self.nomes[i],
+                'score': round(float(score[i]), 4),
+                'distancia_km': None if np.isnan(dist[i]) else round(float(dist[i]), 3),
+                'valor_estimado': round(float(valor[i]), 2),
+                'cobertura': round(float(cobertura[i]), 4),
+                'precos': {m: float(self.precos[i, j])
+                           for j, m in enumerate(self.materiais) if aceitos[i, j]},
+            })
+        return resultado
+
+
+_matriz = None
+_construida_em = 0.0
+_lock = threading.Lock()
+
+
+def matriz():
+    global _matriz, _construida_em
+    agora = time.monotonic()
+    if _matriz is not None and agora - _construida_em < settings.RECOMENDACAO_MATRIZ_TTL:
+        return _matriz
+    with _lock:
+        if _matriz is None or agora - _construida_em >= settings.RECOMENDACAO_MATRIZ_TTL:
+            _matriz = MatrizPrecos.do_banco()
+            _construida_em = agora
+    return _matriz
+
+
+def invalidar():
+    global _matriz
+    with _lock:
+        _matriz = None
+
+
+def quantidades_da_coleta(coleta):
+    """``{tipo_residuo: kg}`` dos itens da coleta, em uma consulta.
+
+    Os preços são por kg; itens em UN/VOLUME entram com 0 kg, contando só
+    para a cobertura de materiais.
+    """
+    from django.db.models import Q, Sum
+
+    linhas = coleta.itens.values('tipo_residuo').annotate(
+        kg=Sum('quantidade', filter=Q(unidade_medida='KG')))
+    return {linha['tipo_residuo']: float(linha['kg'] or 0) for linha in linhas}
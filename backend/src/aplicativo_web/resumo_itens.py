@@ -0,0 +1,80 @@
+# backend/src/aplicativo_web/resumo_itens.py
+"""Resumo dos itens guardado na própria ``SolicitacaoColeta``.
+
+Colunas: ``qtd_itens``, ``tipos_residuo`` (tipos distintos, em ordem
+alfabética) e ``total_kg``/``total_un``/``total_volume``. São gravadas junto
+com os itens na criação da solicitação; as listagens leem só a tabela
+``solicitacao_coleta`` e o filtro por tipo usa o índice GIN de
+``tipos_residuo``.
+
+Quem alterar itens por outro caminho (admin, SQL) deve rodar
+``manage.py recalcular_resumo_itens``, que usa ``recalcular``.
+"""
+from decimal import Decimal
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+# unidade_medida -> coluna com o total
+CAMPOS_TOTAL = {'KG': 'total_kg', 'UN': 'total_un', 'VOLUME': 'total_volume'}
+
+
+def calcular(itens):
+    """Campos do resumo a partir dos itens (dicts validados ou ``ItemColeta``)."""
+    tipos = set()
+    totais = {campo: Decimal('0') for campo in CAMPOS_TOTAL.values()}
+    quantidade = 0
+    for item in itens:
+        if not isinstance(item, dict):
+            item = {'tipo_residuo': item.tipo_residuo, 'quantidade': item.quantidade,
+                    'unidade_medida': item.unidade_medida}
+        quantidade += 1
+        tipos.add(item.get('tipo_residuo', 'Plástico'))
+        campo = CAMPOS_TOTAL.get(item.get('unidade_medida', 'UN'))
+        if campo:
+            totais[campo] += Decimal(str(item.get('quantidade') or 0))
+    return {'qtd_itens': quantidade, 'tipos_residuo': sorted(tipos), **totais}
+
+
+def expressoes():
+    """Expressões (subconsultas correlacionadas) que recalculam o resumo no UPDATE."""
+    from .models import ItemColeta
+
+    itens = ItemColeta.objects.filter(solicitacao=OuterRef('pk')).order_by().values('solicitacao')
+
+    def agregado(expressao, vazio):
+        return Coalesce(Subquery(itens.annotate(v=expressao).values('v')), vazio)
+
+    decimal = models.DecimalField(max_digits=12, decimal_places=2)
+    campos = {
+        'qtd_itens': agregado(Count('id_item'), Value(0)),
+        'tipos_residuo': agregado(
+            ArrayAgg('tipo_residuo', distinct=True, ordering='tipo_residuo'),
+            Value([], output_field=ArrayField(models.CharField(max_length=50)))),
+    }
+    for unidade, campo in CAMPOS_TOTAL.items():
+        campos[campo] = agregado(
+            Sum('quantidade', filter=Q(unidade_medida=unidade), output_field=decimal),
+            Value(Decimal('0'), output_field=decimal))
+    return campos
+
+
+def recalcular(queryset=None, lote=5000):
+    """Recalcula o resumo das solicitações de ``queryset`` (todas por padrão).
+
+    Um UPDATE a cada ``lote`` ids, para não segurar locks na tabela
+    inteira. Devolve o número de linhas atualizadas.
+    """
+    from .models import SolicitacaoColeta
+
+    queryset = (queryset if queryset is not None else SolicitacaoColeta.objects.all()).order_by()
+    campos = expressoes()
+    ids = list(queryset.values_list('pk', flat=True).order_by('pk'))
+    total = 0
+    for inicio in range(0, len(ids), lote):
+        faixa = ids[inicio:inicio + lote]
+        total += SolicitacaoColeta.objects.filter(pk__in=faixa).update(**campos)
+    return total
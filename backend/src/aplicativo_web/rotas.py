@@ -0,0 +1,206 @@
+# backend/src/aplicativo_web/rotas.py
+"""Ordem de visita das coletas de um coletor (rota com várias paradas).
+
+Monta uma matriz de distâncias haversine com NumPy e resolve o caminho com
+vizinho mais próximo seguido de melhorias 2-opt. A origem (posição do
+coletor) e o destino (cooperativa) são opcionais: quando ausentes, entram
+como nós fictícios com distância zero para todos, o que deixa o início ou o
+fim do caminho livres.
+
+Janelas ``inicio_coleta``/``fim_coleta`` são respeitadas quando possível: a
+chegada antes do início espera, e cada hora de atraso após o fim custa
+``penalidade_km_por_hora`` km no objetivo.
+"""
+import numpy as np
+
+from .geo import RAIO_TERRA_KM
+
+
+def matriz_distancias(latitudes, longitudes):
+    """Matriz ``n x n`` de distâncias haversine (km)."""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lng = np.radians(np.asarray(longitudes, dtype=np.float64))
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+class PlanejadorRota:
+    """Caminho de ``D[0]`` até ``D[-1]`` passando por todos os demais nós.
+
+    ``D`` já inclui origem e destino (fictícios ou não). ``inicios``/``fins``
+    são as janelas em horas a partir da partida (NaN = sem janela).
+    """
+
+    def __init__(self, D, inicios=None, fins=None, velocidade_kmh=25.0,
+                 atendimento_h=10 / 60, penalidade_km_por_hora=60.0):
+        self.D = np.asarray(D, dtype=np.float64)
+        n = len(self.D)
+        self.inicios = np.full(n, np.nan) if inicios is None else np.asarray(inicios, dtype=np.float64)
+        self.fins = np.full(n, np.nan) if fins is None else np.asarray(fins, dtype=np.float64)
+        self.com_janelas = bool(np.any(~np.isnan(self.fins)))
+        # Listas Python: o laço de horários é sequencial e fica mais rápido sem escalares NumPy
+        self._linhas = self.D.tolist()
+        self._inicios = self.inicios.tolist()
+        self._fins = self.fins.tolist()
+        self.velocidade_kmh = velocidade_kmh
+        self.atendimento_h = atendimento_h
+        self.penalidade = penalidade_km_por_hora
+
+    def distancia(self, rota):
+        rota = np.asarray(rota)
+        return float(self.D[rota[:-1], rota[1:]].sum())
+
+    def horarios(self, rota):
+        """Chegadas e atrasos (horas desde a partida) de cada nó da rota."""
+        rota = [int(no) for no in rota]
+        chegadas = [0.0] * len(rota)
+        atrasos = [0.0] * len(rota)
+        linhas, inicios, fins = self._linhas, self._inicios, self._fins
+        t = 0.0
+        for k in range(1, len(rota)):
+            no = rota[k]
+            t += linhas[rota[k - 1]][no] / self.velocidade_kmh
+            if t < inicios[no]:
+                t = inicios[no]
+            chegadas[k] = t
+            if t > fins[no]:
+                atrasos[k] = t - fins[no]
+            t += self.atendimento_h
+        return chegadas, atrasos
+
+    def custo(self, rota):
+        if not self.com_janelas:
+            return self.distancia(rota)
+        return self.distancia(rota) + self.penalidade * sum(self.horarios(rota)[1])
+
+    def vizinho_mais_proximo(self):
+        n = len(self.D)
+        rota = [0]
+        livres = np.ones(n, dtype=bool)
+        livres[[0, n - 1]] = False
+        t = 0.0
+        atual = 0
+        for _ in range(n - 2):
+            candidatos = np.flatnonzero(livres)
+            passo = self.D[atual, candidatos]
+            escore = passo
+            if self.com_janelas:
+                chegada = np.maximum(t + passo / self.velocidade_kmh,
+                                     np.nan_to_num(self.inicios[candidatos], nan=-np.inf))
+                atraso = np.maximum(0.0, chegada - np.nan_to_num(self.fins[candidatos], nan=np.inf))
+                escore = passo + self.penalidade * atraso
+            k = int(np.argmin(escore))
+            proximo = int(candidatos[k])
+            if self.com_janelas:
+                t = float(chegada[k]) + self.atendimento_h
+            rota.append(proximo)
+            livres[proximo] = False
+            atual = proximo
+        rota.append(n - 1)
+        return np.array(rota)
+
+    def dois_opt(self, rota, max_iteracoes=5000, candidatos_por_iteracao=20):
+        """Inverte trechos ``rota[i..j]`` enquanto houver ganho (extremos fixos).
+
+        O ganho em distância de todos os pares ``(i, j)`` é calculado de uma
+        vez; com janelas, os ``candidatos_por_iteracao`` pares de menor
+        acréscimo de distância são conferidos no custo completo.
+        """
+        rota = np.array(rota)
+        m = len(rota)
+        if m < 4:
+            return rota
+        D = self.D
+        idx = np.arange(1, m - 1)
+        triangulo = np.triu(np.ones((m - 2, m - 2), dtype=bool), k=1)
+        custo_atual = self.custo(rota)
+        for _ in range(max_iteracoes):
+            ant, ini = rota[idx - 1], rota[idx]
+            fim, prox = rota[idx], rota[idx + 1]
+            delta = (D[ant[:, None], fim[None, :]] + D[ini[:, None], prox[None, :]]
+                     - D[ant, ini][:, None] - D[fim, prox][None, :])
+            delta = np.where(triangulo, delta, np.inf)
+
+            melhorou = False
+            if not self.com_janelas:
+                plano = int(np.argmin(delta))
+                if delta.flat[plano] < -1e-9:
+                    i, j = np.unravel_index(plano, delta.shape)
+                    rota[i + 1:j + 2] = rota[i + 1:j + 2][::-1]
+                    melhorou = True
+            else:
+                # Inclui trocas que aumentam a distância: podem reduzir atrasos
+                k = min(candidatos_por_iteracao, delta.size)
+                ordem = np.argpartition(delta, k - 1, axis=None)[:k]
+                ordem = ordem[np.argsort(delta.flat[ordem])]
+                for plano in ordem:
+                    if not np.isfinite(delta.flat[plano]):
+                        break
+                    i, j = np.unravel_index(plano, delta.shape)
+                    nova = rota.copy()
+                    nova[i + 1:j + 2] = nova[i + 1:j + 2][::-1]
+                    custo = self.custo(nova)
+                    if custo < custo_atual - 1e-9:
+                        rota, custo_atual, melhorou = nova, custo, True
+                        break
+            if not melhorou:
+                break
+        return rota
+
+    def resolver(self):
+        return self.dois_opt(self.vizinho_mais_proximo())
+
+
+def planejar(paradas, origem=None, destino=None, partida=None, **opcoes):
+    """Ordena ``paradas`` e devolve ``(ordem, distancias, chegadas_h, atrasos_h, total_km)``.
+
+    ``paradas`` é uma lista de dicts com ``latitude``, ``longitude`` e,
+    opcionalmente, ``inicio``/``fim`` (datetimes). ``origem``/``destino`` são
+    ``(lat, lng)`` ou ``None``. ``ordem`` indexa ``paradas``; as listas de
+    distância (trecho anterior), chegada e atraso seguem essa ordem.
+    """
+    pontos = len(paradas)
+    if pontos == 0:
+        return [], [], [], [], 0.0
+    # Nó 0 = origem, nós 1..n = paradas, nó n+1 = destino; os ausentes ficam
+    # com distância zero para todos.
+    D = np.zeros((pontos + 2, pontos + 2))
+    nos_lat = [p['latitude'] for p in paradas]
+    nos_lng = [p['longitude'] for p in paradas]
+    posicoes = list(range(1, pontos + 1))
+    if origem is not None:
+        nos_lat.insert(0, origem[0])
+        nos_lng.insert(0, origem[1])
+        posicoes.insert(0, 0)
+    if destino is not None:
+        nos_lat.append(destino[0])
+        nos_lng.append(destino[1])
+        posicoes.append(pontos + 1)
+    parcial = matriz_distancias(nos_lat, nos_lng)
+    posicoes = np.array(posicoes)
+    D[np.ix_(posicoes, posicoes)] = parcial
+
+    inicios = np.full(pontos + 2, np.nan)
+    fins = np.full(pontos + 2, np.nan)
+    if partida is not None:
+        for i, p in enumerate(paradas):
+            ini, fim = p.get('inicio'), p.get('fim')
+            # Janelas já encerradas ou degeneradas não orientam a ordem
+            if ini is None or fim is None or fim <= ini or fim <= partida:
+                continue
+            inicios[i + 1] = (ini - partida).total_seconds() / 3600
+            fins[i + 1] = (fim - partida).total_seconds() / 3600
+
+    planejador = PlanejadorRota(D, inicios, fins, **opcoes)
+    rota = planejador.resolver()
+    chegadas, atrasos = planejador.horarios(rota)
+
+    ordem, trechos, chegadas_h, atrasos_h = [], [], [], []
+    for k in range(1, len(rota) - 1):
+        ordem.append(int(rota[k]) - 1)
+        trechos.append(float(D[rota[k - 1], rota[k]]))
+        chegadas_h.append(float(chegadas[k]))
+        atrasos_h.append(float(atrasos[k]))
+    return ordem, trechos, chegadas_h, atrasos_h, planejador.distancia(rota)
@@ -0,0 +1,88 @@
+# backend/src/aplicativo_web/senhas.py
+"""Hash e verificação das senhas de produtores, coletores e cooperativas.
+
+As senhas usam os hashers do Django (``PASSWORD_HASHERS``). O primeiro é
+``PBKDF2AjustavelHasher``: o mesmo formato ``pbkdf2_sha256`` do Django, mas
+com o número de iterações lido de ``SENHA_PBKDF2_ITERACOES``. Assim o custo
+é ajustado por ambiente e, quando muda, o hash é refeito no próximo login
+(``must_update``). Senhas antigas em texto puro também são convertidas no
+primeiro login bem-sucedido.
+
+A verificação roda num pool de ``SENHA_VERIFICACAO_THREADS`` threads
+(``hashlib.pbkdf2_hmac`` libera o GIL), limitando quantos hashes são
+calculados ao mesmo tempo no processo. Acima disso, até
+``SENHA_VERIFICACAO_FILA`` logins esperam; os demais recebem
+``SobrecargaVerificacao`` em vez de disputar CPU com as outras requisições.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher, check_password, get_hasher, identify_hasher, make_password,
+)
+from django.utils.crypto import constant_time_compare
+
+
+class PBKDF2AjustavelHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.SENHA_PBKDF2_ITERACOES
+
+
+class SobrecargaVerificacao(Exception):
+    """Pool de verificação e fila cheios."""
+
+
+def gerar_hash(senha):
+    return make_password(senha)
+
+
+def verificar(senha, armazenada):
+    """Devolve ``(confere, precisa_atualizar)`` comparando ``senha`` com o valor do banco."""
+    if not armazenada:
+        return False, False
+    try:
+        hasher = identify_hasher(armazenada)
+    except ValueError:
+        # Registro anterior aos hashes: texto puro
+        return constant_time_compare(senha, armazenada), True
+    confere = check_password(senha, armazenada)
+    precisa_atualizar = confere and (
+        hasher.algorithm != get_hasher().algorithm or hasher.must_update(armazenada))
+    return confere, precisa_atualizar
+
+
+_pool = None
+_vagas = None
+_lock = threading.Lock()
+
+
+def _executor():
+    global _pool, _vagas
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                threads = settings.SENHA_VERIFICACAO_THREADS
+                _vagas = threading.BoundedSemaphore(threads + settings.SENHA_VERIFICACAO_FILA)
+                _pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='senhas')
+    return _pool, _vagas
+
+
+def verificar_em_pool(senha, armazenada):
+    """``verificar`` executado no pool limitado; ``SobrecargaVerificacao`` se não houver vaga."""
+    pool, vagas = _executor()
+    if not vagas.acquire(timeout=settings.SENHA_VERIFICACAO_ESPERA):
+        raise SobrecargaVerificacao()
+    try:
+        return pool.submit(verificar, senha, armazenada).result()
+    finally:
+        vagas.release()
+
+
+def reiniciar_pool():
+    global _pool, _vagas
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = _vagas = None
@@ -1,24 +1,26 @@
 # backend/src/aplicativo_web/serializers.py
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
 import re
 from .models import Produtor, Coletor, Cooperativa, SolicitacaoColeta, ItemColeta
 from .models import CooperativaMaterial
-import requests
+from . import avaliacoes, ceps, geocoding, indice_espacial, metricas, resumo_itens, senhas
 
 # --- Função de geocoding (retorna dict de lat/lng em vez de Point GIS) ---
 
 
 def geocode_address(rua, numero, bairro, cidade, estado, cep):
-    endereco = f"{rua} {numero}, {bairro}, {cidade}, {estado}, {cep}, Brasil"
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {"q": endereco, "format": "json", "limit": 1}
-    r = requests.get(url, params=params, headers={"User-Agent": "ReciclaAi"})
-    if r.status_code != 200 or len(r.json()) == 0:
-        return None
-    dados = r.json()[0]
-    lat = float(dados["lat"])
-    lon = float(dados["lon"])
-    return {"latitude": lat, "longitude": lon}
+    return geocoding.geocode(rua, numero, bairro, cidade, estado, cep)
+
+
+def preencher_coordenadas_aproximadas(validated_data):
+    """Usa o centroide offline do CEP (sem I/O de rede) como coordenada inicial."""
+    coords = ceps.aproximar(validated_data.get("cep"))
+    if coords:
+        validated_data["latitude"] = coords["latitude"]
+        validated_data["longitude"] = coords["longitude"]
 
 # --- Serializers de Registro (Atualizados para novos campos) ---
 
@@ -29,7 +31,7 @@ class ProdutorRegistrationSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'nome', 'email', 'senha', 'telefone', 'cpf_cnpj',
             'cep', 'rua', 'numero', 'bairro', 'cidade', 'estado', 'saldo_pontos',
-            'nota_avaliacao_atual', 'total_avaliacoes'
+            'nota_avaliacao_atual', 'total_avaliacoes', 'geocode_status'
         ]
         extra_kwargs = {
             'senha': {'write_only': True},
@@ -37,11 +39,20 @@ class ProdutorRegistrationSerializer(serializers.ModelSerializer):
             'nota_avaliacao_atual': {'read_only': True},
             'total_avaliacoes': {'read_only': True},
             'saldo_pontos': {'read_only': True},
+            'geocode_status': {'read_only': True},
         }
 
     def create(self, validated_data):
         try:
-            endereco_info = geocode_address(
+            if settings.GEOCODE_ASSINCRONO:
+                # Coordenada aproximada já no cadastro; o worker da fila refina depois
+                preencher_coordenadas_aproximadas(validated_data)
+                with transaction.atomic():
+                    produtor = super().create(validated_data)
+                    geocoding.enfileirar_produtor(produtor)
+                return produtor
+
+            endereco_info, exato = geocoding.resolver(
                 validated_data.get("rua"),
                 validated_data.get("numero"),
                 validated_data.get("bairro"),
@@ -52,6 +63,9 @@ class ProdutorRegistrationSerializer(serializers.ModelSerializer):
             if endereco_info:
                 validated_data["latitude"] = endereco_info["latitude"]
                 validated_data["longitude"] = endereco_info["longitude"]
+                validated_data["geocode_status"] = 'RESOLVIDO' if exato else 'APROXIMADO'
+            else:
+                validated_data["geocode_status"] = 'FALHOU'
             return super().create(validated_data)
         except Exception as e:
             raise serializers.ValidationError({'detail': str(e)})
@@ -61,6 +75,9 @@ class ProdutorRegistrationSerializer(serializers.ModelSerializer):
             return value
         return re.sub(r"\D", "", str(value))
 
+    def validate_senha(self, value):
+        return senhas.gerar_hash(value)
+
 
 class ColetorRegistrationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -78,6 +95,7 @@ class ColetorRegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         try:
+            preencher_coordenadas_aproximadas(validated_data)
             return super().create(validated_data)
         except Exception as e:
             raise serializers.ValidationError({'detail': str(e)})
@@ -87,6 +105,9 @@ class ColetorRegistrationSerializer(serializers.ModelSerializer):
             return value
         return re.sub(r"\D", "", str(value))
 
+    def validate_senha(self, value):
+        return senhas.gerar_hash(value)
+
 
 class CooperativaRegistrationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -102,6 +123,7 @@ class CooperativaRegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         try:
+            preencher_coordenadas_aproximadas(validated_data)
             return super().create(validated_data)
         except Exception as e:
             raise serializers.ValidationError({'detail': str(e)})
@@ -111,6 +133,9 @@ class CooperativaRegistrationSerializer(serializers.ModelSerializer):
             return value
         return re.sub(r"\D", "", str(value))
 
+    def validate_senha(self, value):
+        return senhas.gerar_hash(value)
+
 
 # --- Serializer de Login ---
 class LoginSerializer(serializers.Serializer):
@@ -125,6 +150,40 @@ class ItemColetaSerializer(serializers.ModelSerializer):
         fields = ['tipo_residuo', 'quantidade', 'unidade_medida']
 
 
+# --- Serializer para CRIAR Solicitações em lote ---
+class SolicitacaoColetaLoteSerializer(serializers.ListSerializer):
+    """Cria todas as solicitações num INSERT e todos os itens em outro.
+
+    ``bulk_create`` não dispara ``post_save``: o índice espacial e a métrica de
+    transições são atualizados aqui.
+    """
+
+    def create(self, validated_data):
+        pares = []
+        for dados in validated_data:
+            dados = dict(dados)
+            itens_data = dados.pop('itens')
+            pares.append((SolicitacaoColeta(**dados, **resumo_itens.calcular(itens_data)), itens_data))
+        solicitacoes = [solicitacao for solicitacao, _ in pares]
+
+        try:
+            with transaction.atomic():
+                SolicitacaoColeta.objects.bulk_create(solicitacoes)
+                ItemColeta.objects.bulk_create([
+                    ItemColeta(solicitacao=solicitacao, **item_data)
+                    for solicitacao, itens_data in pares for item_data in itens_data
+                ])
+        except Exception as e:
+            raise serializers.ValidationError(
+                {'detail': f'Erro ao criar solicitações: {str(e)}'})
+
+        for solicitacao in solicitacoes:
+            produtor = solicitacao.produtor
+            indice_espacial.atualizar(solicitacao.pk, solicitacao.status, produtor.latitude, produtor.longitude)
+            metricas.transicoes_status.inc(de='NOVA', para=solicitacao.status)
+        return solicitacoes
+
+
 # --- Serializer para CRIAR Solicitação ---
 class SolicitacaoColetaCreateSerializer(serializers.ModelSerializer):
     itens = ItemColetaSerializer(many=True)
@@ -134,13 +193,17 @@ class SolicitacaoColetaCreateSerializer(serializers.ModelSerializer):
         fields = ['inicio_coleta', 'fim_coleta', 'observacoes', 'itens']
         extra_kwargs = {'observacoes': {'required': False,
                                         'allow_null': True, 'allow_blank': True}}
+        list_serializer_class = SolicitacaoColetaLoteSerializer
 
     def create(self, validated_data):
         try:
             itens_data = validated_data.pop('itens')
-            solicitacao = SolicitacaoColeta.objects.create(**validated_data)
-            for item_data in itens_data:
-                ItemColeta.objects.create(solicitacao=solicitacao, **item_data)
+            # Solicitação, resumo e itens entram juntos ou nada entra
+            with transaction.atomic():
+                solicitacao = SolicitacaoColeta.objects.create(
+                    **validated_data, **resumo_itens.calcular(itens_data))
+                ItemColeta.objects.bulk_create(
+                    [ItemColeta(solicitacao=solicitacao, **item_data) for item_data in itens_data])
             return solicitacao
         except Exception as e:
             raise serializers.ValidationError(
@@ -151,8 +214,8 @@ class SolicitacaoColetaCreateSerializer(serializers.ModelSerializer):
 class SolicitacaoColetaListSerializer(serializers.ModelSerializer):
     coletor_nome = serializers.CharField(
         source='coletor.nome', read_only=True, allow_null=True)
-    itens_count = serializers.SerializerMethodField()
-    tipos = serializers.SerializerMethodField()
+    itens_count = serializers.IntegerField(source='qtd_itens', read_only=True)
+    tipos = serializers.ListField(source='tipos_residuo', child=serializers.CharField(), read_only=True)
     status_display = serializers.CharField(
         source='get_status_display', read_only=True)
 
@@ -172,18 +235,26 @@ class SolicitacaoColetaListSerializer(serializers.ModelSerializer):
         fields = [
             'solicitacao', 'id', 'inicio_coleta', 'fim_coleta', 'status',
             'status_display', 'coletor_nome', 'itens_count', 'tipos',
-            'observacoes', 'produtor'
+            'total_kg', 'total_un', 'total_volume', 'observacoes', 'produtor'
         ]
         read_only_fields = fields
 
-    def get_itens_count(self, obj):
-        return obj.itens.count()
+    @classmethod
+    def preparar_queryset(cls, queryset):
+        """Forma do queryset que o serializer espera, sem consultas por linha.
 
-    def get_tipos(self, obj):
-        try:
-            return list(obj.itens.values_list('tipo_residuo', flat=True))
-        except Exception:
-            return []
+        Produtor e coletor vêm no mesmo SELECT; contagem e tipos dos itens são
+        colunas da própria solicitação (ver resumo_itens.py).
+        """
+        return queryset.select_related('produtor', 'coletor')
+
+
+class SolicitacaoColetaProximaSerializer(SolicitacaoColetaListSerializer):
+    """Listagem por proximidade: inclui a distância calculada no SQL."""
+    distancia_km = serializers.FloatField(read_only=True)
+
+    class Meta(SolicitacaoColetaListSerializer.Meta):
+        fields = SolicitacaoColetaListSerializer.Meta.fields + ['distancia_km']
 
 
 class SolicitacaoColetaDetailSerializer(SolicitacaoColetaListSerializer):
@@ -193,6 +264,12 @@ class SolicitacaoColetaDetailSerializer(SolicitacaoColetaListSerializer):
         # Extende os campos do serializer de listagem para incluir 'itens'
         fields = SolicitacaoColetaListSerializer.Meta.fields + ['itens']
 
+    @classmethod
+    def preparar_queryset(cls, queryset):
+        # Os itens de todas as linhas chegam numa única consulta extra
+        return super().preparar_queryset(queryset).prefetch_related(
+            Prefetch('itens', queryset=ItemColeta.objects.order_by('id_item')))
+
 
 class CooperativaMaterialSerializer(serializers.ModelSerializer):
     class Meta:
@@ -220,16 +297,12 @@ class AvaliacaoProdutorSerializer(serializers.Serializer):
 
     def save(self):
         coleta = self.validated_data['coleta_obj']
-        nota_nova = self.validated_data['nota']
-        produtor = coleta.produtor
-        total_atual = produtor.total_avaliacoes
-        media_atual = produtor.nota_avaliacao_atual
-        nova_media = ((float(media_atual) * total_atual) +
-                      float(nota_nova)) / (total_atual + 1)
-        produtor.nota_avaliacao_atual = nova_media
-        produtor.total_avaliacoes += 1
-        produtor.save()
-        return produtor
+        try:
+            return avaliacoes.registrar(
+                coleta, 'coletor', coleta.coletor_id, coleta.produtor_id,
+                self.validated_data['nota'], self.validated_data.get('comentario'))
+        except avaliacoes.AvaliacaoDuplicada:
+            raise serializers.ValidationError({'detail': 'Esta coleta já foi avaliada pelo coletor.'})
 
 class AvaliacaoColetorSerializer(serializers.Serializer):
     coleta_id = serializers.IntegerField(required=True)
@@ -258,22 +331,15 @@ class AvaliacaoColetorSerializer(serializers.Serializer):
         data["coleta_obj"] = coleta
         return data
 
-    def save(self):
-        coleta = self.validated_data["coleta_obj"]
-        nota_nova = self.validated_data["nota"]
-        coletor = coleta.coletor
-
-        # Lógica de Cálculo da Média Ponderada
-        # (Média Atual * Total Atual + Nova Nota) / (Total Atual + 1)
-        total_atual = coletor.total_avaliacoes
-        media_atual = coletor.nota_avaliacao_atual
-
-        nova_media = ((float(media_atual) * total_atual) + float(nota_nova)) / (
-            total_atual + 1
-        )
-
-        coletor.nota_avaliacao_atual = nova_media
-        coletor.total_avaliacoes += 1
-        coletor.save()
+    # papel do avaliador -> como aparece na mensagem de avaliação repetida
+    AVALIADORES = {"produtor": "pelo produtor", "cooperativa": "pela cooperativa"}
 
-        return coletor
\ No newline at end of file
+    def save(self, avaliador, avaliador_id):
+        coleta = self.validated_data["coleta_obj"]
+        try:
+            return avaliacoes.registrar(
+                coleta, avaliador, avaliador_id, coleta.coletor_id,
+                self.validated_data["nota"], self.validated_data.get("comentario"))
+        except avaliacoes.AvaliacaoDuplicada:
+            raise serializers.ValidationError(
+                {"detail": f"Esta coleta já foi avaliada {self.AVALIADORES[avaliador]}."})
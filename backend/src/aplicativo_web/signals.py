@@ -0,0 +1,44 @@
+# backend/src/aplicativo_web/signals.py
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import indice_espacial, metricas, recomendacao
+from .models import Cooperativa, CooperativaMaterial, SolicitacaoColeta
+
+
+@receiver(post_save, sender=SolicitacaoColeta)
+def atualizar_indice_espacial(sender, instance, **kwargs):
+    # Sem índice construído neste processo não há o que manter (e evita buscar o produtor)
+    if not indice_espacial.construido():
+        return
+    produtor = instance.produtor
+    indice_espacial.atualizar(instance.pk, instance.status, produtor.latitude, produtor.longitude)
+
+
+@receiver(post_init, sender=SolicitacaoColeta)
+def guardar_status_carregado(sender, instance, **kwargs):
+    # __dict__ para não disparar consulta quando o campo foi adiado (only/defer)
+    instance._status_carregado = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=SolicitacaoColeta)
+def contar_transicao_de_status(sender, instance, created, **kwargs):
+    anterior = 'NOVA' if created else getattr(instance, '_status_carregado', None)
+    atual = instance.__dict__.get('status')
+    if anterior is not None and atual is not None and anterior != atual:
+        metricas.transicoes_status.inc(de=anterior, para=atual)
+    instance._status_carregado = atual
+
+
+@receiver(post_delete, sender=SolicitacaoColeta)
+def remover_do_indice_espacial(sender, instance, **kwargs):
+    indice_espacial.remover(instance.pk)
+
+
+@receiver(post_save, sender=Cooperativa)
+@receiver(post_delete, sender=Cooperativa)
+@receiver(post_save, sender=CooperativaMaterial)
+@receiver(post_delete, sender=CooperativaMaterial)
+def invalidar_matriz_de_precos(sender, **kwargs):
+    recomendacao.invalidar()
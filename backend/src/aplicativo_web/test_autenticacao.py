@@ -0,0 +1,64 @@
+# backend/src/aplicativo_web/test_autenticacao.py
+
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import authentication
+from .models import Coletor, Cooperativa, CooperativaMaterial
+
+
+def token(user_id, user_type):
+    refresh = RefreshToken()
+    refresh['user_id'] = user_id
+    refresh['user_type'] = user_type
+    return str(refresh.access_token)
+
+
+class TokenPayloadAuthenticationTest(TestCase):
+    def setUp(self):
+        authentication.limpar_cache_tokens()
+        self.addCleanup(authentication.limpar_cache_tokens)
+        self.client = APIClient()
+        self.coletor = Coletor.objects.create(nome="C", email="c@example.com", senha="x", cpf="1")
+        self.cooperativa = Cooperativa.objects.create(
+            nome_empresa="Coop", email="coop@example.com", senha="x", cnpj="1")
+        CooperativaMaterial.objects.create(cooperativa=self.cooperativa, tipo_residuo='Metal',
+                                           preco_oferecido=2)
+
+    def test_token_validado_uma_vez_e_reaproveitado(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(self.cooperativa.pk, "cooperativa")}')
+        validar = mock.patch.object(JWTAuthentication, 'get_validated_token',
+                                    autospec=True, side_effect=JWTAuthentication.get_validated_token)
+
+        with validar as chamado:
+            for _ in range(3):
+                resp = self.client.get('/api/cooperativa/interesses/')
+                self.assertEqual(resp.status_code, 200)
+
+        self.assertEqual(chamado.call_count, 1)
+        self.assertEqual(resp.json()['interesses'][0]['tipo_residuo'], 'Metal')
+
+    def test_papel_errado_e_proibido(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(self.coletor.pk, "coletor")}')
+
+        resp = self.client.get('/api/cooperativa/interesses/')
+
+        self.assertEqual(resp.status_code, 403)
+        self.assertEqual(resp.json()['detail'], 'Acesso permitido apenas para usuários Cooperativas.')
+
+    def test_sem_token_ou_token_invalido(self):
+        self.assertEqual(self.client.get('/api/coletor/perfil/').status_code, 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer invalido')
+        resp = self.client.get('/api/coletor/perfil/')
+        self.assertEqual(resp.status_code, 401)
+        self.assertTrue(resp.json()['detail'].startswith('Token inválido ou expirado'))
+
+    def test_token_invalido_nao_bloqueia_rotas_publicas(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer invalido')
+
+        self.assertEqual(self.client.get('/api/coletas/disponiveis/').status_code, 200)
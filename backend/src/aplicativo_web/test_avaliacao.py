@@ -1,9 +1,14 @@
 # backend/src/aplicativo_web/test_avaliacao.py
 
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import Produtor, Coletor, SolicitacaoColeta
+from . import avaliacoes
+from .models import AvaliacaoColeta, Produtor, Coletor, Cooperativa, SolicitacaoColeta
+from .test_autenticacao import token
 from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
 from decimal import Decimal
@@ -93,4 +98,75 @@ class AvaliacaoProdutorTest(TestCase):
         # Esperado: (5 + 3) / 2 = 4.0
         self.produtor.refresh_from_db()
         self.assertEqual(self.produtor.total_avaliacoes, 2)
-        self.assertEqual(self.produtor.nota_avaliacao_atual, Decimal('4.00'))
\ No newline at end of file
+        self.assertEqual(self.produtor.nota_avaliacao_atual, Decimal('4.00'))
+
+class RegistroAvaliacoesTest(TestCase):
+    def setUp(self):
+        self.produtor = Produtor.objects.create(nome="P", email="p@teste.com", senha="1", cpf_cnpj="1")
+        self.coletor = Coletor.objects.create(nome="C", email="c@teste.com", senha="1", cpf="1")
+        self.coletas = [
+            SolicitacaoColeta.objects.create(produtor=self.produtor, coletor=self.coletor, status="CONCLUIDA")
+            for _ in range(3)
+        ]
+
+    def test_registra_comentario_e_atualiza_media(self):
+        for coleta, nota in zip(self.coletas, ('5', '4', '2')):
+            avaliacoes.registrar(coleta, 'coletor', self.coletor.pk, self.produtor.pk, Decimal(nota), 'ok')
+
+        self.produtor.refresh_from_db()
+        self.assertEqual((self.produtor.total_avaliacoes, self.produtor.nota_avaliacao_atual), (3, Decimal('3.67')))
+        self.assertEqual(AvaliacaoColeta.objects.filter(comentario='ok').count(), 3)
+
+    def test_uma_avaliacao_por_coleta_e_papel(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(self.produtor.pk, "produtor")}')
+        payload = {"coleta_id": self.coletas[0].pk, "nota": 4, "comentario": "Pontual"}
+        self.assertEqual(client.post('/api/avaliar/coletor/', payload, format='json').status_code, 200)
+
+        resp = client.post('/api/avaliar/coletor/', payload, format='json')
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('pelo produtor', str(resp.json()))
+        self.coletor.refresh_from_db()
+        self.assertEqual(self.coletor.total_avaliacoes, 1)
+        # O outro papel ainda pode avaliar a mesma coleta
+        avaliacoes.registrar(self.coletas[0], 'coletor', self.coletor.pk, self.produtor.pk, Decimal('1'))
+
+    def test_cooperativa_avalia_o_coletor(self):
+        cooperativa = Cooperativa.objects.create(nome_empresa="Coop", email="coop@teste.com", senha="1", cnpj="1")
+        outra = Cooperativa.objects.create(nome_empresa="Outra", email="outra@teste.com", senha="1", cnpj="2")
+        SolicitacaoColeta.objects.filter(pk=self.coletas[0].pk).update(cooperativa=cooperativa)
+        client = APIClient()
+        payload = {"coleta_id": self.coletas[0].pk, "nota": 5}
+
+        self.assertEqual(client.post('/api/avaliar/coletor/', payload, format='json').status_code, 401)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(outra.pk, "cooperativa")}')
+        self.assertEqual(client.post('/api/avaliar/coletor/', payload, format='json').status_code, 403)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(cooperativa.pk, "cooperativa")}')
+        self.assertEqual(client.post('/api/avaliar/coletor/', payload, format='json').status_code, 200)
+
+        avaliacao = AvaliacaoColeta.objects.get()
+        self.assertEqual((avaliacao.avaliador, avaliacao.avaliador_id, avaliacao.avaliado_id),
+                         ('cooperativa', cooperativa.pk, self.coletor.pk))
+        self.assertIn('pela cooperativa', str(client.post('/api/avaliar/coletor/', payload, format='json').json()))
+
+    def test_recalcular_a_partir_do_registro(self):
+        legado = Produtor.objects.create(nome="L", email="l@teste.com", senha="1", cpf_cnpj="2",
+                                         nota_avaliacao_atual=4, total_avaliacoes=7)
+        avaliacoes.registrar(self.coletas[0], 'produtor', self.produtor.pk, self.coletor.pk, Decimal('5'))
+        avaliacoes.registrar(self.coletas[1], 'produtor', self.produtor.pk, self.coletor.pk, Decimal('2'))
+        avaliacoes.registrar(self.coletas[1], 'cooperativa', 1, self.coletor.pk, Decimal('2'))
+        Coletor.objects.filter(pk=self.coletor.pk).update(nota_avaliacao_atual=1, total_avaliacoes=9)
+
+        call_command('recalcular_avaliacoes', stdout=StringIO())
+
+        self.coletor.refresh_from_db()
+        legado.refresh_from_db()
+        self.assertEqual((self.coletor.total_avaliacoes, self.coletor.nota_avaliacao_atual), (3, Decimal('3.00')))
+        # Sem avaliações no registro: mantém as notas anteriores a ele
+        self.assertEqual((legado.total_avaliacoes, legado.nota_avaliacao_atual), (7, Decimal('4.00')))
+
+        call_command('recalcular_avaliacoes', apenas='produtores', zerar_sem_registro=True, stdout=StringIO())
+
+        legado.refresh_from_db()
+        self.assertEqual((legado.total_avaliacoes, legado.nota_avaliacao_atual), (0, Decimal('0')))
@@ -0,0 +1,258 @@
+# backend/src/aplicativo_web/test_coletas.py
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from . import resumo_itens
+from .models import Coletor, Cooperativa, ItemColeta, Produtor, SolicitacaoColeta
+from .test_autenticacao import token
+
+
+class DisponiveisPorRaioTest(TestCase):
+    url = '/api/coletas/disponiveis/'
+
+    def setUp(self):
+        self.client = APIClient()
+        # Centro de Teresina e pontos a ~1 km, ~5 km e ~300 km de distância
+        pontos = [(-5.0892, -42.8019), (-5.0982, -42.8019), (-5.1342, -42.8019), (-7.7, -42.8)]
+        self.coletas = []
+        for i, (lat, lng) in enumerate(pontos):
+            produtor = Produtor.objects.create(
+                nome=f"P{i}", email=f"p{i}@example.com", senha="x", cpf_cnpj=str(i),
+                latitude=lat, longitude=lng)
+            self.coletas.append(SolicitacaoColeta.objects.create(produtor=produtor))
+        SolicitacaoColeta.objects.filter(pk=self.coletas[1].pk).update(status='ACEITA')
+
+    def test_filtra_pelo_raio_e_ordena_pela_distancia(self):
+        resp = self.client.get(self.url, {'lat': -5.0892, 'lng': -42.8019, 'radius_km': 10})
+
+        self.assertEqual(resp.status_code, 200)
+        ids = [c['id'] for c in resp.json()]
+        self.assertEqual(ids, [self.coletas[0].id, self.coletas[2].id])
+        self.assertAlmostEqual(resp.json()[1]['distancia_km'], 5.0, delta=0.1)
+
+    def test_limite(self):
+        resp = self.client.get(self.url, {'lat': -5.0892, 'lng': -42.8019, 'radius_km': 500, 'limite': 2})
+
+        self.assertEqual([c['id'] for c in resp.json()], [self.coletas[0].id, self.coletas[2].id])
+
+    def test_sem_localizacao_mantem_listagem_completa(self):
+        resp = self.client.get(self.url)
+
+        self.assertEqual(len(resp.json()), 3)
+        self.assertNotIn('distancia_km', resp.json()[0])
+
+    def test_parametros_invalidos(self):
+        resp = self.client.get(self.url, {'lat': 'abc', 'lng': -42.8})
+
+        self.assertEqual(resp.status_code, 400)
+
+
+class ConsultasPorListagemTest(TestCase):
+    """As listagens fazem o mesmo número de consultas com 1 ou N solicitações.
+
+    Listagens resumidas leem só solicitacao_coleta (+ join de produtor/coletor);
+    as detalhadas fazem uma consulta a mais para os itens.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.coletor = Coletor.objects.create(nome="C", email="c@example.com", senha="x", cpf="1")
+        self.cooperativa = Cooperativa.objects.create(
+            nome_empresa="Coop", email="coop@example.com", senha="x", cnpj="1")
+        self.produtor = Produtor.objects.create(
+            nome="P", email="p@example.com", senha="x", cpf_cnpj="1", latitude=-5.0892, longitude=-42.8019)
+
+    def criar(self, quantidade, **campos):
+        for _ in range(quantidade):
+            coleta = SolicitacaoColeta.objects.create(produtor=self.produtor, **campos)
+            ItemColeta.objects.create(solicitacao=coleta, tipo_residuo='Metal', quantidade=1)
+            ItemColeta.objects.create(solicitacao=coleta, tipo_residuo='Papel', quantidade=2)
+        resumo_itens.recalcular()
+
+    def assertConsultasConstantes(self, url, consultas, **campos):
+        self.criar(1, **campos)
+        with self.assertNumQueries(consultas):
+            self.assertEqual(len(self.client.get(url).json()), 1)
+        self.criar(9, **campos)
+        with self.assertNumQueries(consultas):
+            resp = self.client.get(url)
+        self.assertEqual(len(resp.json()), 10)
+        return resp.json()
+
+    def test_disponiveis(self):
+        dados = self.assertConsultasConstantes('/api/coletas/disponiveis/', 1)
+
+        self.assertEqual(dados[0]['itens_count'], 2)
+        self.assertEqual(dados[0]['tipos'], ['Metal', 'Papel'])
+        self.assertEqual(dados[0]['produtor']['nome'], 'P')
+
+    def test_disponiveis_por_raio(self):
+        self.criar(3)
+        with self.assertNumQueries(1):
+            resp = self.client.get('/api/coletas/disponiveis/', {'lat': -5.09, 'lng': -42.8, 'radius_km': 5})
+        self.assertEqual([c['itens_count'] for c in resp.json()], [2, 2, 2])
+
+    def test_minhas_do_produtor(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(self.produtor.pk, "produtor")}')
+        self.assertConsultasConstantes('/api/coletas/minhas/', 1)
+
+    def test_minhas_do_coletor(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(self.coletor.pk, "coletor")}')
+        dados = self.assertConsultasConstantes(
+            '/api/coletas/minhas_coletor/', 2, coletor=self.coletor, status='ACEITA')
+
+        self.assertEqual(dados[0]['coletor_nome'], 'C')
+        self.assertEqual([i['tipo_residuo'] for i in dados[0]['itens']], ['Metal', 'Papel'])
+
+    def test_entregas_pendentes_da_cooperativa(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(self.cooperativa.pk, "cooperativa")}')
+        self.assertConsultasConstantes(
+            '/api/coletas/pendentes_cooperativa/', 2, cooperativa=self.cooperativa, status='AGUARDANDO')
+
+    def test_detalhe(self):
+        self.criar(1)
+        coleta = SolicitacaoColeta.objects.get()
+        with self.assertNumQueries(2):
+            resp = self.client.get(f'/api/coletas/{coleta.pk}/')
+        self.assertEqual(resp.json()['itens_count'], 2)
+
+    def test_associar_cooperativa(self):
+        self.criar(1)
+        coleta = SolicitacaoColeta.objects.get()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(self.coletor.pk, "coletor")}')
+        url = f'/api/coletas/{coleta.pk}/associar_cooperativa/'
+
+        # Cooperativa existe? + UPDATE + solicitação com joins + itens
+        with self.assertNumQueries(4):
+            resp = self.client.patch(url, {'cooperativa_id': self.cooperativa.pk}, format='json')
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['itens_count'], 2)
+        self.assertEqual(SolicitacaoColeta.objects.get().cooperativa_id, self.cooperativa.pk)
+        self.assertEqual(self.client.patch('/api/coletas/999999/associar_cooperativa/',
+                                           {'cooperativa_id': self.cooperativa.pk}, format='json').status_code, 404)
+
+
+class ResumoItensTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.produtor = Produtor.objects.create(nome="P", email="p@example.com", senha="x", cpf_cnpj="1")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(self.produtor.pk, "produtor")}')
+
+    def test_resumo_gravado_com_os_itens(self):
+        resp = self.client.post('/api/coletas/solicitar/', {'itens': [
+            {'tipo_residuo': 'Papel', 'quantidade': '2.5', 'unidade_medida': 'KG'},
+            {'tipo_residuo': 'Metal', 'quantidade': '1.5', 'unidade_medida': 'KG'},
+            {'tipo_residuo': 'Papel', 'quantidade': '3', 'unidade_medida': 'UN'},
+        ]}, format='json')
+
+        self.assertEqual(resp.status_code, 201, resp.content)
+        coleta = SolicitacaoColeta.objects.get()
+        self.assertEqual((coleta.qtd_itens, coleta.tipos_residuo), (3, ['Metal', 'Papel']))
+        self.assertEqual((coleta.total_kg, coleta.total_un, coleta.total_volume), (4, 3, 0))
+
+    def test_recalcular_corrige_resumo_desatualizado(self):
+        com_itens = SolicitacaoColeta.objects.create(produtor=self.produtor, qtd_itens=9, tipos_residuo=['Vidro'])
+        ItemColeta.objects.create(solicitacao=com_itens, tipo_residuo='Metal', quantidade=2, unidade_medida='VOLUME')
+        sem_itens = SolicitacaoColeta.objects.create(produtor=self.produtor, qtd_itens=1, total_kg=5)
+
+        self.assertEqual(resumo_itens.recalcular(lote=1), 2)
+
+        com_itens.refresh_from_db()
+        sem_itens.refresh_from_db()
+        self.assertEqual((com_itens.qtd_itens, com_itens.tipos_residuo, com_itens.total_volume), (1, ['Metal'], 2))
+        self.assertEqual((sem_itens.qtd_itens, sem_itens.tipos_residuo, sem_itens.total_kg), (0, [], 0))
+
+
+@override_settings(SOLICITACAO_LOTE_MAXIMO=20)
+class SolicitacaoEmLoteTest(TestCase):
+    url = '/api/coletas/solicitar/lote/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.produtor = Produtor.objects.create(nome="P", email="p@example.com", senha="x", cpf_cnpj="1")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(self.produtor.pk, "produtor")}')
+
+    def lote(self, quantidade):
+        return [{'observacoes': f'Bloco {i}', 'itens': [
+            {'tipo_residuo': 'Papel', 'quantidade': '2', 'unidade_medida': 'KG'},
+            {'tipo_residuo': 'Vidro', 'quantidade': '1', 'unidade_medida': 'UN'},
+        ]} for i in range(quantidade)]
+
+    def test_cria_lote_com_numero_constante_de_consultas(self):
+        with CaptureQueriesContext(connection) as poucas:
+            resp = self.client.post(self.url, self.lote(2), format='json')
+        self.assertEqual(resp.status_code, 201, resp.content)
+        with CaptureQueriesContext(connection) as muitas:
+            resp = self.client.post(self.url, self.lote(15), format='json')
+
+        self.assertEqual(resp.status_code, 201, resp.content)
+        self.assertEqual(len(poucas), len(muitas))
+        self.assertEqual(SolicitacaoColeta.objects.count(), 17)
+        self.assertEqual(ItemColeta.objects.count(), 34)
+        self.assertEqual(resp.json()[0]['tipos'], ['Papel', 'Vidro'])
+        self.assertTrue(all(c['status'] == 'SOLICITADA' for c in resp.json()))
+
+    def test_erros_por_entrada_e_nada_gravado(self):
+        lote = self.lote(3)
+        lote[1]['itens'][0]['tipo_residuo'] = 'Madeira'
+
+        resp = self.client.post(self.url, lote, format='json')
+
+        self.assertEqual(resp.status_code, 400)
+        erros = resp.json()['erros']
+        self.assertEqual((erros[0], erros[2]), ({}, {}))
+        self.assertIn('tipo_residuo', erros[1]['itens'][0])
+        self.assertFalse(SolicitacaoColeta.objects.exists())
+
+    def test_limite_do_lote(self):
+        resp = self.client.post(self.url, self.lote(21), format='json')
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.client.post(self.url, [], format='json').status_code, 400)
+
+
+@override_settings(PAGINACAO_TAMANHO_PAGINA=2, PAGINACAO_TAMANHO_MAXIMO=3)
+class PaginacaoPorCursorTest(TestCase):
+    url = '/api/coletas/disponiveis/'
+
+    def setUp(self):
+        self.client = APIClient()
+        produtor = Produtor.objects.create(nome="P", email="p@example.com", senha="x", cpf_cnpj="1",
+                                           latitude=-5.0892, longitude=-42.8019)
+        self.ids = sorted((SolicitacaoColeta.objects.create(produtor=produtor).pk for _ in range(5)),
+                          reverse=True)
+
+    def paginas(self, params):
+        ids, url = [], self.url
+        while url:
+            dados = self.client.get(url, params).json()
+            ids.append([c['id'] for c in dados['results']])
+            url, params = dados['next'], None
+        return ids
+
+    def test_percorre_as_paginas_pelo_cursor(self):
+        self.assertEqual(self.paginas({'page_size': 2}),
+                         [self.ids[:2], self.ids[2:4], self.ids[4:]])
+
+    def test_tamanho_maximo(self):
+        self.assertEqual(len(self.client.get(self.url, {'page_size': 50}).json()['results']), 3)
+
+    def test_compatibilidade_sem_parametros_devolve_lista(self):
+        self.assertEqual([c['id'] for c in self.client.get(self.url).json()], self.ids)
+
+    @override_settings(PAGINACAO_COMPATIVEL=False)
+    def test_sem_compatibilidade_pagina_sempre(self):
+        dados = self.client.get(self.url).json()
+
+        self.assertEqual([c['id'] for c in dados['results']], self.ids[:2])
+        self.assertIsNotNone(dados['next'])
+
+    @override_settings(PAGINACAO_COMPATIVEL=False)
+    def test_busca_por_raio_nao_pagina(self):
+        resp = self.client.get(self.url, {'lat': -5.0892, 'lng': -42.8019})
+
+        self.assertEqual(len(resp.json()), 5)
@@ -0,0 +1,84 @@
+# backend/src/aplicativo_web/test_demanda.py
+
+import os
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import resumo_itens
+from .models import ItemColeta, Produtor, SolicitacaoColeta
+
+
+class MapaDemandaTest(TestCase):
+    url = '/api/coletas/mapa_demanda/'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        # Dois produtores no mesmo quarteirão e um a ~30 km
+        pontos = [(-5.0892, -42.8019), (-5.0893, -42.8018), (-5.35, -42.8)]
+        self.produtores = [
+            Produtor.objects.create(nome=f"P{i}", email=f"p{i}@example.com", senha="x",
+                                    cpf_cnpj=str(i), latitude=lat, longitude=lng)
+            for i, (lat, lng) in enumerate(pontos)
+        ]
+        self.coleta(self.produtores[0], [('Metal', 10, 'KG'), ('Papel', 2, 'UN')])
+        self.coleta(self.produtores[1], [('Metal', 5, 'KG')])
+        self.coleta(self.produtores[2], [('Vidro', 3, 'KG')])
+        # Fora do mapa: cancelada e uma já concluída há muito tempo
+        self.coleta(self.produtores[0], [('Metal', 100, 'KG')], status='CANCELADA')
+        self.coleta(self.produtores[0], [('Metal', 100, 'KG')], status='CONFIRMADA',
+                    solicitacao=timezone.now() - timedelta(days=90))
+
+    def coleta(self, produtor, itens, **campos):
+        coleta = SolicitacaoColeta.objects.create(produtor=produtor, **campos)
+        for tipo, quantidade, unidade in itens:
+            ItemColeta.objects.create(solicitacao=coleta, tipo_residuo=tipo,
+                                      quantidade=quantidade, unidade_medida=unidade)
+        resumo_itens.recalcular(SolicitacaoColeta.objects.filter(pk=coleta.pk))
+        return coleta
+
+    def test_agrega_por_celula(self):
+        resp = self.client.get(self.url, {'zoom': 12})
+
+        self.assertEqual(resp.status_code, 200)
+        celulas = resp.json()['celulas']
+        self.assertEqual([c['solicitacoes'] for c in celulas], [2, 1])
+        self.assertEqual(celulas[0]['quantidade_kg'], 15.0)
+        self.assertEqual(celulas[0]['por_tipo']['Metal'], {'solicitacoes': 2, 'itens': 2, 'quantidade_kg': 15.0})
+        self.assertEqual(celulas[0]['por_tipo']['Papel']['quantidade_kg'], 0.0)
+
+    def test_filtro_por_tipo(self):
+        resp = self.client.get(self.url, {'zoom': 12, 'tipo_residuo': 'Vidro'})
+
+        celulas = resp.json()['celulas']
+        self.assertEqual(len(celulas), 1)
+        self.assertEqual(list(celulas[0]['por_tipo']), ['Vidro'])
+
+    def test_zoom_baixo_junta_celulas_e_resultado_fica_em_cache(self):
+        self.assertEqual(len(self.client.get(self.url, {'zoom': 5}).json()['celulas']), 1)
+
+        self.coleta(self.produtores[2], [('Vidro', 1, 'KG')])
+        # Só a leitura da tabela do cache, sem refazer a agregação
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.url, {'zoom': 5})
+        self.assertEqual(resp.json()['celulas'][0]['solicitacoes'], 3)
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get(self.url, {'zoom': 30}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'tipo_residuo': 'Lixo'}).status_code, 400)
+
+    def test_precomputar_aquece_o_cache_compartilhado(self):
+        call_command('precomputar_demanda', zooms=[5], stdout=open(os.devnull, 'w'))
+        self.coleta(self.produtores[2], [('Vidro', 1, 'KG')])
+
+        self.assertEqual(self.client.get(self.url, {'zoom': 5}).json()['celulas'][0]['solicitacoes'], 3)
+
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=locmem), self.assertRaises(CommandError):
+            call_command('precomputar_demanda', zooms=[5], stdout=open(os.devnull, 'w'))
@@ -0,0 +1,91 @@
+# backend/src/aplicativo_web/test_despacho.py
+
+import threading
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from .models import Coletor, EventoStatusColeta, Produtor, SolicitacaoColeta
+from .test_autenticacao import token
+
+
+def cenario():
+    """Três solicitações a ~0 km, ~1 km e ~5 km do centro e um coletor no centro."""
+    coletas = []
+    for i, lat in enumerate((-5.0892, -5.0982, -5.1342)):
+        produtor = Produtor.objects.create(nome=f"P{i}", email=f"p{i}@example.com", senha="x",
+                                           cpf_cnpj=str(i), latitude=lat, longitude=-42.8019)
+        coletas.append(SolicitacaoColeta.objects.create(produtor=produtor))
+    coletor = Coletor.objects.create(nome="C", email="c@example.com", senha="x", cpf="1",
+                                     latitude=-5.0892, longitude=-42.8019)
+    return coletas, coletor
+
+
+class AceiteTest(TestCase):
+    def setUp(self):
+        self.coletas, self.coletor = cenario()
+        self.outro = Coletor.objects.create(nome="D", email="d@example.com", senha="x", cpf="2")
+        self.client = APIClient()
+
+    def autenticar(self, coletor):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(coletor.pk, "coletor")}')
+
+    def test_segundo_aceite_perde(self):
+        url = f'/api/coletas/{self.coletas[0].pk}/aceitar/'
+        self.autenticar(self.coletor)
+        resp = self.client.post(url)
+        self.assertEqual((resp.status_code, resp.json()['status']), (200, 'ACEITA'))
+
+        self.autenticar(self.outro)
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertEqual(self.client.post('/api/coletas/999999/aceitar/').status_code, 404)
+        self.assertEqual(SolicitacaoColeta.objects.get(pk=self.coletas[0].pk).coletor_id, self.coletor.pk)
+        self.assertEqual(EventoStatusColeta.objects.get().usuario_id, self.coletor.pk)
+
+    def test_aceitar_proxima_em_ordem_de_distancia(self):
+        self.autenticar(self.coletor)
+        recebidas = [self.client.post('/api/coletas/aceitar_proxima/', {'radius_km': 3}, format='json')
+                     for _ in range(3)]
+
+        self.assertEqual([r.json()['id'] for r in recebidas[:2]], [self.coletas[0].pk, self.coletas[1].pk])
+        self.assertEqual(recebidas[2].status_code, 404)
+        self.assertEqual(SolicitacaoColeta.objects.filter(coletor=self.coletor, status='ACEITA').count(), 2)
+
+    def test_aceitar_proxima_exige_localizacao(self):
+        self.autenticar(self.outro)
+        self.assertEqual(self.client.post('/api/coletas/aceitar_proxima/').status_code, 400)
+        for corpo in ([1, 2], 3):
+            self.assertEqual(self.client.post('/api/coletas/aceitar_proxima/', corpo, format='json').status_code, 400)
+
+        resp = self.client.post('/api/coletas/aceitar_proxima/', {'lat': -5.1342, 'lng': -42.8019}, format='json')
+        self.assertEqual(resp.json()['id'], self.coletas[2].pk)
+
+
+class AceitarProximaConcorrenteTest(TransactionTestCase):
+    def test_pula_solicitacao_travada_por_outro_coletor(self):
+        coletas, coletor = cenario()
+        travada, liberar = threading.Event(), threading.Event()
+
+        def outro_coletor_reivindicando():
+            try:
+                with transaction.atomic():
+                    SolicitacaoColeta.objects.select_for_update().get(pk=coletas[0].pk)
+                    travada.set()
+                    liberar.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=outro_coletor_reivindicando)
+        thread.start()
+        try:
+            self.assertTrue(travada.wait(10))
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(coletor.pk, "coletor")}')
+            resp = client.post('/api/coletas/aceitar_proxima/')
+        finally:
+            liberar.set()
+            thread.join()
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['id'], coletas[1].pk)
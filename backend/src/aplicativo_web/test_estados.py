@@ -0,0 +1,68 @@
+# backend/src/aplicativo_web/test_estados.py
+
+from django.db import IntegrityError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import Coletor, Cooperativa, EventoStatusColeta, Produtor, SolicitacaoColeta
+from .test_autenticacao import token
+
+
+class TransicoesDeStatusTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.produtor = Produtor.objects.create(nome="P", email="p@example.com", senha="x", cpf_cnpj="1")
+        self.coletor = Coletor.objects.create(nome="C", email="c@example.com", senha="x", cpf="1")
+        self.outro_coletor = Coletor.objects.create(nome="D", email="d@example.com", senha="x", cpf="2")
+        self.cooperativa = Cooperativa.objects.create(
+            nome_empresa="Coop", email="coop@example.com", senha="x", cnpj="1")
+        self.coleta = SolicitacaoColeta.objects.create(produtor=self.produtor, cooperativa=self.cooperativa)
+
+    def mudar(self, usuario, papel, novo_status):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(usuario.pk, papel)}')
+        return self.client.patch(f'/api/coletas/{self.coleta.pk}/status/', {'status': novo_status}, format='json')
+
+    def test_fluxo_completo_registra_eventos(self):
+        self.assertEqual(self.mudar(self.coletor, 'coletor', 'ACEITA').json()['coletor_associado'], self.coletor.pk)
+        for usuario, papel, novo in [(self.coletor, 'coletor', 'CONFIRMADA'),
+                                     (self.coletor, 'coletor', 'AGUARDANDO'),
+                                     (self.cooperativa, 'cooperativa', 'CONCLUIDA')]:
+            self.assertEqual(self.mudar(usuario, papel, novo).status_code, 200)
+
+        self.coleta.refresh_from_db()
+        self.assertEqual(self.coleta.status, 'CONCLUIDA')
+        eventos = list(EventoStatusColeta.objects.filter(coleta=self.coleta).order_by('id')
+                       .values_list('de', 'para', 'papel'))
+        self.assertEqual(eventos, [
+            ('SOLICITADA', 'ACEITA', 'coletor'), ('ACEITA', 'CONFIRMADA', 'coletor'),
+            ('CONFIRMADA', 'AGUARDANDO', 'coletor'), ('AGUARDANDO', 'CONCLUIDA', 'cooperativa'),
+        ])
+
+    def test_transicao_fora_da_tabela(self):
+        resp = self.mudar(self.coletor, 'coletor', 'CONCLUIDA')
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('SOLICITADA para CONCLUIDA', resp.json()['detail'])
+        self.assertFalse(EventoStatusColeta.objects.exists())
+
+    def test_so_o_dono_muda(self):
+        self.mudar(self.coletor, 'coletor', 'ACEITA')
+
+        self.assertEqual(self.mudar(self.outro_coletor, 'coletor', 'CONFIRMADA').status_code, 403)
+        self.assertEqual(self.mudar(self.produtor, 'produtor', 'CANCELADA').status_code, 400)
+
+    def test_coletor_devolve_a_coleta(self):
+        self.mudar(self.coletor, 'coletor', 'ACEITA')
+
+        self.assertEqual(self.mudar(self.coletor, 'coletor', 'SOLICITADA').status_code, 200)
+        self.coleta.refresh_from_db()
+        self.assertIsNone(self.coleta.coletor_id)
+
+    def test_exige_autenticacao(self):
+        resp = self.client.patch(f'/api/coletas/{self.coleta.pk}/status/', {'status': 'ACEITA'}, format='json')
+
+        self.assertEqual(resp.status_code, 401)
+
+    def test_constraint_de_status_no_banco(self):
+        with self.assertRaises(IntegrityError):
+            SolicitacaoColeta.objects.filter(pk=self.coleta.pk).update(status='COLETADO')
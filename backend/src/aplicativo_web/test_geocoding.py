@@ -0,0 +1,334 @@
+# backend/src/aplicativo_web/test_geocoding.py
+
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import ceps, cliente_geocoder, geocoding
+from .models import Coletor, Cooperativa, GeocodeCache, GeocodePendente, Produtor
+
+ENDERECO = ("Rua Teste", "100", "Centro", "Teresina", "PI", "64000-000")
+
+# Nos testes o limitador de 1 req/s só atrasaria a suíte
+sem_limite_de_taxa = override_settings(GEOCODER_REQUISICOES_POR_SEGUNDO=1000, GEOCODER_RAJADA=1000)
+
+
+def resposta_nominatim(lat, lon, status_code=200):
+    r = mock.Mock()
+    r.status_code = status_code
+    r.json.return_value = [{"lat": str(lat), "lon": str(lon)}] if lat is not None else []
+    return r
+
+
+@sem_limite_de_taxa
+class GeocodeCacheTest(TestCase):
+    def setUp(self):
+        geocoding.limpar_cache_local()
+        cliente_geocoder.reiniciar_cliente()
+
+    def test_segunda_consulta_nao_acessa_a_rede(self):
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=resposta_nominatim(-5.09, -42.80)) as get:
+            primeira = geocoding.geocode(*ENDERECO)
+            segunda = geocoding.geocode(*ENDERECO)
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(primeira, segunda)
+        self.assertEqual(primeira, {"latitude": -5.09, "longitude": -42.80})
+
+    def test_cache_persistente_sobrevive_ao_lru(self):
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=resposta_nominatim(-5.09, -42.80)):
+            geocoding.geocode(*ENDERECO)
+
+        geocoding.limpar_cache_local()
+        with mock.patch.object(requests.Session, 'get') as get:
+            coords = geocoding.geocode(" rua  TESTE ", "100", "Centro", "Teresina", "PI", "64000000")
+
+        get.assert_not_called()
+        self.assertEqual(coords["latitude"], -5.09)
+
+    def test_cep_usado_como_aproximacao(self):
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=resposta_nominatim(-5.09, -42.80)):
+            geocoding.geocode(*ENDERECO)
+
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=resposta_nominatim(None, None)):
+            coords = geocoding.geocode("Outra Rua", "5", "Centro", "Teresina", "PI", "64000000")
+
+        self.assertEqual(coords, {"latitude": -5.09, "longitude": -42.80})
+
+    @override_settings(GEOCODE_CACHE_MAX_ENTRADAS=3)
+    def test_remover_excedentes_limita_tamanho(self):
+        for i in range(6):
+            geocoding.gravar_cache(f"cep:{i:08d}", {"latitude": i, "longitude": i})
+
+        GeocodeCache.remover_excedentes()
+
+        self.assertLessEqual(GeocodeCache.objects.count(), 3)
+        self.assertTrue(GeocodeCache.objects.filter(chave="cep:00000005").exists())
+
+
+@sem_limite_de_taxa
+class GeocodeFilaTest(TestCase):
+    payload = {
+        'nome': 'Produtor Fila',
+        'email': 'fila@example.com',
+        'senha': 'senha123',
+        'cpf_cnpj': '11122233344',
+        'cep': '64000-000',
+        'rua': 'Rua Teste',
+        'numero': '100',
+        'bairro': 'Centro',
+        'cidade': 'Teresina',
+        'estado': 'PI',
+    }
+
+    def setUp(self):
+        geocoding.limpar_cache_local()
+        cliente_geocoder.reiniciar_cliente()
+
+    def cadastrar(self):
+        with mock.patch.object(requests.Session, 'get') as get:
+            resp = self.client.post('/api/register/producer/', data=json.dumps(self.payload),
+                                    content_type='application/json')
+        get.assert_not_called()
+        self.assertEqual(resp.status_code, 201, resp.content)
+        self.assertEqual(resp.json()['geocode_status'], 'PENDENTE')
+        return Produtor.objects.get(pk=resp.json()['id'])
+
+    def test_cadastro_enfileira_sem_consultar_geocoder(self):
+        produtor = self.cadastrar()
+
+        self.assertIsNone(produtor.latitude)
+        self.assertTrue(GeocodePendente.objects.filter(produtor=produtor).exists())
+
+    def test_processar_fila_preenche_coordenadas(self):
+        produtor = self.cadastrar()
+
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=resposta_nominatim(-5.09, -42.80)):
+            resultado = geocoding.processar_fila(concorrencia=1)
+
+        self.assertEqual(resultado, (1, 0, 0))
+        produtor.refresh_from_db()
+        self.assertEqual(produtor.geocode_status, 'RESOLVIDO')
+        self.assertEqual(produtor.latitude, -5.09)
+        self.assertFalse(GeocodePendente.objects.exists())
+
+    def test_falhas_reagendam_ate_o_limite(self):
+        produtor = self.cadastrar()
+
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=resposta_nominatim(None, None)):
+            self.assertEqual(geocoding.processar_fila(concorrencia=1, max_tentativas=2), (0, 0, 1))
+            # Item reagendado não está vencido: nada a processar
+            self.assertEqual(geocoding.processar_fila(concorrencia=1, max_tentativas=2), (0, 0, 0))
+            GeocodePendente.objects.update(proxima_tentativa=produtor.geocode_pendente.criado_em)
+            self.assertEqual(geocoding.processar_fila(concorrencia=1, max_tentativas=2), (0, 1, 0))
+
+        produtor.refresh_from_db()
+        self.assertEqual(produtor.geocode_status, 'FALHOU')
+        self.assertFalse(GeocodePendente.objects.exists())
+
+    def test_aproximacao_do_cep_nao_tira_da_fila(self):
+        produtor = self.cadastrar()
+        geocoding.gravar_cache(geocoding.chave_cep('64000-000'), {"latitude": -5.1, "longitude": -42.8})
+
+        # Nominatim fora do ar: só o cache do CEP responde
+        with mock.patch.object(requests.Session, 'get', side_effect=requests.ConnectionError):
+            self.assertEqual(geocoding.processar_fila(concorrencia=1, max_tentativas=2), (0, 0, 1))
+            produtor.refresh_from_db()
+            self.assertEqual(produtor.geocode_status, 'PENDENTE')
+            GeocodePendente.objects.update(proxima_tentativa=produtor.geocode_pendente.criado_em)
+            self.assertEqual(geocoding.processar_fila(concorrencia=1, max_tentativas=2), (0, 1, 0))
+
+        produtor.refresh_from_db()
+        self.assertEqual((produtor.geocode_status, produtor.latitude), ('APROXIMADO', -5.1))
+
+
+@sem_limite_de_taxa
+class CepCentroideTest(TestCase):
+    def setUp(self):
+        geocoding.limpar_cache_local()
+        cliente_geocoder.reiniciar_cliente()
+        conteudo = (
+            "cep,latitude,longitude\n"
+            "64000-010,-5.0,-42.0\n"
+            "64000-020,-5.2,-42.2\n"
+            "64049-000,-5.05,-42.79\n"
+            "01310-100,-23.56,-46.65\n"
+        )
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(conteudo)
+        self.addCleanup(os.unlink, f.name)
+        call_command('carregar_ceps', f.name, digitos=5, stdout=open(os.devnull, 'w'))
+        self.addCleanup(ceps.recarregar)
+
+    def test_prefixo_agrupa_pela_media(self):
+        coords = ceps.aproximar("64000-999")
+
+        self.assertAlmostEqual(coords["latitude"], -5.1)
+        self.assertAlmostEqual(coords["longitude"], -42.1)
+        self.assertIsNone(ceps.aproximar("99999-999"))
+
+    def test_geocoder_usa_centroide_quando_remoto_falha(self):
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=resposta_nominatim(None, None)):
+            coords = geocoding.geocode("Rua X", "1", "Centro", "São Paulo", "SP", "01310-999")
+
+        self.assertAlmostEqual(coords["latitude"], -23.56)
+
+    def test_cadastro_de_coletor_recebe_coordenada_aproximada(self):
+        payload = {'nome': 'Coletor', 'email': 'c@example.com', 'senha': 'x',
+                   'cpf': '12345678901', 'cep': '64049-123', 'cidade': 'Teresina', 'estado': 'PI'}
+        resp = self.client.post('/api/register/collector/', data=json.dumps(payload),
+                                content_type='application/json')
+
+        self.assertEqual(resp.status_code, 201, resp.content)
+        coletor = Coletor.objects.get(email='c@example.com')
+        self.assertAlmostEqual(coletor.latitude, -5.05)
+
+
+@sem_limite_de_taxa
+class BackfillGeocodesTest(TestCase):
+    def setUp(self):
+        geocoding.limpar_cache_local()
+        cliente_geocoder.reiniciar_cliente()
+        self.coop = Cooperativa.objects.create(
+            nome_empresa='Coop', email='coop@example.com', senha='x', cnpj='1',
+            cep='64000000', rua='Rua A', numero='1', cidade='Teresina', estado='PI')
+        self.coletor = Coletor.objects.create(
+            nome='Coletor', email='col@example.com', senha='x', cpf='2',
+            cep='64000000', cidade='Teresina', estado='PI')
+        self.produtor = Produtor.objects.create(
+            nome='Produtor', email='prod@example.com', senha='x', cpf_cnpj='3',
+            cep='64000000', rua='Rua B', cidade='Teresina', estado='PI')
+        GeocodePendente.objects.create(produtor=self.produtor)
+
+    def test_preenche_todas_as_tabelas(self):
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=resposta_nominatim(-5.09, -42.80)):
+            call_command('backfill_geocodes', concorrencia=1, stdout=open(os.devnull, 'w'))
+
+        for obj in (self.coop, self.coletor, self.produtor):
+            obj.refresh_from_db()
+            self.assertEqual(obj.latitude, -5.09)
+        self.assertEqual(self.produtor.geocode_status, 'RESOLVIDO')
+        self.assertFalse(GeocodePendente.objects.exists())
+
+    def test_checkpoint_retoma_de_onde_parou(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            checkpoint = os.path.join(pasta, 'checkpoint.json')
+            with open(checkpoint, 'w') as f:
+                json.dump({'cooperativa': self.coop.pk}, f)
+
+            with mock.patch.object(requests.Session, 'get',
+                                   return_value=resposta_nominatim(-5.09, -42.80)):
+                call_command('backfill_geocodes', tabelas=['cooperativa', 'coletor'], concorrencia=1,
+                             checkpoint=checkpoint, stdout=open(os.devnull, 'w'))
+
+            with open(checkpoint) as f:
+                self.assertEqual(json.load(f), {'cooperativa': self.coop.pk, 'coletor': self.coletor.pk})
+
+        self.coop.refresh_from_db()
+        self.coletor.refresh_from_db()
+        self.assertIsNone(self.coop.latitude)
+        self.assertEqual(self.coletor.latitude, -5.09)
+
+
+class StubNominatim(BaseHTTPRequestHandler):
+    respostas = []
+    recebidas = 0
+
+    def do_GET(self):
+        type(self).recebidas += 1
+        status_code, corpo = self.respostas.pop(0) if self.respostas else (200, [])
+        dados = json.dumps(corpo).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, *args):
+        pass
+
+
+class ClienteGeocoderTest(SimpleTestCase):
+    """Exercita o cliente contra um servidor HTTP local."""
+
+    def setUp(self):
+        StubNominatim.respostas = []
+        StubNominatim.recebidas = 0
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), StubNominatim)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+
+    def criar_cliente(self, **kwargs):
+        opcoes = dict(
+            url=f"http://127.0.0.1:{self.servidor.server_port}/search", timeout=(1, 1),
+            taxa=1000, rajada=1000, espera_maxima=1, tentativas=2,
+            falhas_para_abrir=2, recuperacao=60,
+        )
+        opcoes.update(kwargs)
+        return cliente_geocoder.ClienteGeocoder(**opcoes)
+
+    def test_busca_com_nova_tentativa_em_erro_transitorio(self):
+        StubNominatim.respostas = [(503, {}), (200, [{"lat": "-5.1", "lon": "-42.8"}])]
+
+        coords = self.criar_cliente().buscar("Rua Teste, Teresina")
+
+        self.assertEqual(coords, {"latitude": -5.1, "longitude": -42.8})
+        self.assertEqual(StubNominatim.recebidas, 2)
+
+    def test_circuito_abre_apos_falhas_seguidas(self):
+        StubNominatim.respostas = [(500, {})] * 10
+        cliente = self.criar_cliente(tentativas=1)
+
+        self.assertIsNone(cliente.buscar("a"))
+        self.assertIsNone(cliente.buscar("b"))
+        self.assertEqual(cliente.circuito.estado, cliente_geocoder.CircuitBreaker.ABERTO)
+        self.assertIsNone(cliente.buscar("c"))
+
+        self.assertEqual(StubNominatim.recebidas, 2)
+
+    def test_bloqueio_403_abre_o_circuito(self):
+        StubNominatim.respostas = [(403, {}), (403, {}), (200, [])]
+        cliente = self.criar_cliente()
+
+        self.assertIsNone(cliente.buscar("a"))
+        self.assertIsNone(cliente.buscar("b"))
+        self.assertEqual(cliente.circuito.estado, cliente_geocoder.CircuitBreaker.ABERTO)
+        self.assertIsNone(cliente.buscar("c"))
+
+        # Sem novas tentativas numa recusa e nada enviado com o circuito aberto
+        self.assertEqual(StubNominatim.recebidas, 2)
+
+    def test_limitador_recusa_quando_espera_excede_o_maximo(self):
+        StubNominatim.respostas = [(200, [])] * 3
+        cliente = self.criar_cliente(taxa=0.1, rajada=1, espera_maxima=0.05)
+
+        cliente.buscar("a")
+        cliente.buscar("b")
+
+        self.assertEqual(StubNominatim.recebidas, 1)
+        self.assertEqual(cliente.circuito.estado, cliente_geocoder.CircuitBreaker.FECHADO)
+
+    def test_token_bucket_repoe_fichas_com_o_tempo(self):
+        agora = [0.0]
+        balde = cliente_geocoder.TokenBucket(taxa=1, capacidade=1, relogio=lambda: agora[0])
+
+        self.assertEqual(balde.tentar_adquirir(), 0)
+        self.assertAlmostEqual(balde.tentar_adquirir(), 1.0)
+        agora[0] += 1.0
+        self.assertEqual(balde.tentar_adquirir(), 0)
@@ -0,0 +1,86 @@
+# backend/src/aplicativo_web/test_indice_espacial.py
+
+import os
+import random
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import indice_espacial
+from .geo import haversine_km
+from .models import Produtor, SolicitacaoColeta
+
+
+class GradeEspacialTest(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.pontos = {i: (rng.uniform(-5.3, -4.9), rng.uniform(-43.0, -42.6)) for i in range(500)}
+        self.grade = indice_espacial.GradeEspacial(tamanho_celula=0.02)
+        for pk, (lat, lng) in self.pontos.items():
+            self.grade.inserir(pk, lat, lng)
+
+    def forca_bruta(self, lat, lng):
+        return sorted((haversine_km(lat, lng, plat, plng), pk) for pk, (plat, plng) in self.pontos.items())
+
+    def test_raio_igual_forca_bruta(self):
+        for lat, lng in [(-5.1, -42.8), (-4.9, -43.0), (-5.25, -42.65)]:
+            esperado = [(d, pk) for d, pk in self.forca_bruta(lat, lng) if d <= 7.5]
+            self.assertEqual(self.grade.raio(lat, lng, 7.5), esperado)
+
+    def test_k_mais_proximos_igual_forca_bruta(self):
+        for lat, lng in [(-5.1, -42.8), (-6.0, -44.0)]:
+            self.assertEqual(self.grade.proximos(lat, lng, 25), self.forca_bruta(lat, lng)[:25])
+
+    def test_remover(self):
+        self.grade.remover(0)
+        self.grade.inserir(1, -5.0, -42.7)
+
+        self.assertNotIn(0, self.grade)
+        self.assertEqual(len(self.grade), 499)
+        self.assertEqual(self.grade.itens()[1], (-5.0, -42.7))
+
+
+@override_settings(INDICE_ESPACIAL_ATIVO=True, INDICE_ESPACIAL_RECONSTRUCAO=3600)
+class IndiceEspacialSinaisTest(TestCase):
+    def setUp(self):
+        indice_espacial.descartar()
+        self.addCleanup(indice_espacial.descartar)
+        self.produtor = Produtor.objects.create(
+            nome="P", email="p@example.com", senha="x", cpf_cnpj="1", latitude=-5.09, longitude=-42.80)
+
+    def test_sinais_mantem_o_indice(self):
+        indice = indice_espacial.indice()
+        coleta = SolicitacaoColeta.objects.create(produtor=self.produtor)
+        self.assertIn(coleta.pk, indice)
+
+        coleta.status = 'ACEITA'
+        coleta.save()
+        self.assertNotIn(coleta.pk, indice)
+
+    def test_view_usa_o_indice(self):
+        coleta = SolicitacaoColeta.objects.create(produtor=self.produtor)
+        indice_espacial.indice()
+
+        # Fora do índice, a coleta não aparece mesmo estando no banco
+        indice_espacial.remover(coleta.pk)
+        resp = APIClient().get('/api/coletas/disponiveis/', {'lat': -5.09, 'lng': -42.80})
+        self.assertEqual(resp.json(), [])
+
+        indice_espacial.atualizar(coleta.pk, 'SOLICITADA', -5.09, -42.80)
+        resp = APIClient().get('/api/coletas/disponiveis/', {'lat': -5.09, 'lng': -42.80})
+        self.assertEqual([c['id'] for c in resp.json()], [coleta.pk])
+
+    def test_comando_de_verificacao(self):
+        for i in range(20):
+            p = Produtor.objects.create(nome=f"P{i}", email=f"p{i}@x.com", senha="x", cpf_cnpj=f"c{i}",
+                                        latitude=-5.09 + i * 0.01, longitude=-42.80 - i * 0.01)
+            SolicitacaoColeta.objects.create(produtor=p)
+
+        call_command('verificar_indice_espacial', pontos=10, semente=1, stdout=open(os.devnull, 'w'))
+
+        # Mudança que não passou pelos sinais: o índice vivo fica desatualizado
+        SolicitacaoColeta.objects.filter(produtor__cpf_cnpj='c0').update(status='ACEITA')
+        with self.assertRaises(CommandError):
+            call_command('verificar_indice_espacial', pontos=10, semente=1,
+                         stdout=open(os.devnull, 'w'), stderr=open(os.devnull, 'w'))
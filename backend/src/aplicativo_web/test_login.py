@@ -0,0 +1,77 @@
+# backend/src/aplicativo_web/test_login.py
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import senhas
+from .models import Coletor, Cooperativa, Produtor
+
+
+@override_settings(SENHA_PBKDF2_ITERACOES=1000)
+class LoginTest(TestCase):
+    url = '/api/login/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.produtor = Produtor.objects.create(nome="Produtor", email="p@example.com",
+                                                senha=senhas.gerar_hash("123"),
+                                                cpf_cnpj="11122233344")
+        self.coletor = Coletor.objects.create(nome="Coletor", email="c@example.com",
+                                              senha=senhas.gerar_hash("456"),
+                                              cpf="55566677788")
+        self.cooperativa = Cooperativa.objects.create(nome_empresa="Coop", email="coop@example.com",
+                                                      senha=senhas.gerar_hash("789"), cnpj="12345678000199")
+
+    def login(self, identificador, senha):
+        return self.client.post(self.url, {'email': identificador, 'password': senha}, format='json')
+
+    def test_resolve_email_e_documento_em_uma_consulta(self):
+        casos = [
+            ('p@example.com', '123', 'produtor', 'Produtor'),
+            ('55566677788', '456', 'coletor', 'Coletor'),
+            ('12345678000199', '789', 'cooperativa', 'Coop'),
+        ]
+        for identificador, senha, tipo, nome in casos:
+            with self.subTest(identificador=identificador), self.assertNumQueries(1):
+                resp = self.login(identificador, senha)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual((resp.json()['user_type'], resp.json()['name']), (tipo, nome))
+
+    def test_email_tem_prioridade_sobre_documento(self):
+        # Documento de um produtor igual ao email de um coletor
+        Produtor.objects.create(nome="Outro", email="o@example.com", senha="x", cpf_cnpj="c2@example.com")
+        Coletor.objects.create(nome="Coletor 2", email="c2@example.com", senha="y", cpf="1")
+
+        resp = self.login('c2@example.com', 'y')
+
+        self.assertEqual(resp.json()['user_type'], 'coletor')
+
+    def test_credenciais_invalidas(self):
+        self.assertEqual(self.login('p@example.com', 'errada').status_code, 401)
+        self.assertEqual(self.login('ninguem@example.com', '123').status_code, 401)
+
+    def test_senha_em_texto_puro_e_convertida_no_login(self):
+        Produtor.objects.filter(pk=self.produtor.pk).update(senha="123")
+
+        self.assertEqual(self.login('p@example.com', '123').status_code, 200)
+
+        self.produtor.refresh_from_db()
+        self.assertTrue(self.produtor.senha.startswith('pbkdf2_sha256$1000$'))
+        self.assertEqual(self.login('p@example.com', '123').status_code, 200)
+
+    def test_hash_refeito_quando_o_custo_muda(self):
+        with self.settings(SENHA_PBKDF2_ITERACOES=2000):
+            self.assertEqual(self.login('c@example.com', '456').status_code, 200)
+
+        self.coletor.refresh_from_db()
+        self.assertTrue(self.coletor.senha.startswith('pbkdf2_sha256$2000$'))
+
+    def test_cadastro_grava_hash(self):
+        resp = self.client.post('/api/register/collector/', {
+            'nome': 'Novo', 'email': 'novo@example.com', 'senha': 'segredo', 'cpf': '999'}, format='json')
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertNotIn('senha', resp.json())
+        salvo = Coletor.objects.get(email='novo@example.com').senha
+        self.assertTrue(senhas.verificar('segredo', salvo)[0])
+        self.assertEqual(self.login('novo@example.com', 'segredo').status_code, 200)
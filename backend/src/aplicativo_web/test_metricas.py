@@ -0,0 +1,78 @@
+# backend/src/aplicativo_web/test_metricas.py
+
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import metricas
+from .models import Produtor, SolicitacaoColeta
+
+
+class MetricasTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.diretorio = Path(diretorio.name)
+        ajuste = override_settings(METRICAS_DIRETORIO=diretorio.name, METRICAS_TOKEN='')
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+    def valor(self, texto, linha_inicio):
+        for linha in texto.splitlines():
+            if linha.startswith(linha_inicio):
+                return float(linha.rsplit(' ', 1)[1])
+        return 0.0
+
+    def metricas(self):
+        resp = self.client.get('/api/metrics')
+        self.assertEqual(resp.status_code, 200)
+        return resp.content.decode()
+
+    def test_conta_requisicoes_e_consultas_por_rota(self):
+        serie = 'reciclaai_http_requisicoes_total{metodo="GET",rota="api/coletas/disponiveis/",status="200"}'
+        antes = self.valor(self.metricas(), serie)
+
+        self.client.get('/api/coletas/disponiveis/')
+        self.client.get('/api/coletas/disponiveis/')
+
+        texto = self.metricas()
+        self.assertEqual(self.valor(texto, serie) - antes, 2)
+        self.assertIn('reciclaai_db_consultas_por_requisicao_bucket{rota="api/coletas/disponiveis/",le="1.0"}',
+                      texto)
+        self.assertIn('# TYPE reciclaai_http_requisicao_duracao_segundos histogram', texto)
+
+    def test_transicoes_de_status(self):
+        serie = 'reciclaai_solicitacao_transicoes_total{de="SOLICITADA",para="ACEITA"}'
+        antes = self.valor(self.metricas(), serie)
+        produtor = Produtor.objects.create(nome="P", email="p@example.com", senha="x", cpf_cnpj="1")
+        coleta = SolicitacaoColeta.objects.create(produtor=produtor)
+
+        coleta.status = 'ACEITA'
+        coleta.save()
+        coleta.save()
+
+        self.assertEqual(self.valor(self.metricas(), serie) - antes, 1)
+
+    def test_soma_arquivos_de_outros_workers(self):
+        outro = {
+            'reciclaai_geocoder_chamadas_total': {
+                'tipo': 'counter', 'ajuda': 'x', 'limites': [],
+                'series': {json.dumps({'resultado': 'falha'}): 5},
+            },
+        }
+        (self.diretorio / '1-1.json').write_text(json.dumps(outro))
+        antes = metricas.geocoder_chamadas.copia().get(json.dumps({'resultado': 'falha'}), 0)
+
+        texto = self.metricas()
+
+        self.assertEqual(self.valor(texto, 'reciclaai_geocoder_chamadas_total{resultado="falha"}'), antes + 5)
+
+    def test_token_opcional(self):
+        with self.settings(METRICAS_TOKEN='segredo'):
+            self.assertEqual(self.client.get('/api/metrics').status_code, 401)
+            self.client.credentials(HTTP_AUTHORIZATION='Bearer segredo')
+            self.assertEqual(self.client.get('/api/metrics').status_code, 200)
@@ -0,0 +1,60 @@
+# backend/src/aplicativo_web/test_perfil.py
+
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import perfil
+from .middleware import PerfilMiddleware
+from .models import Produtor, SolicitacaoColeta
+
+
+class PerfilMiddlewareTest(TestCase):
+    url = '/api/coletas/disponiveis/'
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.diretorio = Path(diretorio.name)
+        ajuste = override_settings(PERFIL_TOKEN='segredo', PERFIL_TAXA_AMOSTRAGEM=0,
+                                   PERFIL_DIRETORIO=diretorio.name)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+        self.client = APIClient()
+        produtor = Produtor.objects.create(nome="P", email="p@example.com", senha="x", cpf_cnpj="1")
+        SolicitacaoColeta.objects.create(produtor=produtor)
+
+    def test_perfila_com_token(self):
+        resp = self.client.get(self.url, HTTP_X_PERFILAR='segredo')
+
+        self.assertEqual(resp.status_code, 200)
+        identificador = resp['X-Perfil-Id']
+        self.assertTrue((self.diretorio / f'{identificador}.prof').exists())
+        resumo = json.loads((self.diretorio / f'{identificador}.json').read_text())
+        self.assertEqual(resumo['rota'], 'api/coletas/disponiveis/')
+        self.assertEqual(resumo['sql']['total'], int(resp['X-Perfil-Consultas']))
+        self.assertTrue(resumo['funcoes'])
+
+    def test_detecta_consultas_repetidas(self):
+        consultas = [{'sql': 'SELECT a', 'duracao_ms': 1.0}, {'sql': 'SELECT b', 'duracao_ms': 2.0},
+                     {'sql': 'SELECT a', 'duracao_ms': 1.5}, {'sql': 'SELECT a', 'duracao_ms': 0.5}]
+
+        resumo = perfil.resumo_sql(consultas)
+
+        self.assertEqual((resumo['total'], resumo['duplicadas']), (4, 2))
+        self.assertEqual(resumo['repetidas'], [{'sql': 'SELECT a', 'vezes': 3, 'duracao_total_ms': 3.0}])
+
+    def test_sem_token_nao_perfila(self):
+        resp = self.client.get(self.url, HTTP_X_PERFILAR='errado')
+
+        self.assertNotIn('X-Perfil-Id', resp)
+        self.assertEqual(list(self.diretorio.iterdir()), [])
+
+    @override_settings(PERFIL_TOKEN='', PERFIL_TAXA_AMOSTRAGEM=0)
+    def test_desativado_sai_da_pilha(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            PerfilMiddleware(lambda request: None)
@@ -0,0 +1,24 @@
+# backend/src/aplicativo_web/test_prontidao.py
+
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.test import TestCase
+
+
+class ProntidaoTest(TestCase):
+    def test_banco_respondendo(self):
+        resp = self.client.get('/api/ready')
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['banco'], 'ok')
+        if connection.pool is not None:
+            self.assertGreaterEqual(resp.json()['pool']['pool_max'], 1)
+
+    def test_banco_fora_do_ar(self):
+        with mock.patch('django.db.backends.utils.CursorWrapper.execute',
+                        side_effect=OperationalError('conexão recusada')):
+            resp = self.client.get('/api/ready')
+
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(resp.json()['status'], 'indisponivel')
@@ -0,0 +1,116 @@
+# backend/src/aplicativo_web/test_recomendacao.py
+
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from . import recomendacao
+from .models import Cooperativa, CooperativaMaterial, ItemColeta, Produtor, SolicitacaoColeta
+from .test_autenticacao import token
+from .validators import parse_price
+
+
+class CooperativasRecomendadasTest(TestCase):
+    def setUp(self):
+        recomendacao.invalidar()
+        self.addCleanup(recomendacao.invalidar)
+        self.client = APIClient()
+
+        produtor = Produtor.objects.create(
+            nome="P", email="p@example.com", senha="x", cpf_cnpj="1",
+            latitude=-5.0892, longitude=-42.8019)
+        self.coleta = SolicitacaoColeta.objects.create(produtor=produtor)
+        ItemColeta.objects.create(solicitacao=self.coleta, tipo_residuo='Metal',
+                                  quantidade=10, unidade_medida='KG')
+        ItemColeta.objects.create(solicitacao=self.coleta, tipo_residuo='Papel',
+                                  quantidade=3, unidade_medida='UN')
+
+        # Perto e barata / longe e cara / não compra nada da coleta
+        self.perto = self.cooperativa("Perto", "11", -5.0982, -42.8019, {'Metal': 1, 'Papel': 1})
+        self.longe = self.cooperativa("Longe", "22", -5.5, -42.8019, {'Metal': 5})
+        self.vidro = self.cooperativa("Vidro", "33", -5.09, -42.80, {'Vidro': 9})
+
+    def cooperativa(self, nome, cnpj, lat, lng, precos):
+        coop = Cooperativa.objects.create(nome_empresa=nome, email=f"{nome}@example.com", senha="x",
+                                          cnpj=cnpj, latitude=lat, longitude=lng)
+        for tipo, preco in precos.items():
+            CooperativaMaterial.objects.create(cooperativa=coop, tipo_residuo=tipo, preco_oferecido=preco)
+        return coop
+
+    def url(self, pk=None):
+        return f'/api/coletas/{pk or self.coleta.pk}/cooperativas_recomendadas/'
+
+    def ids(self, resp):
+        return [c['cooperativa_id'] for c in resp.json()['cooperativas']]
+
+    def test_pesos_alteram_o_ranking(self):
+        por_valor = self.client.get(self.url(), {'peso_distancia': 0, 'peso_valor': 1})
+        por_distancia = self.client.get(self.url(), {'peso_distancia': 1, 'peso_valor': 0})
+
+        self.assertEqual(por_valor.status_code, 200)
+        self.assertEqual(self.ids(por_valor), [self.longe.id, self.perto.id])
+        self.assertEqual(self.ids(por_distancia), [self.perto.id, self.longe.id])
+
+        primeira = por_valor.json()['cooperativas'][0]
+        self.assertEqual(primeira['valor_estimado'], 50.0)
+        self.assertEqual(primeira['cobertura'], 0.5)
+        self.assertAlmostEqual(por_distancia.json()['cooperativas'][0]['distancia_km'], 1.0, delta=0.05)
+
+    def test_origem_informada_na_consulta(self):
+        resp = self.client.get(self.url(), {'lat': -5.5, 'lng': -42.8019, 'peso_valor': 0})
+
+        self.assertEqual(self.ids(resp)[0], self.longe.id)
+
+    def test_matriz_invalidada_ao_mudar_precos(self):
+        self.client.get(self.url())
+        CooperativaMaterial.objects.create(cooperativa=self.vidro, tipo_residuo='Metal', preco_oferecido=20)
+
+        resp = self.client.get(self.url(), {'peso_distancia': 0})
+
+        self.assertEqual(self.ids(resp)[0], self.vidro.id)
+
+    def test_erros(self):
+        self.assertEqual(self.client.get(self.url(999999)).status_code, 404)
+        self.assertEqual(self.client.get(self.url(), {'peso_valor': 'x'}).status_code, 400)
+
+
+class InteressesCooperativaTest(TestCase):
+    url = '/api/cooperativa/interesses/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.coop = Cooperativa.objects.create(nome_empresa="Coop", email="c@example.com", senha="x", cnpj="1")
+        CooperativaMaterial.objects.create(cooperativa=self.coop, tipo_residuo='Metal', preco_oferecido=1)
+        CooperativaMaterial.objects.create(cooperativa=self.coop, tipo_residuo='Vidro', preco_oferecido=1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token(self.coop.pk, "cooperativa")}')
+
+    def precos(self):
+        return dict(CooperativaMaterial.objects.filter(cooperativa=self.coop)
+                    .values_list('tipo_residuo', 'preco_oferecido'))
+
+    def test_upsert_e_remocao_em_consultas_constantes(self):
+        recomendacao.matriz()
+        interesses = [{'categoria': 'Metal', 'preco': 'R$ 2,50/kg'}, {'categoria': 'Papel', 'preco': 0.8},
+                      {'categoria': 'Plástico', 'preco': 'sem preço'}]
+        with CaptureQueriesContext(connection) as poucos:
+            resp = self.client.post(self.url, {'interesses': interesses}, format='json')
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.precos(), {'Metal': Decimal('2.50'), 'Papel': Decimal('0.80')})
+        self.assertIsNone(recomendacao._matriz)
+
+        # Mais tipos no payload (e de novo um removido): mesmo número de consultas
+        interesses = [{'tipo_residuo': t, 'preco_oferecido': '1'} for t in ('Papel', 'Vidro', 'Plástico')]
+        with CaptureQueriesContext(connection) as muitos:
+            self.client.post(self.url, {'interesses': interesses}, format='json')
+        self.assertEqual(len(poucos), len(muitos))
+        self.assertEqual(sorted(self.precos()), ['Papel', 'Plástico', 'Vidro'])
+
+    def test_parse_price(self):
+        self.assertEqual(parse_price('R$ 2,50/kg'), Decimal('2.50'))
+        self.assertEqual(parse_price(3), Decimal('3'))
+        for invalido in (None, '', 'abc', 'NaN', True):
+            self.assertIsNone(parse_price(invalido))
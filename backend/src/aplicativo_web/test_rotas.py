@@ -0,0 +1,105 @@
+# backend/src/aplicativo_web/test_rotas.py
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import rotas
+from .models import Coletor, Cooperativa, Produtor, SolicitacaoColeta
+
+
+class PlanejadorRotaTest(SimpleTestCase):
+    def test_pontos_em_linha_sao_visitados_em_sequencia(self):
+        paradas = [{'latitude': -5.0, 'longitude': -42.8 + d} for d in (0.04, 0.01, 0.03, 0.02)]
+
+        ordem, trechos, _, _, total = rotas.planejar(paradas, origem=(-5.0, -42.8))
+
+        self.assertEqual(ordem, [1, 3, 2, 0])
+        self.assertAlmostEqual(total, sum(trechos))
+
+    def test_destino_fixo_fica_no_fim(self):
+        paradas = [{'latitude': -5.0, 'longitude': -42.8 + d} for d in (0.01, 0.02)]
+
+        # Começando no meio e terminando à direita, a parada da esquerda vem antes
+        ordem, _, _, _, _ = rotas.planejar(paradas, origem=(-5.0, -42.785), destino=(-5.0, -42.7))
+
+        self.assertEqual(ordem, [0, 1])
+
+    def test_janela_antecipa_parada_urgente(self):
+        partida = datetime(2026, 1, 1, 8)
+        paradas = [
+            {'latitude': -5.0, 'longitude': -42.79},
+            # Mais distante, mas precisa ser atendida nos primeiros 15 minutos
+            {'latitude': -5.0, 'longitude': -42.75,
+             'inicio': partida, 'fim': partida + timedelta(minutes=15)},
+        ]
+
+        ordem, _, _, atrasos, _ = rotas.planejar(paradas, origem=(-5.0, -42.8), partida=partida)
+
+        self.assertEqual(ordem, [1, 0])
+        self.assertEqual(atrasos[0], 0.0)
+
+    def test_duzentas_paradas_em_menos_de_um_segundo(self):
+        aleatorio = random.Random(7)
+        partida = datetime(2026, 1, 1, 8)
+        paradas = []
+        for _ in range(200):
+            inicio = partida + timedelta(hours=aleatorio.uniform(0, 8))
+            paradas.append({'latitude': -5.09 + aleatorio.uniform(-0.15, 0.15),
+                            'longitude': -42.8 + aleatorio.uniform(-0.15, 0.15),
+                            'inicio': inicio, 'fim': inicio + timedelta(hours=2)})
+
+        inicio = time.perf_counter()
+        ordem, _, _, _, _ = rotas.planejar(paradas, origem=(-5.09, -42.8), partida=partida)
+
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+        self.assertEqual(sorted(ordem), list(range(200)))
+
+
+class RotaColetorViewTest(TestCase):
+    url = '/api/coletas/rota/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.coletor = Coletor.objects.create(nome="C", email="c@example.com", senha="x", cpf="1",
+                                              latitude=-5.0, longitude=-42.8)
+        self.coletas = []
+        for i, d in enumerate((0.03, 0.01, 0.02)):
+            produtor = Produtor.objects.create(nome=f"P{i}", email=f"p{i}@example.com", senha="x",
+                                               cpf_cnpj=str(i), latitude=-5.0, longitude=-42.8 + d)
+            self.coletas.append(SolicitacaoColeta.objects.create(
+                produtor=produtor, coletor=self.coletor, status='ACEITA'))
+        sem_local = Produtor.objects.create(nome="S", email="s@example.com", senha="x", cpf_cnpj="9")
+        self.sem_local = SolicitacaoColeta.objects.create(
+            produtor=sem_local, coletor=self.coletor, status='ACEITA')
+        self.cooperativa = Cooperativa.objects.create(
+            nome_empresa="Coop", email="coop@example.com", senha="x", cnpj="1",
+            latitude=-5.0, longitude=-42.7)
+
+        refresh = RefreshToken()
+        refresh['user_id'] = self.coletor.pk
+        refresh['user_type'] = 'coletor'
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_ordena_a_partir_do_coletor(self):
+        resp = self.client.get(self.url, {'cooperativa_id': self.cooperativa.pk})
+
+        self.assertEqual(resp.status_code, 200)
+        dados = resp.json()
+        self.assertEqual([p['id'] for p in dados['paradas']],
+                         [self.coletas[1].id, self.coletas[2].id, self.coletas[0].id])
+        self.assertEqual(dados['sem_coordenadas'], [self.sem_local.id])
+        self.assertEqual(dados['destino']['cooperativa_id'], self.cooperativa.pk)
+        self.assertAlmostEqual(dados['distancia_total_km'], 11.1, delta=0.1)
+
+    def test_exige_coletor(self):
+        self.client.credentials()
+
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_cooperativa_inexistente(self):
+        self.assertEqual(self.client.get(self.url, {'cooperativa_id': 999999}).status_code, 404)
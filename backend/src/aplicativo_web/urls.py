@@ -23,6 +23,8 @@ from .views import (
 
 urlpatterns = [
     path("", views.index, name="index"),
+    path("metrics", views.metrics, name="metrics"),
+    path("ready", views.ready, name="ready"),
     path('register/producer/', ProdutorRegisterView.as_view(),
          name='register-producer'),
     path('register/collector/', ColetorRegisterView.as_view(),
@@ -32,6 +34,8 @@ urlpatterns = [
     path('login/', CustomLoginView.as_view(), name='login'),
     path('coletas/solicitar/', SolicitarColetaView.as_view(),
          name='solicitar-coleta'),
+    path('coletas/solicitar/lote/', views.SolicitarColetaLoteView.as_view(),
+         name='solicitar-coleta-lote'),
     path('cooperativas/', CooperativaListView.as_view(), name='cooperativas-list'),
     path('cooperativa/interesses/', views.CooperativaInteressesView.as_view(),
          name='cooperativa-interesses'),
@@ -41,6 +45,8 @@ urlpatterns = [
          name='minhas-solicitacoes-coletor'),
     path('coletas/disponiveis/', DisponiveisSolicitacoesView.as_view(),
          name='coletas-disponiveis'),
+    path('coletas/rota/', views.RotaColetorView.as_view(), name='coletas-rota'),
+    path('coletas/mapa_demanda/', views.MapaDemandaView.as_view(), name='coletas-mapa-demanda'),
     path("coletas/<int:pk>/status/", views.AtualizarStatusColetaView.as_view(),
          name="atualizar-status-coleta"),
 
@@ -48,8 +54,12 @@ urlpatterns = [
          name='coleta-detail'),
     path('coletas/<int:pk>/aceitar/',
          views.AcceptSolicitacaoView.as_view(), name='coleta-aceitar'),
+    path('coletas/aceitar_proxima/', views.AceitarProximaView.as_view(),
+         name='coleta-aceitar-proxima'),
     path('coletas/<int:pk>/associar_cooperativa/',
          views.AssociarCooperativaView.as_view(), name='coleta-associar-cooperativa'),
+    path('coletas/<int:pk>/cooperativas_recomendadas/',
+         views.CooperativasRecomendadasView.as_view(), name='coleta-cooperativas-recomendadas'),
     # path('list_cooperativas/', views.escolha_cooperativa_view, name='list-cooperativas'),
     path('avaliar/produtor/', AvaliarProdutorView.as_view(), name='avaliar-produtor'),
     path('produtor/perfil/', ProdutorPerfilView.as_view(), name='produtor-perfil'),
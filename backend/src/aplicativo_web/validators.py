@@ -0,0 +1,25 @@
+# backend/src/aplicativo_web/validators.py
+"""Conversões e validações de entrada reaproveitadas pelas views e serializers."""
+import re
+from decimal import Decimal, InvalidOperation
+
+
+def parse_price(p):
+    """Converte preços como ``2.5``, ``"2,50"`` ou ``"R$ 2,50/kg"`` em ``Decimal``.
+
+    Devolve ``None`` quando o valor está ausente ou não é um número.
+    """
+    if p is None or isinstance(p, bool):
+        return None
+    if isinstance(p, (int, float, Decimal)):
+        s = str(p)
+    else:
+        # remove R$, /kg, spaces e letras
+        s = str(p).replace('R$', '').replace('r$', '')
+        s = re.sub(r"[^0-9,\.\-]", '', s)
+        s = s.replace(',', '.')
+    try:
+        valor = Decimal(s)
+    except InvalidOperation:
+        return None
+    return valor if valor.is_finite() else None
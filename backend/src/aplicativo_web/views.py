@@ -1,6 +1,9 @@
 # backend/src/aplicativo_web/views.py
 
-from django.http import FileResponse, Http404, HttpResponse
+from datetime import timedelta
+
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.conf import settings
 from pathlib import Path
 from rest_framework import generics, status
@@ -17,13 +20,18 @@ from .serializers import (
     ProdutorRegistrationSerializer, ColetorRegistrationSerializer,
     CooperativaRegistrationSerializer, LoginSerializer,
     SolicitacaoColetaCreateSerializer, SolicitacaoColetaListSerializer,
-    SolicitacaoColetaDetailSerializer, AvaliacaoColetorSerializer
+    SolicitacaoColetaDetailSerializer, AvaliacaoColetorSerializer,
+    SolicitacaoColetaProximaSerializer
 )
 from .serializers import CooperativaMaterialSerializer
-from .models import Produtor, Coletor, Cooperativa, SolicitacaoColeta
+from .models import Produtor, Coletor, Cooperativa, SolicitacaoColeta, ItemColeta
 from .models import CooperativaMaterial
-from .permissions import IsProdutor
+from .paginacao import CursorPorIdCrescente
+from .permissions import IsColetor, IsCooperativa, IsProdutor, IsUsuario
+from .validators import parse_price
+from . import demanda, despacho, estados, geo, identidade, indice_espacial, metricas, recomendacao, rotas, senhas
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 
 # --- Views Originais (Servir Frontend e Teste) ---
 
@@ -40,6 +48,45 @@ def spa(request):
 def index(request):
     return HttpResponse("Olá, mundo. Você está no índice da API.")
 
+
+def metrics(request):
+    """Métricas de todos os workers no formato texto do Prometheus (ver metricas.py)."""
+    token = settings.METRICAS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(metricas.exportar(metricas.registro.agregado()),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def estado_banco(conexao):
+    """Verificação de prontidão do banco: ``(corpo, status HTTP)``.
+
+    Com o pool ativo a consulta passa por ele, então um pool esgotado (sem
+    conexão livre dentro de DB_POOL_TIMEOUT) ou com conexões quebradas também
+    reprova; o corpo traz as estatísticas do pool deste worker.
+    """
+    corpo = {'status': 'ok', 'banco': 'ok'}
+    http_status = 200
+    try:
+        with conexao.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except DatabaseError as e:
+        print(f"Erro na verificação de prontidão do banco: {e}")
+        corpo.update(status='indisponivel', banco=str(e))
+        http_status = 503
+    if conexao.pool is not None:
+        stats = conexao.pool.get_stats()
+        corpo['pool'] = {chave: stats.get(chave, 0) for chave in
+                         ('pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting')}
+    return corpo, http_status
+
+
+def ready(request):
+    """Prontidão para o balanceador: 200 se o banco responde, 503 se não."""
+    corpo, http_status = estado_banco(connection)
+    return JsonResponse(corpo, status=http_status)
+
 # --- Views de Cadastro ---
 
 
@@ -55,75 +102,38 @@ class ProdutorRegisterView(generics.CreateAPIView):
 
 
 class AtualizarStatusColetaView(APIView):
-    permission_classes = [permissions.AllowAny]
+    """Muda o status de uma solicitação seguindo as regras de ``estados.TRANSICOES``.
+    Endpoint: PATCH /api/coletas/<pk>/status/
+    Payload: { "status": "<novo status>" }
+    O papel vem do token; cada mudança fica registrada em EventoStatusColeta.
+    """
+    permission_classes = [IsUsuario]
 
     def patch(self, request, pk):
-        try:
-            coleta = SolicitacaoColeta.objects.get(pk=pk)
-        except SolicitacaoColeta.DoesNotExist:
-            return Response({"detail": "Coleta não encontrada"}, status=404)
-
         novo_status = request.data.get("status")
-
-        # O banco atual tem uma constraint que não permite valores fora
-        # de: SOLICITADA, ACEITA, CANCELADA, CONFIRMADA.
-        # Para evitar criar migrations (alterar constraint), mapeamos
-        # 'CONCLUIDA' -> 'CONFIRMADA' no servidor. Se desejar permitir
-        # 'CONCLUIDA' de verdade, gere a migration que atualiza o modelo
-        # e aplique a alteração no banco.
-
         if novo_status is None:
             return Response({"detail": "Campo 'status' é obrigatório."}, status=400)
-
-        if novo_status not in ["ACEITA", "CONFIRMADA", "CANCELADA", "SOLICITADA", "AGUARDANDO", "CONCLUIDA", ]:
+        if novo_status not in dict(SolicitacaoColeta.STATUS_CHOICES):
             return Response({"detail": "Status inválido"}, status=400)
 
-        mapped = False
-        final_status = novo_status
-        if novo_status == 'CONCLUIDA':
-            # Mapeamento temporário para evitar violação da constraint
-            final_status = 'CONFIRMADA'
-            mapped = True
-
-        # Tenta extrair o coletor autenticado (se houver) a partir do token JWT
-        auth_payload = getattr(request, 'auth_payload', None)
-        if not auth_payload:
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                raw_token = auth_header.split(' ')[1]
-                from rest_framework_simplejwt.authentication import JWTAuthentication
-                jwt_auth = JWTAuthentication()
-                try:
-                    validated = jwt_auth.get_validated_token(raw_token)
-                    auth_payload = getattr(validated, 'payload', None)
-                    if auth_payload:
-                        request.auth_payload = auth_payload
-                except Exception:
-                    auth_payload = None
-
-        # Se o usuário autenticado for um coletor e a solicitação ainda não tiver coletor,
-        # associa o coletor autenticado à solicitação.
-        associado = False
-        if auth_payload and auth_payload.get('user_type') == 'coletor' and auth_payload.get('user_id'):
-            try:
-                coletor_id = auth_payload.get('user_id')
-                coletor_profile = Coletor.objects.filter(pk=coletor_id).first()
-                if coletor_profile and coleta.coletor is None:
-                    coleta.coletor = coletor_profile
-                    associado = True
-            except Exception:
-                # não falha a operação só por não conseguir associar o coletor
-                associado = False
-
-        coleta.status = final_status
-        coleta.save()
-
-        resp = {"id": coleta.id, "status": coleta.status}
-        if mapped:
-            resp["note"] = "Status 'CONCLUIDA' mapeado para 'CONFIRMADA' (constraint do DB)."
-        if associado:
-            resp["coletor_associado"] = coleta.coletor_id
-
+        papel = request.auth_payload.get('user_type')
+        usuario_id = request.auth_payload.get('user_id')
+        try:
+            anterior, campos = estados.transicionar(pk, papel, usuario_id, novo_status)
+        except SolicitacaoColeta.DoesNotExist:
+            return Response({"detail": "Coleta não encontrada"}, status=404)
+        except estados.TransicaoInvalida as e:
+            de, para = e.args
+            return Response({"detail": f"Transição de {de} para {para} não permitida para {papel}."}, status=400)
+        except estados.SemPermissao:
+            return Response({"detail": "Esta solicitação não pertence a você."}, status=403)
+        except estados.ConflitoDeStatus:
+            return Response({"detail": "O status da solicitação mudou durante a operação. Tente novamente."},
+                            status=409)
+
+        resp = {"id": pk, "status": novo_status, "status_anterior": anterior}
+        if campos.get('coletor_id'):
+            resp["coletor_associado"] = campos['coletor_id']
         return Response(resp)
 
 
@@ -153,6 +163,7 @@ class CooperativaListView(generics.ListAPIView):
     """Lista cooperativas cadastradas (para uso pelo frontend)."""
     serializer_class = CooperativaRegistrationSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = CursorPorIdCrescente
 
     def get_queryset(self):
         try:
@@ -174,49 +185,32 @@ class CustomLoginView(APIView):
         # Renomeado para 'identifier' para refletir que pode ser email ou documento
         identifier = serializer.validated_data.get('email')
         password = serializer.validated_data.get('password')
-        user = None
-        user_type = None
-
-        # 1) Tenta por email
-        if Produtor.objects.filter(email=identifier).exists():
-            user = Produtor.objects.get(email=identifier)
-            user_type = 'produtor'
-        elif Coletor.objects.filter(email=identifier).exists():
-            user = Coletor.objects.get(email=identifier)
-            user_type = 'coletor'
-        elif Cooperativa.objects.filter(email=identifier).exists():
-            user = Cooperativa.objects.get(email=identifier)
-            user_type = 'cooperativa'
-        else:
-            # 2) Tenta por documento (CPF/CNPJ)
-            # ATUALIZADO: Produtor agora usa 'cpf_cnpj'
-            if Produtor.objects.filter(cpf_cnpj=identifier).exists():
-                user = Produtor.objects.get(cpf_cnpj=identifier)
-                user_type = 'produtor'
-            elif Coletor.objects.filter(cpf=identifier).exists():
-                user = Coletor.objects.get(cpf=identifier)
-                user_type = 'coletor'
-            elif Cooperativa.objects.filter(cnpj=identifier).exists():
-                user = Cooperativa.objects.get(cnpj=identifier)
-                user_type = 'cooperativa'
-
-        if user and user.senha == password:
-            # Determina o nome a ser retornado conforme o tipo de usuário
-            if user_type == 'cooperativa':
-                display_name = getattr(user, 'nome_empresa', None) or getattr(
-                    user, 'nome', None) or getattr(user, 'email', '')
-            else:
-                display_name = getattr(user, 'nome', None) or getattr(
-                    user, 'nome_empresa', None) or getattr(user, 'email', '')
 
+        # Email ou documento (CPF/CNPJ) de qualquer tipo de usuário, em uma consulta
+        user = identidade.resolver_identificador(identifier)
+
+        confere = False
+        if user:
+            try:
+                confere, precisa_atualizar = senhas.verificar_em_pool(password, user['senha'])
+            except senhas.SobrecargaVerificacao:
+                return Response({'detail': 'Servidor ocupado, tente novamente em instantes.'},
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            if confere and precisa_atualizar:
+                # Texto puro ou custo antigo: grava o hash no formato/custo atual
+                identidade.modelo_do_tipo(user['user_type']).objects.filter(pk=user['pk']).update(
+                    senha=senhas.gerar_hash(password))
+
+        if confere:
+            user_type = user['user_type']
             refresh = RefreshToken()
-            refresh['user_id'] = user.pk
+            refresh['user_id'] = user['pk']
             refresh['user_type'] = user_type
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
                 'user_type': user_type,
-                'name': display_name,
+                'name': user['nome_exibido'],
             }, status=status.HTTP_200_OK)
 
         return Response(
@@ -251,6 +245,38 @@ class SolicitarColetaView(generics.CreateAPIView):
             raise serializers.ValidationError(
                 {"detail": f"Erro inesperado: {e}"})
 
+
+class SolicitarColetaLoteView(APIView):
+    """Cria várias solicitações do produtor autenticado de uma vez.
+    Endpoint: POST /api/coletas/solicitar/lote/
+    Payload: lista no mesmo formato de coletas/solicitar/, até SOLICITACAO_LOTE_MAXIMO entradas.
+    O lote é tudo ou nada: havendo erro, ``erros`` traz um objeto por entrada
+    (vazio nas entradas válidas) e nada é gravado.
+    """
+    permission_classes = [IsProdutor]
+
+    def post(self, request):
+        if not isinstance(request.data, list) or not request.data:
+            return Response({'detail': 'Envie uma lista com ao menos uma solicitação.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        maximo = settings.SOLICITACAO_LOTE_MAXIMO
+        if len(request.data) > maximo:
+            return Response({'detail': f'No máximo {maximo} solicitações por lote.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = SolicitacaoColetaCreateSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response({'detail': 'Há solicitações inválidas no lote.', 'erros': serializer.errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        produtor = Produtor.objects.filter(pk=request.auth_payload['user_id']).first()
+        if produtor is None:
+            return Response({'detail': 'Perfil de Produtor não encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+
+        solicitacoes = serializer.save(produtor=produtor, solicitacao=timezone.now())
+        return Response(SolicitacaoColetaListSerializer(solicitacoes, many=True).data,
+                        status=status.HTTP_201_CREATED)
+
 # --- View para Listar Minhas Solicitações ---
 
 
@@ -259,62 +285,110 @@ class MinhasSolicitacoesView(generics.ListAPIView):
     permission_classes = [IsProdutor]
 
     def get_queryset(self):
-        try:
-            auth_payload = getattr(self.request, 'auth_payload', None)
-            if not auth_payload or 'user_id' not in auth_payload:
-                return SolicitacaoColeta.objects.none()
-
-            user_id = auth_payload.get('user_id')
-            produtor_profile = Produtor.objects.get(pk=user_id)
-            return SolicitacaoColeta.objects.filter(produtor=produtor_profile).select_related('coletor').order_by('-id')
-        except Produtor.DoesNotExist:
+        auth_payload = getattr(self.request, 'auth_payload', None)
+        if not auth_payload or 'user_id' not in auth_payload:
             return SolicitacaoColeta.objects.none()
 
+        # Produtor inexistente resulta simplesmente numa lista vazia
+        qs = SolicitacaoColeta.objects.filter(produtor_id=auth_payload.get('user_id')).order_by('-id')
+        return self.get_serializer_class().preparar_queryset(qs)
+
 
 class DisponiveisSolicitacoesView(generics.ListAPIView):
     """Lista todas as solicitações de coleta disponíveis (status = 'SOLICITADA').
     Usado pelo Coletor/Frontend para ver coletas pendentes no sistema.
+
+    Com ``?lat=&lng=`` retorna só as solicitações dentro de ``radius_km``
+    (padrão 10 km), das mais próximas para as mais distantes, limitadas a
+    ``limite`` (padrão 30). O filtro usa primeiro a bounding box (índice em
+    produtor.latitude/longitude) e depois a distância haversine no SQL.
+    Sem localização a listagem é paginada por cursor (ver paginacao.py); a
+    busca por raio não é paginada.
     """
     serializer_class = SolicitacaoColetaListSerializer
     permission_classes = [permissions.AllowAny]
 
+    RAIO_PADRAO_KM = 10.0
+    RAIO_MAXIMO_KM = 200.0
+    LIMITE_PADRAO = 30
+    LIMITE_MAXIMO = 200
+
+    def parametros_de_proximidade(self):
+        params = self.request.query_params
+        if params.get('lat') in (None, '') and params.get('lng') in (None, ''):
+            return None
+        try:
+            lat = float(params.get('lat'))
+            lng = float(params.get('lng'))
+            raio = float(params.get('radius_km') or self.RAIO_PADRAO_KM)
+            limite = int(params.get('limite') or self.LIMITE_PADRAO)
+        except (TypeError, ValueError):
+            raise serializers.ValidationError(
+                {'detail': "Parâmetros 'lat', 'lng', 'radius_km' e 'limite' devem ser numéricos."})
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180) or raio <= 0 or limite <= 0:
+            raise serializers.ValidationError({'detail': 'Parâmetros de localização fora do intervalo.'})
+        return lat, lng, min(raio, self.RAIO_MAXIMO_KM), min(limite, self.LIMITE_MAXIMO)
+
+    def get_serializer_class(self):
+        if self.parametros_de_proximidade() is not None:
+            return SolicitacaoColetaProximaSerializer
+        return self.serializer_class
+
+    def paginate_queryset(self, queryset):
+        # A busca por raio já é limitada por ``limite`` e ordenada pela distância
+        if self.parametros_de_proximidade() is not None:
+            return None
+        return super().paginate_queryset(queryset)
+
     def get_queryset(self):
+        proximidade = self.parametros_de_proximidade()
+        preparar = self.get_serializer_class().preparar_queryset
         try:
-            return SolicitacaoColeta.objects.filter(status='SOLICITADA').order_by('-id')
+            qs = SolicitacaoColeta.objects.filter(status='SOLICITADA')
+            if proximidade is None:
+                return preparar(qs.order_by('-id'))
+
+            lat, lng, raio, limite = proximidade
+            if settings.INDICE_ESPACIAL_ATIVO:
+                return self.buscar_no_indice(preparar(qs), lat, lng, raio, limite)
+
+            return preparar(geo.filtrar_por_raio(
+                qs, lat, lng, raio, 'produtor__latitude', 'produtor__longitude'
+            )).order_by('distancia_km', '-id')[:limite]
         except Exception as e:
             print(f"Erro ao buscar coletas disponiveis: {e}")
             return SolicitacaoColeta.objects.none()
-        except Exception as e:
-            print(f"Erro ao buscar solicitações: {e}")
-            return SolicitacaoColeta.objects.none()
+
+    def buscar_no_indice(self, qs, lat, lng, raio, limite):
+        """Resolve a busca por raio no índice em memória; o banco só carrega as linhas escolhidas.
+
+        O filtro de status é reaplicado na carga, descartando entradas que
+        outro worker já tenha aceitado ou cancelado.
+        """
+        encontrados = indice_espacial.indice().raio(lat, lng, raio, limite)
+        distancias = {pk: d for d, pk in encontrados}
+        coletas = list(qs.filter(pk__in=distancias))
+        for coleta in coletas:
+            coleta.distancia_km = distancias[coleta.pk]
+        coletas.sort(key=lambda c: (c.distancia_km, -c.pk))
+        return coletas
 
 
 class SolicitacaoColetaDetailView(generics.RetrieveDestroyAPIView):
     """Retorna detalhes de uma solicitação de coleta e permite que o produtor que a criou a delete.
     A exclusão só é permitida quando o status estiver como 'SOLICITADA'.
     """
-    queryset = SolicitacaoColeta.objects.all()
     serializer_class = SolicitacaoColetaDetailSerializer
     permission_classes = [permissions.AllowAny]
 
+    def get_queryset(self):
+        if self.request.method == 'DELETE':
+            return SolicitacaoColeta.objects.all()
+        return self.serializer_class.preparar_queryset(SolicitacaoColeta.objects.all())
+
     def destroy(self, request, *args, **kwargs):
         try:
-            # tenta extrair payload de autenticação (pode estar definido por middleware)
             auth_payload = getattr(request, 'auth_payload', None)
-            if not auth_payload:
-                auth_header = request.headers.get('Authorization')
-                if auth_header and auth_header.startswith('Bearer '):
-                    raw_token = auth_header.split(' ')[1]
-                    from rest_framework_simplejwt.authentication import JWTAuthentication
-                    jwt_auth = JWTAuthentication()
-                    try:
-                        validated = jwt_auth.get_validated_token(raw_token)
-                        auth_payload = getattr(validated, 'payload', None)
-                        if auth_payload:
-                            request.auth_payload = auth_payload
-                    except Exception:
-                        auth_payload = None
-
             if not auth_payload or 'user_id' not in auth_payload:
                 return Response({'detail': 'Autenticação necessária.'}, status=status.HTTP_401_UNAUTHORIZED)
 
@@ -341,88 +415,146 @@ class MinhasSolicitacoesColetorView(generics.ListAPIView):
     para incluir os itens de coleta no payload, facilitando a exibição no frontend.
     """
     serializer_class = SolicitacaoColetaDetailSerializer
-    permission_classes = [permissions.AllowAny]
+    permission_classes = [IsColetor]
 
     def get_queryset(self):
         try:
-            auth_payload = getattr(self.request, 'auth_payload', None)
-            # tenta extrair token do header se auth_payload não estiver definido
-            if not auth_payload:
-                auth_header = self.request.headers.get('Authorization')
-                if auth_header and auth_header.startswith('Bearer '):
-                    raw_token = auth_header.split(' ')[1]
-                    from rest_framework_simplejwt.authentication import JWTAuthentication
-                    jwt_auth = JWTAuthentication()
-                    try:
-                        validated = jwt_auth.get_validated_token(raw_token)
-                        auth_payload = getattr(validated, 'payload', None)
-                        if auth_payload:
-                            self.request.auth_payload = auth_payload
-                    except Exception:
-                        auth_payload = None
-
-            if not auth_payload or 'user_id' not in auth_payload or auth_payload.get('user_type') != 'coletor':
-                return SolicitacaoColeta.objects.none()
-
-            coletor_id = auth_payload.get('user_id')
-            coletor_profile = Coletor.objects.filter(pk=coletor_id).first()
-            if not coletor_profile:
-                return SolicitacaoColeta.objects.none()
-
-            return SolicitacaoColeta.objects.filter(coletor=coletor_profile).order_by('-id')
+            coletor_id = self.request.auth_payload.get('user_id')
+            qs = SolicitacaoColeta.objects.filter(coletor_id=coletor_id).order_by('-id')
+            return self.serializer_class.preparar_queryset(qs)
         except Exception as e:
             print(f"Erro ao buscar coletas do coletor: {e}")
             return SolicitacaoColeta.objects.none()
 
 
+class MapaDemandaView(APIView):
+    """Demanda de coletas agregada em células (mapa de calor).
+    Endpoint: GET /api/coletas/mapa_demanda/
+    Parâmetros opcionais: zoom (3 a 18, padrão 12), tipo_residuo e dias
+    (janela das solicitações recentes, padrão DEMANDA_JANELA_DIAS).
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            zoom = int(params.get('zoom', 12))
+            dias = int(params.get('dias', settings.DEMANDA_JANELA_DIAS))
+        except ValueError:
+            return Response({'detail': "Parâmetros 'zoom' e 'dias' devem ser inteiros."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not demanda.ZOOM_MIN <= zoom <= demanda.ZOOM_MAX or not 0 <= dias <= 365:
+            return Response({'detail': f"Use zoom entre {demanda.ZOOM_MIN} e {demanda.ZOOM_MAX} e dias entre 0 e 365."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        tipo_residuo = params.get('tipo_residuo') or None
+        tipos_validos = [valor for valor, _ in ItemColeta.TIPO_RESIDUO_CHOICES]
+        if tipo_residuo and tipo_residuo not in tipos_validos:
+            return Response({'detail': f"tipo_residuo deve ser um de: {', '.join(tipos_validos)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(demanda.mapa(zoom, tipo_residuo, dias), status=status.HTTP_200_OK)
+
+
+class RotaColetorView(APIView):
+    """Sugere a ordem de visita das coletas aceitas pelo coletor autenticado.
+    Endpoint: GET /api/coletas/rota/
+    Parâmetros opcionais: lat, lng (posição atual; padrão = endereço do coletor)
+    e cooperativa_id (destino final da rota).
+    """
+    permission_classes = [IsColetor]
+
+    def get(self, request):
+        coletor = Coletor.objects.filter(pk=request.auth_payload['user_id']).first()
+        if not coletor:
+            return Response({'detail': 'Perfil de Coletor não encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+
+        params = request.query_params
+        try:
+            if params.get('lat') or params.get('lng'):
+                origem = (float(params['lat']), float(params['lng']))
+            elif coletor.latitude is not None and coletor.longitude is not None:
+                origem = (coletor.latitude, coletor.longitude)
+            else:
+                origem = None
+        except (KeyError, ValueError):
+            return Response({'detail': "Parâmetros 'lat' e 'lng' devem ser informados juntos e ser numéricos."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        destino = None
+        coop_id = params.get('cooperativa_id')
+        if coop_id:
+            coop = Cooperativa.objects.filter(pk=coop_id).first() if coop_id.isdigit() else None
+            if not coop:
+                return Response({'detail': 'Cooperativa não encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+            if coop.latitude is None or coop.longitude is None:
+                return Response({'detail': 'Cooperativa sem coordenadas cadastradas.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            destino = (coop.latitude, coop.longitude)
+
+        coletas = list(
+            SolicitacaoColeta.objects.filter(coletor=coletor, status='ACEITA')
+            .values('id', 'inicio_coleta', 'fim_coleta', 'produtor__latitude', 'produtor__longitude'))
+        paradas = [
+            {'id': c['id'], 'latitude': c['produtor__latitude'], 'longitude': c['produtor__longitude'],
+             'inicio': c['inicio_coleta'], 'fim': c['fim_coleta']}
+            for c in coletas
+            if c['produtor__latitude'] is not None and c['produtor__longitude'] is not None
+        ]
+        sem_coordenadas = [c['id'] for c in coletas
+                           if c['produtor__latitude'] is None or c['produtor__longitude'] is None]
+
+        partida = timezone.now()
+        ordem, trechos, chegadas_h, atrasos_h, total_km = rotas.planejar(
+            paradas, origem=origem, destino=destino, partida=partida,
+            velocidade_kmh=settings.ROTA_VELOCIDADE_KMH,
+            atendimento_h=settings.ROTA_TEMPO_ATENDIMENTO_MIN / 60,
+            penalidade_km_por_hora=settings.ROTA_PENALIDADE_KM_POR_HORA)
+
+        resultado = []
+        for posicao, (i, trecho, chegada, atraso) in enumerate(zip(ordem, trechos, chegadas_h, atrasos_h), 1):
+            parada = paradas[i]
+            resultado.append({
+                'ordem': posicao,
+                'id': parada['id'],
+                'latitude': parada['latitude'],
+                'longitude': parada['longitude'],
+                'distancia_trecho_km': round(trecho, 3),
+                'chegada_estimada': partida + timedelta(hours=chegada),
+                'atraso_minutos': round(atraso * 60),
+            })
+
+        return Response({
+            'origem': origem and {'latitude': origem[0], 'longitude': origem[1]},
+            'destino': destino and {'cooperativa_id': int(coop_id), 'latitude': destino[0], 'longitude': destino[1]},
+            'distancia_total_km': round(total_km, 3),
+            'paradas': resultado,
+            'sem_coordenadas': sem_coordenadas,
+        }, status=status.HTTP_200_OK)
+
+
 class AcceptSolicitacaoView(APIView):
     """Permite que um Coletor autenticado aceite uma solicitação de coleta.
-    O coletor é recuperado a partir do payload de autenticação (como nas outras views).
+    O aceite é um UPDATE condicional (ver despacho.py): se outro coletor
+    aceitou antes, a resposta é 400 e nada muda.
     """
-    permission_classes = [permissions.AllowAny]
+    permission_classes = [IsColetor]
 
     def post(self, request, pk, *args, **kwargs):
         try:
-            auth_payload = getattr(request, 'auth_payload', None)
-            # Se a autenticação já não foi feita por uma permission (ex: IsProdutor), tentamos extrair o token do header
-            if not auth_payload:
-                auth_header = request.headers.get('Authorization')
-                if auth_header and auth_header.startswith('Bearer '):
-                    raw_token = auth_header.split(' ')[1]
-                    from rest_framework_simplejwt.authentication import JWTAuthentication
-                    jwt_auth = JWTAuthentication()
-                    try:
-                        validated = jwt_auth.get_validated_token(raw_token)
-                        auth_payload = getattr(validated, 'payload', None)
-                        # salva para uso posterior
-                        if auth_payload:
-                            request.auth_payload = auth_payload
-                    except Exception:
-                        auth_payload = None
-
-            if not auth_payload or 'user_id' not in auth_payload or auth_payload.get('user_type') != 'coletor':
-                return Response({'detail': 'Autenticação de coletor necessária.'}, status=status.HTTP_401_UNAUTHORIZED)
-
-            # A partir daqui, temos um coletor autenticado — realiza a associação da solicitação
-            coletor_id = auth_payload.get('user_id')
+            coletor_id = request.auth_payload.get('user_id')
             try:
-                coletor_profile = Coletor.objects.get(pk=coletor_id)
-            except Coletor.DoesNotExist:
+                ganhou = despacho.aceitar(pk, coletor_id)
+            except IntegrityError:
+                # coletor_id do token não existe mais (FK)
                 return Response({'detail': 'Perfil de Coletor não encontrado.'}, status=status.HTTP_404_NOT_FOUND)
 
-            try:
-                solicit = SolicitacaoColeta.objects.get(pk=pk)
-            except SolicitacaoColeta.DoesNotExist:
-                return Response({'detail': 'Solicitação não encontrada.'}, status=status.HTTP_404_NOT_FOUND)
-
-            # Verifica se a solicitação ainda está disponível
-            if solicit.status != 'SOLICITADA':
+            if not ganhou:
+                if not SolicitacaoColeta.objects.filter(pk=pk).exists():
+                    return Response({'detail': 'Solicitação não encontrada.'}, status=status.HTTP_404_NOT_FOUND)
                 return Response({'detail': 'Solicitação não está disponível para aceitação.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            solicit.coletor = coletor_profile
-            solicit.status = 'ACEITA'
-            solicit.save()
-
+            solicit = SolicitacaoColetaDetailSerializer.preparar_queryset(SolicitacaoColeta.objects.all()).get(pk=pk)
             serializer = SolicitacaoColetaDetailSerializer(solicit)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -430,105 +562,97 @@ class AcceptSolicitacaoView(APIView):
             return Response({'detail': f'Erro inesperado: {e}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class AceitarProximaView(APIView):
+    """Entrega ao coletor a solicitação aberta mais próxima e já a aceita em seu nome.
+    Endpoint: POST /api/coletas/aceitar_proxima/
+    Payload opcional: { "lat": ..., "lng": ..., "radius_km": 10 }; sem lat/lng usa
+    a localização cadastrada do coletor. Coletores pedindo ao mesmo tempo
+    recebem solicitações diferentes (SKIP LOCKED, ver despacho.py).
+    """
+    permission_classes = [IsColetor]
+
+    RAIO_PADRAO_KM = DisponiveisSolicitacoesView.RAIO_PADRAO_KM
+    RAIO_MAXIMO_KM = DisponiveisSolicitacoesView.RAIO_MAXIMO_KM
+
+    def post(self, request):
+        coletor_id = request.auth_payload['user_id']
+        dados = request.data
+        if not isinstance(dados, dict):
+            return Response({'detail': 'O corpo deve ser um objeto JSON.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            if dados.get('lat') in (None, '') or dados.get('lng') in (None, ''):
+                coletor = Coletor.objects.filter(pk=coletor_id).values('latitude', 'longitude').first()
+                if coletor is None:
+                    return Response({'detail': 'Perfil de Coletor não encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+                lat, lng = coletor['latitude'], coletor['longitude']
+                if lat is None or lng is None:
+                    return Response({'detail': "Informe 'lat' e 'lng' (o coletor não tem localização cadastrada)."},
+                                    status=status.HTTP_400_BAD_REQUEST)
+            else:
+                lat, lng = float(dados.get('lat')), float(dados.get('lng'))
+            raio = float(dados.get('radius_km') or self.RAIO_PADRAO_KM)
+        except (TypeError, ValueError):
+            return Response({'detail': "Parâmetros 'lat', 'lng' e 'radius_km' devem ser numéricos."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180) or raio <= 0:
+            return Response({'detail': 'Parâmetros de localização fora do intervalo.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            pk = despacho.aceitar_proxima(coletor_id, lat, lng, min(raio, self.RAIO_MAXIMO_KM))
+        except IntegrityError:
+            return Response({'detail': 'Perfil de Coletor não encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+        if pk is None:
+            return Response({'detail': 'Nenhuma solicitação disponível no raio informado.'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        solicit = SolicitacaoColetaDetailSerializer.preparar_queryset(SolicitacaoColeta.objects.all()).get(pk=pk)
+        return Response(SolicitacaoColetaDetailSerializer(solicit).data, status=status.HTTP_200_OK)
+
 class CooperativaInteressesView(APIView):
     """Recebe a lista de interesses (tipo_residuo, preco) e atualiza a tabela
     `cooperativa_material` para a cooperativa autenticada.
     Payload esperado: {"interesses": [{"categoria": "Plástico", "preco": "R$ 2,50/kg"}, ...]}
     """
-    permission_classes = [permissions.AllowAny]
+    permission_classes = [IsCooperativa]
 
     def get(self, request, *args, **kwargs):
         """Retorna a lista de interesses (tipo_residuo, preco_oferecido) da cooperativa autenticada."""
-        # tenta extrair payload de autenticação (como em outras views)
-        auth_payload = getattr(request, 'auth_payload', None)
-        if not auth_payload:
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                raw_token = auth_header.split(' ')[1]
-                from rest_framework_simplejwt.authentication import JWTAuthentication
-                jwt_auth = JWTAuthentication()
-                try:
-                    validated = jwt_auth.get_validated_token(raw_token)
-                    auth_payload = getattr(validated, 'payload', None)
-                    if auth_payload:
-                        request.auth_payload = auth_payload
-                except Exception:
-                    auth_payload = None
-
-        if not auth_payload or auth_payload.get('user_type') != 'cooperativa' or 'user_id' not in auth_payload:
-            return Response({'detail': 'Autenticação de cooperativa necessária.'}, status=status.HTTP_401_UNAUTHORIZED)
-
-        coop_id = auth_payload.get('user_id')
+        coop_id = request.auth_payload.get('user_id')
         qs = CooperativaMaterial.objects.filter(cooperativa_id=coop_id)
         serializer = CooperativaMaterialSerializer(qs, many=True)
         # Retornamos em um campo 'interesses' para compatibilidade com frontend
         return Response({'interesses': serializer.data}, status=status.HTTP_200_OK)
 
     def post(self, request, *args, **kwargs):
-        # tenta extrair payload de autenticação (como em outras views)
-        auth_payload = getattr(request, 'auth_payload', None)
-        if not auth_payload:
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                raw_token = auth_header.split(' ')[1]
-                from rest_framework_simplejwt.authentication import JWTAuthentication
-                jwt_auth = JWTAuthentication()
-                try:
-                    validated = jwt_auth.get_validated_token(raw_token)
-                    auth_payload = getattr(validated, 'payload', None)
-                    if auth_payload:
-                        request.auth_payload = auth_payload
-                except Exception:
-                    auth_payload = None
-
-        if not auth_payload or auth_payload.get('user_type') != 'cooperativa' or 'user_id' not in auth_payload:
-            return Response({'detail': 'Autenticação de cooperativa necessária.'}, status=status.HTTP_401_UNAUTHORIZED)
-
-        coop_id = auth_payload.get('user_id')
+        coop_id = request.auth_payload.get('user_id')
 
         interesses = request.data.get('interesses')
         if interesses is None or not isinstance(interesses, list):
             return Response({'detail': "Campo 'interesses' inválido."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Helper para converter preço em Decimal
-        import re
-        from decimal import Decimal
-
-        def parse_price(p):
-            if p is None:
-                return None
-            if isinstance(p, (int, float, Decimal)):
-                return Decimal(str(p))
-            s = str(p)
-            # remove R$, /kg, spaces e letras
-            s = s.replace('R$', '').replace('r$', '')
-            s = re.sub(r"[^0-9,\.\-]", '', s)
-            s = s.replace(',', '.')
-            try:
-                return Decimal(s)
-            except Exception:
-                return None
-
-        processed_types = []
+        # Um registro por tipo; se o tipo vier repetido vale o último (como antes)
+        precos = {}
         for item in interesses:
             tipo = item.get('categoria') or item.get('tipo_residuo')
-            preco_raw = item.get('preco') or item.get('preco_oferecido')
-            if not tipo:
-                continue
-            preco = parse_price(preco_raw)
-            if preco is None:
+            preco = parse_price(item.get('preco') or item.get('preco_oferecido'))
+            if not tipo or preco is None:
                 continue
-            # create or update
-            CooperativaMaterial.objects.update_or_create(
-                cooperativa_id=coop_id,
-                tipo_residuo=tipo,
-                defaults={'preco_oferecido': preco}
+            precos[tipo] = preco
+
+        # Upsert (INSERT ... ON CONFLICT na unique cooperativa/tipo) e remoção
+        # dos tipos que saíram da lista, numa transação
+        with transaction.atomic():
+            CooperativaMaterial.objects.bulk_create(
+                [CooperativaMaterial(cooperativa_id=coop_id, tipo_residuo=tipo, preco_oferecido=preco)
+                 for tipo, preco in precos.items()],
+                update_conflicts=True,
+                unique_fields=['cooperativa', 'tipo_residuo'],
+                update_fields=['preco_oferecido'],
             )
-            processed_types.append(tipo)
-
-        # Remove materiais existentes que não estão na lista enviada
-        CooperativaMaterial.objects.filter(cooperativa_id=coop_id).exclude(
-            tipo_residuo__in=processed_types).delete()
+            CooperativaMaterial.objects.filter(cooperativa_id=coop_id).exclude(
+                tipo_residuo__in=list(precos)).delete()
+        # bulk_create não dispara post_save, que invalidaria a matriz de preços
+        recomendacao.invalidar()
 
         return Response({'detail': 'Interesses atualizados com sucesso.'}, status=status.HTTP_200_OK)
 
@@ -538,79 +662,75 @@ class AssociarCooperativaView(APIView):
     Endpoint: PATCH /api/coletas/<pk>/associar_cooperativa/
     Payload esperado: { "cooperativa_id": <id> }
     """
-    permission_classes = [permissions.AllowAny]
+    permission_classes = [IsColetor]
 
     def patch(self, request, pk):
         try:
-            # tenta extrair payload de autenticação (pode já estar em request.auth_payload)
-            auth_payload = getattr(request, 'auth_payload', None)
-            if not auth_payload:
-                auth_header = request.headers.get('Authorization')
-                if auth_header and auth_header.startswith('Bearer '):
-                    raw_token = auth_header.split(' ')[1]
-                    from rest_framework_simplejwt.authentication import JWTAuthentication
-                    jwt_auth = JWTAuthentication()
-                    try:
-                        validated = jwt_auth.get_validated_token(raw_token)
-                        auth_payload = getattr(validated, 'payload', None)
-                        if auth_payload:
-                            request.auth_payload = auth_payload
-                    except Exception:
-                        auth_payload = None
-
-            if not auth_payload or auth_payload.get('user_type') != 'coletor' or 'user_id' not in auth_payload:
-                return Response({'detail': 'Autenticação de coletor necessária.'}, status=status.HTTP_401_UNAUTHORIZED)
-
-            try:
-                coleta = SolicitacaoColeta.objects.get(pk=pk)
-            except SolicitacaoColeta.DoesNotExist:
-                return Response({'detail': 'Solicitação não encontrada.'}, status=status.HTTP_404_NOT_FOUND)
-
             coop_id = request.data.get(
                 'cooperativa_id') or request.data.get('cooperativa')
             if coop_id is None:
                 return Response({'detail': "Campo 'cooperativa_id' é obrigatório."}, status=status.HTTP_400_BAD_REQUEST)
 
-            try:
-                coop = Cooperativa.objects.get(pk=coop_id)
-            except Cooperativa.DoesNotExist:
+            if not Cooperativa.objects.filter(pk=coop_id).exists():
                 return Response({'detail': 'Cooperativa não encontrada.'}, status=status.HTTP_404_NOT_FOUND)
 
-            # Associa e salva
-            coleta.cooperativa = coop
-            coleta.save()
+            # Associa só a coluna da cooperativa (o status não muda, sem sinais a disparar)
+            if not SolicitacaoColeta.objects.filter(pk=pk).update(cooperativa_id=coop_id):
+                return Response({'detail': 'Solicitação não encontrada.'}, status=status.HTTP_404_NOT_FOUND)
 
+            coleta = SolicitacaoColetaDetailSerializer.preparar_queryset(
+                SolicitacaoColeta.objects.filter(pk=pk)).get()
             serializer = SolicitacaoColetaDetailSerializer(coleta)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
+        except (TypeError, ValueError):
+            return Response({'detail': "Campo 'cooperativa_id' deve ser numérico."}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'detail': f'Erro inesperado: {e}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class CooperativasRecomendadasView(APIView):
+    """Ranqueia cooperativas para uma coleta por distância e preço oferecido.
+    Endpoint: GET /api/coletas/<pk>/cooperativas_recomendadas/
+    Parâmetros opcionais: lat, lng (origem; padrão = endereço do produtor),
+    peso_distancia, peso_valor e limite.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk):
+        try:
+            coleta = SolicitacaoColeta.objects.select_related('produtor').get(pk=pk)
+        except SolicitacaoColeta.DoesNotExist:
+            return Response({'detail': 'Solicitação não encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+
+        params = request.query_params
+        try:
+            lat = float(params['lat']) if params.get('lat') else coleta.produtor.latitude
+            lng = float(params['lng']) if params.get('lng') else coleta.produtor.longitude
+            peso_distancia = float(params.get('peso_distancia', settings.RECOMENDACAO_PESO_DISTANCIA))
+            peso_valor = float(params.get('peso_valor', settings.RECOMENDACAO_PESO_VALOR))
+            limite = min(int(params.get('limite', 10)), 100)
+        except (TypeError, ValueError):
+            return Response({'detail': 'Parâmetros numéricos inválidos.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        quantidades = recomendacao.quantidades_da_coleta(coleta)
+        ranking = recomendacao.matriz().ranquear(
+            quantidades, lat, lng, peso_distancia=peso_distancia, peso_valor=peso_valor, limite=limite)
+        return Response({
+            'coleta_id': coleta.id,
+            'origem': {'latitude': lat, 'longitude': lng},
+            'materiais': quantidades,
+            'cooperativas': ranking,
+        }, status=status.HTTP_200_OK)
+
+
 # --- VIEW PARA AVALIAR PRODUTOR (ISSUE #75) ---
 class AvaliarProdutorView(APIView):
-    permission_classes = [permissions.AllowAny] 
+    # 1. Apenas coletores podem avaliar produtores
+    permission_classes = [IsColetor]
 
     def post(self, request):
-        # 1. Autenticação Manual (verificar se é Coletor)
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-             return Response({'detail': 'Token não fornecido.'}, status=status.HTTP_401_UNAUTHORIZED)
-        
-        try:
-            raw_token = auth_header.split(' ')[1]
-            from rest_framework_simplejwt.authentication import JWTAuthentication
-            jwt_auth = JWTAuthentication()
-            validated_token = jwt_auth.get_validated_token(raw_token)
-            
-            user_type = validated_token.payload.get('user_type')
-            user_id = validated_token.payload.get('user_id')
-
-            if user_type != 'coletor':
-                return Response({'detail': 'Apenas coletores podem avaliar produtores.'}, status=status.HTTP_403_FORBIDDEN)
+        user_id = request.auth_payload.get('user_id')
 
-        except Exception as e:
-             return Response({'detail': 'Token inválido.'}, status=status.HTTP_401_UNAUTHORIZED)
-        
         # 2. Processar Avaliação
         serializer = AvaliacaoProdutorSerializer(data=request.data)
         if serializer.is_valid():
@@ -651,20 +771,32 @@ class ProdutorPerfilView(APIView):
 class AvaliarColetorView(APIView):
     """
     Endpoint: POST /api/avaliar/coletor/
-    Segue o mesmo padrão de AvaliarProdutor: não usa autenticação aqui,
-    apenas valida a coleta e atualiza a média do coletor.
+    O produtor dono da coleta ou a cooperativa que recebeu a entrega avalia o
+    coletor; a avaliação fica registrada com o papel e o id de quem avaliou.
     """
+    permission_classes = [IsUsuario]
+    # papel -> coluna da coleta que precisa apontar para quem avalia
+    DONOS = {'produtor': 'produtor_id', 'cooperativa': 'cooperativa_id'}
 
     def post(self, request, *args, **kwargs):
+        papel = request.auth_payload.get('user_type')
+        user_id = request.auth_payload.get('user_id')
+        if papel not in self.DONOS:
+            return Response({'detail': 'Apenas produtores e cooperativas avaliam coletores.'},
+                            status=status.HTTP_403_FORBIDDEN)
+
         serializer = AvaliacaoColetorSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        if getattr(serializer.validated_data['coleta_obj'], self.DONOS[papel]) != user_id:
+            return Response({'detail': 'Você não pode avaliar uma coleta que não é sua.'},
+                            status=status.HTTP_403_FORBIDDEN)
+        serializer.save(avaliador=papel, avaliador_id=user_id)
 
         return Response(
             {"detail": "Avaliação do coletor registrada com sucesso."},
             status=status.HTTP_200_OK,
         )
-    
+
 class EntregasPendentesCooperativaView(generics.ListAPIView):
     """
     Lista as solicitações associadas à cooperativa autenticada
@@ -672,44 +804,19 @@ class EntregasPendentesCooperativaView(generics.ListAPIView):
     Usado pelo frontend na aba "Confirmar Entregas" da cooperativa.
     """
     serializer_class = SolicitacaoColetaDetailSerializer
-    permission_classes = [permissions.AllowAny]
+    permission_classes = [IsCooperativa]
 
     def get_queryset(self):
-        from rest_framework_simplejwt.authentication import JWTAuthentication
         try:
-            auth_payload = getattr(self.request, 'auth_payload', None)
-
-            # Tenta extrair o payload do token JWT, como no resto do código
-            if not auth_payload:
-                auth_header = self.request.headers.get('Authorization')
-                if auth_header and auth_header.startswith('Bearer '):
-                    raw_token = auth_header.split(' ')[1]
-                    jwt_auth = JWTAuthentication()
-                    try:
-                        validated = jwt_auth.get_validated_token(raw_token)
-                        auth_payload = getattr(validated, 'payload', None)
-                        if auth_payload:
-                            self.request.auth_payload = auth_payload
-                    except Exception:
-                        auth_payload = None
-
-            # Precisa ser cooperativa autenticada
-            if (
-                not auth_payload
-                or auth_payload.get('user_type') != 'cooperativa'
-                or 'user_id' not in auth_payload
-            ):
-                return SolicitacaoColeta.objects.none()
-
-            coop_id = auth_payload.get('user_id')
+            coop_id = self.request.auth_payload.get('user_id')
 
             # Filtra coletas dessa cooperativa, em status AGUARDANDO
-            return (
+            qs = (
                 SolicitacaoColeta.objects
                 .filter(cooperativa_id=coop_id, status='AGUARDANDO')
-                .select_related('coletor', 'produtor', 'cooperativa')
                 .order_by('-id')
             )
+            return self.serializer_class.preparar_queryset(qs)
         except Exception as e:
             print(f"Erro ao buscar entregas pendentes da cooperativa: {e}")
             return SolicitacaoColeta.objects.none()
@@ -744,40 +851,11 @@ class ColetorPerfilView(APIView):
     Retorna informações básicas e a nota média do Coletor autenticado.
     Endpoint: GET /api/coletor/perfil/
     """
-    permission_classes = [permissions.AllowAny]  # validação por token manualmente
+    permission_classes = [IsColetor]
 
     def get(self, request):
         try:
-            # Tenta recuperar payload já decodificado (middleware/permission)
-            auth_payload = getattr(request, 'auth_payload', None)
-
-            # Se não existir, tenta extrair do header Authorization
-            if not auth_payload:
-                auth_header = request.headers.get('Authorization')
-                if auth_header and auth_header.startswith('Bearer '):
-                    raw_token = auth_header.split(' ')[1]
-                    from rest_framework_simplejwt.authentication import JWTAuthentication
-                    jwt_auth = JWTAuthentication()
-                    try:
-                        validated = jwt_auth.get_validated_token(raw_token)
-                        auth_payload = getattr(validated, 'payload', None)
-                        if auth_payload:
-                            request.auth_payload = auth_payload
-                    except Exception:
-                        auth_payload = None
-
-            # Verifica se é um coletor autenticado
-            if (
-                not auth_payload
-                or auth_payload.get('user_type') != 'coletor'
-                or 'user_id' not in auth_payload
-            ):
-                return Response(
-                    {'detail': 'Autenticação de coletor necessária.'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-
-            user_id = auth_payload.get('user_id')
+            user_id = request.auth_payload.get('user_id')
 
             try:
                 coletor = Coletor.objects.get(pk=user_id)
@@ -1,5 +1,7 @@
 from pathlib import Path
+import importlib.util
 import os
+import tempfile
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -39,6 +41,8 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # ===========================
 MIDDLEWARE = [
+    'aplicativo_web.middleware.MetricasMiddleware',
+    'aplicativo_web.middleware.PerfilMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -84,6 +88,7 @@ DATABASES = {
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASSWORD"),
+        "OPTIONS": {},
     }
 }
 
@@ -91,6 +96,21 @@ DATABASES = {
 # ===========================
 # AUTH VALIDATION
 # ===========================
+# Hash das senhas dos usuários do app (ver aplicativo_web/senhas.py). O
+# hasher ajustável substitui o PBKDF2 padrão: mesmo formato, custo por ambiente.
+PASSWORD_HASHERS = [
+    'aplicativo_web.senhas.PBKDF2AjustavelHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+SENHA_PBKDF2_ITERACOES = int(os.environ.get("SENHA_PBKDF2_ITERACOES", 600000))
+# Hashes calculados ao mesmo tempo por processo e logins que podem aguardar vaga
+SENHA_VERIFICACAO_THREADS = int(os.environ.get("SENHA_VERIFICACAO_THREADS", 2))
+SENHA_VERIFICACAO_FILA = int(os.environ.get("SENHA_VERIFICACAO_FILA", 32))
+SENHA_VERIFICACAO_ESPERA = float(os.environ.get("SENHA_VERIFICACAO_ESPERA", 5))
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -123,11 +143,19 @@ STATICFILES_DIRS = [
 # REST FRAMEWORK
 # ===========================
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'aplicativo_web.authentication.TokenPayloadAuthentication',
+    ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
-    )
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'aplicativo_web.paginacao.CursorPorId',
 }
 
+# Tokens já validados reaproveitados entre requisições (ver authentication.py)
+AUTENTICACAO_CACHE_TAMANHO = int(os.environ.get("AUTENTICACAO_CACHE_TAMANHO", 4096))
+AUTENTICACAO_CACHE_TTL = int(os.environ.get("AUTENTICACAO_CACHE_TTL", 60))
+
 
 # ===========================
 # CORS
@@ -136,3 +164,147 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# ===========================
+# GEOCODING
+# ===========================
+# TTL (segundos) das entradas do cache de geocoding, tanto no LRU em memória
+# quanto na tabela geocode_cache.
+GEOCODE_CACHE_TTL = int(os.environ.get("GEOCODE_CACHE_TTL", 60 * 60 * 24 * 30))
+GEOCODE_CACHE_MAX_ENTRADAS = int(os.environ.get("GEOCODE_CACHE_MAX_ENTRADAS", 50000))
+GEOCODE_CACHE_LRU_TAMANHO = int(os.environ.get("GEOCODE_CACHE_LRU_TAMANHO", 2048))
+# A limpeza (expiradas + excedentes) roda a cada N gravações no cache
+GEOCODE_CACHE_LIMPEZA_A_CADA = int(os.environ.get("GEOCODE_CACHE_LIMPEZA_A_CADA", 100))
+# Quando True, o cadastro de produtor não consulta o geocoder no request:
+# o produtor entra na fila geocode_pendente (ver `manage.py processar_geocodes`).
+GEOCODE_ASSINCRONO = os.environ.get("GEOCODE_ASSINCRONO", "True") == "True"
+GEOCODE_FILA_MAX_TENTATIVAS = int(os.environ.get("GEOCODE_FILA_MAX_TENTATIVAS", 5))
+# Intervalo (segundos) para recarregar em memória a tabela cep_centroide
+CEP_CENTROIDES_RECARGA = int(os.environ.get("CEP_CENTROIDES_RECARGA", 600))
+
+# Cliente HTTP do geocoder (ver aplicativo_web/cliente_geocoder.py)
+GEOCODER_URL = os.environ.get("GEOCODER_URL", "https://nominatim.openstreetmap.org/search")
+GEOCODER_TIMEOUT_CONEXAO = float(os.environ.get("GEOCODER_TIMEOUT_CONEXAO", 3))
+GEOCODER_TIMEOUT_LEITURA = float(os.environ.get("GEOCODER_TIMEOUT_LEITURA", 5))
+# Política de uso do Nominatim: no máximo 1 requisição por segundo
+GEOCODER_REQUISICOES_POR_SEGUNDO = float(os.environ.get("GEOCODER_REQUISICOES_POR_SEGUNDO", 1))
+GEOCODER_RAJADA = int(os.environ.get("GEOCODER_RAJADA", 1))
+# Tempo máximo (segundos) aguardando vaga no limitador antes de desistir da chamada
+GEOCODER_ESPERA_MAXIMA = float(os.environ.get("GEOCODER_ESPERA_MAXIMA", 5))
+GEOCODER_TENTATIVAS = int(os.environ.get("GEOCODER_TENTATIVAS", 2))
+# Circuit breaker: falhas seguidas para abrir e segundos até testar de novo
+GEOCODER_FALHAS_PARA_ABRIR = int(os.environ.get("GEOCODER_FALHAS_PARA_ABRIR", 5))
+GEOCODER_RECUPERACAO = float(os.environ.get("GEOCODER_RECUPERACAO", 30))
+
+
+# ===========================
+# ÍNDICE ESPACIAL (coletas abertas)
+# ===========================
+# Quando True, a busca por raio em coletas/disponiveis/ usa o índice em memória
+# (aplicativo_web/indice_espacial.py) em vez da consulta haversine no banco.
+INDICE_ESPACIAL_ATIVO = os.environ.get("INDICE_ESPACIAL_ATIVO", "False") == "True"
+INDICE_ESPACIAL_CELULA_GRAUS = float(os.environ.get("INDICE_ESPACIAL_CELULA_GRAUS", 0.05))
+# Reconstrução periódica (segundos): sinais só atualizam o índice do próprio worker
+INDICE_ESPACIAL_RECONSTRUCAO = int(os.environ.get("INDICE_ESPACIAL_RECONSTRUCAO", 60))
+
+
+# ===========================
+# RECOMENDAÇÃO DE COOPERATIVAS
+# ===========================
+# Reconstrução (segundos) da matriz cooperativa x material em cada worker
+RECOMENDACAO_MATRIZ_TTL = int(os.environ.get("RECOMENDACAO_MATRIZ_TTL", 300))
+RECOMENDACAO_PESO_DISTANCIA = float(os.environ.get("RECOMENDACAO_PESO_DISTANCIA", 0.5))
+RECOMENDACAO_PESO_VALOR = float(os.environ.get("RECOMENDACAO_PESO_VALOR", 0.5))
+
+
+# ===========================
+# ROTA DO COLETOR
+# ===========================
+ROTA_VELOCIDADE_KMH = float(os.environ.get("ROTA_VELOCIDADE_KMH", 25))
+ROTA_TEMPO_ATENDIMENTO_MIN = float(os.environ.get("ROTA_TEMPO_ATENDIMENTO_MIN", 10))
+# Custo, em km equivalentes, de cada hora de atraso após o fim da janela de coleta
+ROTA_PENALIDADE_KM_POR_HORA = float(os.environ.get("ROTA_PENALIDADE_KM_POR_HORA", 60))
+
+
+# ===========================
+# CACHE / MAPA DE DEMANDA
+# ===========================
+# Cache compartilhado entre os workers e o "precomputar_demanda": por padrão
+# a tabela "django_cache" no banco (criada pela migração 0013 ou por
+# "createcachetable"); troque por Redis com CACHE_BACKEND/CACHE_LOCATION. Um
+# cache por processo (LocMemCache) faria o comando aquecer só a si mesmo.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "django_cache"),
+    }
+}
+DEMANDA_CACHE_TTL = int(os.environ.get("DEMANDA_CACHE_TTL", 300))
+DEMANDA_JANELA_DIAS = int(os.environ.get("DEMANDA_JANELA_DIAS", 30))
+
+
+# ===========================
+# MÉTRICAS (PROMETHEUS)
+# ===========================
+# Diretório compartilhado pelos workers do gunicorn para somar as métricas
+# (vazio = só o processo atual). Limpe-o ao reiniciar o serviço.
+METRICAS_DIRETORIO = os.environ.get(
+    "METRICAS_DIRETORIO", os.path.join(tempfile.gettempdir(), "reciclaai-metricas"))
+METRICAS_INTERVALO_GRAVACAO = float(os.environ.get("METRICAS_INTERVALO_GRAVACAO", 1))
+# Se definido, /api/metrics exige "Authorization: Bearer <token>"
+METRICAS_TOKEN = os.environ.get("METRICAS_TOKEN", "")
+
+
+# ===========================
+# PERFIL DE REQUISIÇÕES
+# ===========================
+# Perfila quando "X-Perfilar: <token>" ou "?perfilar=<token>" é enviado, ou por
+# amostragem (0 a 1). Sem token e sem amostragem o middleware é desativado.
+PERFIL_TOKEN = os.environ.get("PERFIL_TOKEN", "")
+PERFIL_TAXA_AMOSTRAGEM = float(os.environ.get("PERFIL_TAXA_AMOSTRAGEM", 0))
+PERFIL_DIRETORIO = os.environ.get(
+    "PERFIL_DIRETORIO", os.path.join(tempfile.gettempdir(), "reciclaai-perfis"))
+PERFIL_FUNCOES_NO_RESUMO = int(os.environ.get("PERFIL_FUNCOES_NO_RESUMO", 25))
+
+
+# ===========================
+# PAGINAÇÃO
+# ===========================
+# Cursor sobre o id (ver aplicativo_web/paginacao.py). Com PAGINACAO_COMPATIVEL
+# as listagens só paginam quando o cliente envia "cursor" ou "page_size".
+PAGINACAO_TAMANHO_PAGINA = int(os.environ.get("PAGINACAO_TAMANHO_PAGINA", 50))
+PAGINACAO_TAMANHO_MAXIMO = int(os.environ.get("PAGINACAO_TAMANHO_MAXIMO", 200))
+PAGINACAO_COMPATIVEL = os.environ.get("PAGINACAO_COMPATIVEL", "True") == "True"
+
+
+# ===========================
+# SOLICITAÇÕES EM LOTE
+# ===========================
+# Máximo de solicitações por POST em /api/coletas/solicitar/lote/
+SOLICITACAO_LOTE_MAXIMO = int(os.environ.get("SOLICITACAO_LOTE_MAXIMO", 100))
+
+
+# ===========================
+# POOL DE CONEXÕES
+# ===========================
+# Pool do psycopg 3 (psycopg[pool]) por processo: a requisição pega uma conexão
+# já aberta e a devolve ao terminar, em vez de abrir uma conexão TLS nova com o
+# banco a cada requisição. Tamanho por worker: com N workers o banco recebe até
+# N * DB_POOL_TAMANHO_MAXIMO conexões. Tempos em segundos.
+# Sem psycopg[pool] instalado o padrão é uma conexão por requisição.
+DB_POOL = os.environ.get(
+    "DB_POOL", "True" if importlib.util.find_spec("psycopg_pool") else "False") == "True"
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_TAMANHO_MINIMO", 1)),
+        "max_size": int(os.environ.get("DB_POOL_TAMANHO_MAXIMO", 4)),
+        # Espera máxima por uma conexão livre antes de falhar a requisição
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        # Recicla conexões antigas e fecha as ociosas acima do mínimo
+        "max_lifetime": float(os.environ.get("DB_POOL_VIDA_MAXIMA", 1800)),
+        "max_idle": float(os.environ.get("DB_POOL_OCIOSIDADE_MAXIMA", 300)),
+    }
+# Testa a conexão antes de entregá-la à requisição (no pool, com um SELECT
+# vazio): descarta as que o banco gerenciado derrubou enquanto estavam paradas
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = os.environ.get("DB_VERIFICAR_CONEXAO", "True") == "True"